@@ -0,0 +1,63 @@
+import time
+import tracemalloc
+import numpy as np
+from django.core.management.base import BaseCommand
+from view.survival_data import SurvivalData
+from view.plotting import survival_plot_data
+from view.figure_templates import render_plot, render_image, clear_templates
+from view.constants import RENDER_PROFILES
+
+
+class Command(BaseCommand):
+    help = "Compare render time and allocations of reused figure templates against a fresh figure per plot."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=500, help="Observations in the synthetic cohort")
+        parser.add_argument('--repeat', type=int, default=20, help="Renders per plot type and mode")
+        parser.add_argument('--profiles', action='store_true', help="Compare the render profiles instead")
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        size, repeat = options['size'], options['repeat']
+        survival_data = SurvivalData(np.round(rng.weibull(1.3, size) * 50) + 1, (rng.random(size) < 0.7).astype(int))
+        plot_data = survival_plot_data(survival_data, 'weibull', (1.3, 50.0))
+        kinds = ['hazard', 'kaplan_meier', 'survival_comparison', 'survival_function']
+        if options['profiles']:
+            return self.compare_profiles(plot_data, kinds, repeat)
+
+        self.stdout.write(f"{'mode':<10}{'ms/plot':>10}{'peak KiB/plot':>15}")
+        for reuse in (False, True):
+            clear_templates()
+            for kind in kinds:
+                render_plot(kind, plot_data, reuse=reuse)  # warm caches and, when reusing, build the templates
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for kind in kinds:
+                    render_plot(kind, plot_data, reuse=reuse)
+            elapsed = (time.perf_counter() - start) / (repeat * len(kinds))
+
+            # Peak Python-level allocation while rendering one plot
+            peaks = []
+            for kind in kinds:
+                tracemalloc.start()
+                render_plot(kind, plot_data, reuse=reuse)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+
+            mode = "template" if reuse else "fresh"
+            self.stdout.write(f"{mode:<10}{elapsed * 1000:>10.1f}{np.mean(peaks) / 1024:>15.1f}")
+        clear_templates()
+
+    def compare_profiles(self, plot_data, kinds, repeat):
+        """Render time and image size of every profile, on reused templates."""
+        self.stdout.write(f"{'profile':<12}{'format':>8}{'ms/plot':>10}{'KiB/plot':>10}")
+        for profile, spec in RENDER_PROFILES.items():
+            sizes = [len(render_image(kind, plot_data, profile=profile)) for kind in kinds]
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for kind in kinds:
+                    render_image(kind, plot_data, profile=profile)
+            elapsed = (time.perf_counter() - start) / (repeat * len(kinds))
+            self.stdout.write(f"{profile:<12}{spec['format']:>8}{elapsed * 1000:>10.1f}{np.mean(sizes) / 1024:>10.1f}")
+        clear_templates()
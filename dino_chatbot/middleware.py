@@ -0,0 +1,15 @@
+from django.conf import settings
+from view.watchdog import check_memory
+
+
+class MemoryWatchdogMiddleware:
+    """Check the worker's RSS after every response and request a graceful recycle past WORKER_MAX_RSS_MB."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_rss_bytes = settings.WORKER_MAX_RSS_MB * 1024 * 1024
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        check_memory(self.max_rss_bytes)
+        return response
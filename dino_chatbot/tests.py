@@ -1,8 +1,85 @@
 from django.test import TestCase, Client
 from django.urls import reverse
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
 import json
+import os
+import subprocess
+import tempfile
+import pickle
+import tracemalloc
+import time
+import gc
+import threading
+import base64
+import io
+from concurrent.futures import ThreadPoolExecutor
+import sys
 import numpy as np
-from unittest.mock import patch
+from unittest.mock import patch, Mock
+from PIL import Image
+from scipy import stats
+from view.survival_data import SurvivalData
+from view.distributions import calculate_aic, fit_distribution, calculate_kaplan_meier, kaplan_meier_to_dict
+from view.helper import calculate_survival_metrics, generate_visualizations
+from view.likelihood import LIKELIHOODS
+from view.fitting import fit_distributions, evaluate_distribution, evaluate_distributions
+from view.fitting import get_fit_executor, shutdown_fit_executor
+from view.goodness_of_fit import evaluate_goodness_of_fit_all
+from view.kaplan_meier import kaplan_meier_from_life_table, downsample_steps
+from view.figure_templates import render_plot, render_image, get_template, open_figure_count, HistogramTemplate
+from view.figure_templates import clear_templates
+from view.plotting import survival_plot_data
+from view.aggregates import box_statistics, histogram_counts, category_counts, numeric_aggregates, numeric_summary
+from view.aggregates import numeric_summaries
+from view.descriptive_stats import calculate_numeric_statistics, calculate_categorical_statistics
+from view.descriptive_stats import process_statistics
+from view.distribution_registry import REGISTRY, SurvivalDistribution
+from view.rendering import render_plots, get_render_executor, shutdown_render_executor
+from view.plot_store import clear_plot_store, prune_plot_store, plot_url
+from view.watchdog import install_watchdog, check_memory, memory_report
+from view.streaming_stats import ColumnAccumulator, MomentAccumulator, QuantileSketch, session_lock
+from view.approximate_stats import ApproximateColumn, HyperLogLog, HeavyHitters, hash_values
+from view.llm_handlers import handle_predictions
+from view.constants import DISTRIBUTIONS, RENDER_PROFILES, FIT_CACHE_GENERATION_TTL
+from view.utils import plot_to_bytes, parse_life_table
+from view.fit_cache import dataset_digest, invalidate_fit_cache, fit_cache_stats, reset_fit_cache_stats
+
+
+def weibull_sample(rng, size, shape=1.3, scale=50, event_rate=0.7):
+    """Whole-number Weibull times (from 1) and event flags drawn from rng, the survival fixture of most tests."""
+    time_to_event = np.round(rng.weibull(shape, size) * scale) + 1
+    event_status = (rng.random(size) < event_rate).astype(int)
+    return time_to_event, event_status
+
+
+def use_plot_store(test):
+    """Give the test a plot store in a temporary directory (render=url), emptied afterwards."""
+    store_dir = tempfile.TemporaryDirectory()
+    test.addCleanup(store_dir.cleanup)
+    settings_override = override_settings(PLOT_STORE_DIR=store_dir.name)
+    settings_override.enable()
+    test.addCleanup(settings_override.disable)
+    test.addCleanup(clear_plot_store)
+    return store_dir.name
+
+
+def stream_chunks(client, chunks, **start):
+    """Start a statistics stream with the `start` options and post the chunks in order.
+
+    Returns the session id and the status of the last chunk, or of the first one rejected.
+    """
+    session = client.post(reverse('start_statistics_stream'), json.dumps(start),
+                          content_type='application/json').json()['session']
+    status = 200
+    for seq, chunk in enumerate(chunks):
+        status = client.post(reverse('add_statistics_chunk', args=[session]),
+                             json.dumps({"data": chunk, "seq": seq}), content_type='application/json').status_code
+        if status != 200:
+            break
+    return session, status
+
 
 class ViewTests(TestCase):
     def setUp(self):
@@ -176,3 +253,1349 @@ class ViewTests(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertIn('warning', json.loads(response.content))
+
+
+class SurvivalDataTests(TestCase):
+    def setUp(self):
+        self.time_to_event = [5, 3, 9, 1, 7, 2]
+        self.event_status = [1, 0, 1, 1, 0, 1]
+
+    def test_arrays_sorted_together(self):
+        survival_data = SurvivalData(self.time_to_event, self.event_status)
+        self.assertEqual(survival_data.time_to_event.tolist(), [1, 2, 3, 5, 7, 9])
+        self.assertEqual(survival_data.event_status.tolist(), [1, 1, 0, 1, 0, 1])
+        self.assertEqual(survival_data.n_events, 4)
+
+    def test_missing_event_status_treated_as_events(self):
+        survival_data = SurvivalData(self.time_to_event, [])
+        self.assertFalse(survival_data.has_event_status)
+        self.assertEqual(survival_data.n_events, len(self.time_to_event))
+
+    def test_kaplan_meier_fitted_once(self):
+        survival_data = SurvivalData(self.time_to_event, self.event_status)
+        with patch('view.survival_data.kaplan_meier_from_life_table', wraps=kaplan_meier_from_life_table) as mock_km:
+            calculate_survival_metrics(survival_data)
+            generate_visualizations(survival_data, 'weibull', (1.5, 5.0))
+            kaplan_meier_to_dict(survival_data)
+            self.assertEqual(mock_km.call_count, 1)
+
+    def test_mismatched_lengths_rejected(self):
+        with self.assertRaises(ValueError):
+            SurvivalData([1, 2, 3], [1, 0])
+
+
+class LikelihoodTests(TestCase):
+    def setUp(self):
+        from scipy import stats
+        rng = np.random.default_rng(1)
+        self.time_to_event = rng.weibull(1.3, 200) * 50 + 0.5
+        self.event_status = (rng.random(200) < 0.7).astype(float)
+        self.cases = {
+            "weibull": (stats.weibull_min, (1.3, 40.0)),
+            "exponential": (stats.expon, (40.0,)),
+            "lognormal": (stats.lognorm, (0.9, 35.0)),
+            "gamma": (stats.gamma, (1.6, 25.0)),
+            "loglogistic": (stats.fisk, (1.8, 35.0)),
+        }
+
+    def _scipy_log_likelihood(self, dist, params, event_status):
+        shape, scale = params[:-1], params[-1]
+        logpdf = dist.logpdf(self.time_to_event, *shape, scale=scale)
+        if event_status is None:
+            return np.sum(logpdf)
+        logsf = dist.logsf(self.time_to_event, *shape, scale=scale)
+        return np.sum(event_status * logpdf + (1 - event_status) * logsf)
+
+    def test_log_likelihood_matches_scipy(self):
+        for name, (dist, params) in self.cases.items():
+            for event_status in (None, self.event_status):
+                ll, _ = LIKELIHOODS[name](self.time_to_event, params, event_status)
+                expected = self._scipy_log_likelihood(dist, params, event_status)
+                self.assertAlmostEqual(ll, expected, places=6, msg=name)
+
+    def test_gradient_matches_finite_difference(self):
+        from scipy.optimize import approx_fprime
+        for name, (dist, params) in self.cases.items():
+            for event_status in (None, self.event_status):
+                _, grad = LIKELIHOODS[name](self.time_to_event, params, event_status)
+                numeric = approx_fprime(np.array(params),
+                                        lambda p: self._scipy_log_likelihood(dist, p, event_status), 1e-6)
+                np.testing.assert_allclose(grad, numeric, rtol=1e-4, atol=1e-3, err_msg=name)
+
+
+class FastPathFitTests(TestCase):
+    def setUp(self):
+        self.time_to_event, self.event_status = weibull_sample(np.random.default_rng(2), 500)
+
+    def test_exponential_closed_form(self):
+        _, _, params, fit_info = calculate_aic(self.time_to_event, "exponential", self.event_status, return_info=True)
+        expected = np.sum(self.time_to_event) / np.sum(self.event_status)
+        self.assertAlmostEqual(params[0], expected)
+        self.assertEqual(fit_info['method'], 'closed_form')
+        self.assertEqual(fit_info['iterations'], 0)
+
+    def test_profiled_fits_match_general_optimizer(self):
+        cases = [("weibull", self.event_status), ("weibull", None), ("gamma", None), ("lognormal", None)]
+        for dist, event_status in cases:
+            aic, _, params, fit_info = calculate_aic(self.time_to_event, dist, event_status, return_info=True)
+            self.assertIn(fit_info['method'], ('profile', 'closed_form'))
+            opt_params, opt_ll = fit_distribution(self.time_to_event, dist, event_status)
+            self.assertLessEqual(aic, 2 * len(opt_params) - 2 * opt_ll + 1e-6, msg=dist)
+            np.testing.assert_allclose(params, opt_params, rtol=1e-3, err_msg=dist)
+
+    def test_falls_back_to_optimizer_with_iteration_count(self):
+        _, _, _, fit_info = calculate_aic(self.time_to_event, "loglogistic", self.event_status, return_info=True)
+        self.assertEqual(fit_info['method'], 'optimizer')
+        self.assertGreater(fit_info['iterations'], 0)
+
+
+class ParallelFittingTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.time_to_event = rng.weibull(1.3, 300) * 50 + 0.5
+        self.event_status = (rng.random(300) < 0.7).astype(int)
+        invalidate_fit_cache()
+
+    def test_pool_matches_serial_fits(self):
+        serial = {dist: evaluate_distribution(self.time_to_event, self.event_status, dist) for dist in DISTRIBUTIONS}
+        with patch('view.fitting.PARALLEL_FIT_MIN_SIZE', 0):
+            pooled = fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+        self.assertEqual(list(pooled), DISTRIBUTIONS)
+        for dist in DISTRIBUTIONS:
+            self.assertAlmostEqual(pooled[dist]['aic'], serial[dist]['aic'], places=6)
+
+    def test_timed_out_fits_recycle_the_pool(self):
+        self.addCleanup(shutdown_fit_executor)
+        executor = get_fit_executor()
+        with patch('view.fitting.PARALLEL_FIT_MIN_SIZE', 0):
+            executor.submit(int).result(timeout=60)
+            processes = list(executor._processes.values())
+            # Every pool process is busy, so all the fits are still waiting or running at the deadline
+            for _ in processes:
+                executor.submit(time.sleep, 60)
+            results = fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS, timeout=0)
+        self.assertTrue(all('exceeded' in results[dist]['error'] for dist in DISTRIBUTIONS))
+        for process in processes:
+            process.join(timeout=10)
+            self.assertFalse(process.is_alive())
+        self.assertIsNot(get_fit_executor(), executor)
+
+    def test_predicted_distribution_reuses_all_results(self):
+        all_results = fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+        with patch('view.fitting.calculate_aic') as mock_aic:
+            message, aic, bic, params, goodness_of_fit = handle_predictions("Distribusi: Weibull", all_results)
+            mock_aic.assert_not_called()
+        self.assertEqual(message, "weibull")
+        self.assertEqual(aic, all_results['weibull']['aic'])
+        self.assertEqual(params, all_results['weibull']['params'])
+        self.assertTrue(goodness_of_fit.startswith("Uji Kolmogorov-Smirnov"))
+
+
+class LifeTableTests(TestCase):
+    def setUp(self):
+        self.time_to_event, self.event_status = weibull_sample(np.random.default_rng(5), 2000)
+
+    def test_ties_are_compressed(self):
+        survival_data = SurvivalData(self.time_to_event, self.event_status)
+        self.assertEqual(len(survival_data), 2000)
+        self.assertEqual(len(survival_data.unique_times), len(np.unique(self.time_to_event)))
+        self.assertLessEqual(len(survival_data.time_to_event), 2 * len(survival_data.unique_times))
+        self.assertEqual(survival_data.n_events, self.event_status.sum())
+
+    def test_weighted_fits_match_raw_rows(self):
+        survival_data = SurvivalData(self.time_to_event, self.event_status)
+        raw_results = evaluate_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+        compressed_results = evaluate_distributions(survival_data.time_to_event, survival_data.event_status,
+                                                    DISTRIBUTIONS, survival_data.weights)
+        for dist in DISTRIBUTIONS:
+            raw, compressed = raw_results[dist], compressed_results[dist]
+            self.assertAlmostEqual(raw['aic'], compressed['aic'], places=4, msg=dist)
+            self.assertAlmostEqual(raw['ks_stat'], compressed['ks_stat'], places=10, msg=dist)
+
+    def test_weighted_kaplan_meier_matches_raw_rows(self):
+        survival_data = SurvivalData(self.time_to_event, self.event_status)
+        raw = calculate_kaplan_meier(self.time_to_event, self.event_status)
+        np.testing.assert_allclose(survival_data.kaplan_meier.survival_function, raw.survival_function)
+
+    def test_from_life_table_matches_raw_input(self):
+        survival_data = SurvivalData(self.time_to_event, self.event_status)
+        from_table = SurvivalData.from_life_table(
+            survival_data.unique_times, survival_data.event_counts, survival_data.censored_counts
+        )
+        np.testing.assert_array_equal(from_table.weights, survival_data.weights)
+        np.testing.assert_array_equal(from_table.event_status, survival_data.event_status)
+
+    @patch('dino_chatbot.views.ask_openai', return_value="weibull")
+    @patch('view.helper.ask_openai_gpt', return_value="interpretasi")
+    def test_get_survival_accepts_life_table(self, mock_gpt, mock_openai):
+        life_table = {"time": [2, 4, 4, 7, 9], "events": [3, 2, 1, 4, 1], "censored": [0, 1, 0, 2, 3]}
+        response = self.client.post(
+            reverse('get_survival'),
+            data=json.dumps({"life_table": life_table}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['predicted_distribution'], 'weibull')
+        self.assertIsNotNone(data['all_distributions_results']['weibull']['aic'])
+        self.assertEqual(data['kaplan_meier']['timeline'], [0.0, 2.0, 4.0, 7.0, 9.0])
+
+    def test_parse_life_table_validates_counts(self):
+        times, events, censored = parse_life_table(
+            {"life_table": {"time": [1, 2, 3], "events": [2, 1.0, None], "censored": ["1", "", 0]}})
+        self.assertEqual((events, censored), ([2, 1, 0], [1, 0, 0]))
+        for events in ([2, 1.5, 1], [2, -1, 1], [2, "many", 1], [2, True, 1]):
+            with self.assertRaises(ValueError, msg=events):
+                parse_life_table({"life_table": {"time": [1, 2, 3], "events": events}})
+
+    def test_get_survival_rejects_invalid_life_table_counts(self):
+        for events in ([3, 2.5, 1], [3, -2, 1]):
+            response = self.client.post(
+                reverse('get_survival'),
+                data=json.dumps({"life_table": {"time": [2, 4, 7], "events": events, "censored": [0, 1, 0]}}),
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400, events)
+            self.assertIn('whole numbers', response.json()['error'])
+        # Counts that pass parsing but not SurvivalData are a client error too
+        with patch('dino_chatbot.views.parse_life_table', return_value=([2, 4], [3, -1], [0, 0])):
+            response = self.client.post(reverse('get_survival'), data=json.dumps({"life_table": {}}),
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], "Event and censored counts must be non-negative")
+
+
+class SurvivalBatchTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(6)
+        self.cohorts = []
+        for i in range(3):
+            time_to_event, event_status = weibull_sample(rng, 80)
+            self.cohorts.append({"name": f"cohort-{i}", "time_to_event": time_to_event.tolist(),
+                                 "event_status": event_status.tolist()})
+
+    def _post(self, payload):
+        return self.client.post(reverse('get_survival_batch'), data=json.dumps(payload),
+                                content_type='application/json')
+
+    @patch('dino_chatbot.views.ask_openai')
+    @patch('dino_chatbot.views.generate_visualizations')
+    def test_batch_without_plots_or_interpretation(self, mock_viz, mock_openai):
+        cohorts = self.cohorts + [{"name": "too-small", "time_to_event": [4]}]
+        response = self._post({"cohorts": cohorts, "plots": False, "interpretation": False})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['count'], 4)
+        self.assertEqual([r['name'] for r in data['results']], ["cohort-0", "cohort-1", "cohort-2", "too-small"])
+        for result in data['results'][:3]:
+            self.assertIn(result['best_distribution'], DISTRIBUTIONS)
+            self.assertIn('kaplan_meier', result)
+            self.assertNotIn('kaplan_meier_plot', result)
+        self.assertIn('error', data['results'][3])
+        mock_viz.assert_not_called()
+        mock_openai.assert_not_called()
+
+    @patch('dino_chatbot.views.ask_openai')
+    @patch('dino_chatbot.views.generate_visualizations')
+    def test_batch_flags_accept_strings(self, mock_viz, mock_openai):
+        response = self._post({"cohorts": self.cohorts[:1], "plots": "false", "interpretation": "0"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(reverse('get_survival_batch') + '?plots=no&interpretation=false',
+                                    data=json.dumps({"cohorts": self.cohorts[:1]}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('kaplan_meier_plot', response.json()['results'][0])
+        mock_viz.assert_not_called()
+        mock_openai.assert_not_called()
+
+    @patch('dino_chatbot.views.generate_interpretation', return_value="interpretation")
+    @patch('dino_chatbot.views.ask_openai')
+    def test_batch_runs_cohort_llm_calls_concurrently(self, mock_openai, mock_interpretation):
+        # Every cohort's call has to be in flight at once for the barrier to open
+        barrier = threading.Barrier(len(self.cohorts), timeout=10)
+
+        def predict(message):
+            barrier.wait()
+            return "weibull"
+
+        mock_openai.side_effect = predict
+        response = self._post({"cohorts": self.cohorts, "plots": False})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['name'] for r in results], ["cohort-0", "cohort-1", "cohort-2"])
+        for result in results:
+            self.assertEqual(result['interpretation'], "interpretation")
+            self.assertIn('hasil_uji_goodness_of_fit', result)
+        self.assertEqual(mock_openai.call_count, len(self.cohorts))
+
+    @patch('dino_chatbot.views.ask_openai')
+    def test_batch_skips_summary_statistics_without_interpretation(self, mock_openai):
+        with patch.object(SurvivalData, 'summary_statistics') as mock_summary:
+            response = self._post({"cohorts": self.cohorts, "plots": False, "interpretation": False})
+        self.assertEqual(response.status_code, 200)
+        mock_summary.assert_not_called()
+        mock_openai.assert_not_called()
+
+    def test_batch_results_match_single_cohort_fit(self):
+        response = self._post({"cohorts": self.cohorts[:1], "plots": False, "interpretation": False})
+        result = json.loads(response.content)['results'][0]
+        survival_data = SurvivalData(self.cohorts[0]['time_to_event'], self.cohorts[0]['event_status'])
+        expected = fit_distributions(survival_data.time_to_event, survival_data.event_status,
+                                     DISTRIBUTIONS, weights=survival_data.weights)
+        for dist in DISTRIBUTIONS:
+            self.assertAlmostEqual(result['all_distributions_results'][dist]['aic'], expected[dist]['aic'])
+
+    def test_batch_rejects_missing_cohorts(self):
+        self.assertEqual(self._post({"cohorts": []}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('get_survival_batch')).status_code, 405)
+
+
+class FitCacheTests(TestCase):
+    def setUp(self):
+        self.time_to_event, self.event_status = weibull_sample(np.random.default_rng(7), 300)
+        invalidate_fit_cache()
+        reset_fit_cache_stats()
+
+    def test_repeat_analysis_skips_fitting(self):
+        first = fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+        with patch('view.fitting.calculate_aic') as mock_aic:
+            second = fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+            mock_aic.assert_not_called()
+        for dist in DISTRIBUTIONS:
+            self.assertEqual(first[dist]['aic'], second[dist]['aic'])
+        stats = fit_cache_stats()
+        self.assertEqual(stats['misses'], len(DISTRIBUTIONS))
+        self.assertEqual(stats['local_hits'], len(DISTRIBUTIONS))
+
+    def test_digest_ignores_row_order_and_compression(self):
+        order = np.random.default_rng(0).permutation(len(self.time_to_event))
+        survival_data = SurvivalData(self.time_to_event, self.event_status)
+        digest = dataset_digest(self.time_to_event, self.event_status)
+        self.assertEqual(digest, dataset_digest(self.time_to_event[order], self.event_status[order]))
+        self.assertEqual(digest, dataset_digest(survival_data.time_to_event, survival_data.event_status,
+                                                survival_data.weights))
+        self.assertNotEqual(digest, dataset_digest(self.time_to_event, 1 - self.event_status))
+
+    def test_invalidation_forces_refit(self):
+        fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+        invalidate_fit_cache(self.time_to_event, self.event_status, distribution='weibull')
+        with patch('view.fitting.calculate_aic', wraps=calculate_aic) as mock_aic:
+            fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+            self.assertEqual(mock_aic.call_count, 1)
+        invalidate_fit_cache()
+        with patch('view.fitting.calculate_aic', wraps=calculate_aic) as mock_aic:
+            fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+            self.assertEqual(mock_aic.call_count, len(DISTRIBUTIONS))
+
+    def test_local_hits_skip_the_shared_cache(self):
+        shared = caches['default']
+        fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+        with patch.object(shared, 'get', wraps=shared.get) as mock_get, \
+                patch.object(shared, 'get_many', wraps=shared.get_many) as mock_get_many:
+            fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+            mock_get.assert_not_called()
+            mock_get_many.assert_not_called()
+        self.assertEqual(fit_cache_stats()['local_hits'], len(DISTRIBUTIONS))
+
+        # Another worker's full invalidation is seen once the generation is read again
+        shared.incr('fit-cache:generation')
+        with patch('view.fit_cache.time.monotonic', return_value=time.monotonic() + FIT_CACHE_GENERATION_TTL), \
+                patch('view.fitting.calculate_aic', wraps=calculate_aic) as mock_aic:
+            fit_distributions(self.time_to_event, self.event_status, DISTRIBUTIONS)
+            self.assertEqual(mock_aic.call_count, len(DISTRIBUTIONS))
+
+
+class GoodnessOfFitTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.time_to_event = np.round(rng.weibull(1.5, 400) * 30, 1) + 0.1
+        self.fitted = {'weibull': (1.5, 30.0), 'exponential': (27.0,), 'lognormal': (0.7, 22.0)}
+        self.frozen = {'weibull': stats.weibull_min(1.5, scale=30.0), 'exponential': stats.expon(scale=27.0),
+                       'lognormal': stats.lognorm(0.7, scale=22.0)}
+
+    def test_statistics_match_scipy(self):
+        results = evaluate_goodness_of_fit_all(self.time_to_event, self.fitted)
+        x = np.sort(self.time_to_event)
+        n = len(x)
+        i = np.arange(1, n + 1)
+        for dist, frozen in self.frozen.items():
+            ks = stats.kstest(self.time_to_event, frozen.cdf)
+            cvm = stats.cramervonmises(self.time_to_event, frozen.cdf)
+            ad = -n - np.sum((2 * i - 1) * (frozen.logcdf(x) + frozen.logsf(x[::-1]))) / n
+            self.assertAlmostEqual(results[dist]['ks_stat'], ks.statistic, places=10, msg=dist)
+            self.assertAlmostEqual(results[dist]['p_value'], ks.pvalue, places=10, msg=dist)
+            self.assertAlmostEqual(results[dist]['cramer_von_mises'], cvm.statistic, places=8, msg=dist)
+            self.assertAlmostEqual(results[dist]['anderson_darling'], ad, places=8, msg=dist)
+
+    def test_weighted_sample_matches_raw_rows(self):
+        survival_data = SurvivalData(self.time_to_event)
+        raw = evaluate_goodness_of_fit_all(self.time_to_event, self.fitted)
+        compressed = evaluate_goodness_of_fit_all(survival_data.time_to_event, self.fitted, survival_data.weights)
+        for dist in self.fitted:
+            for key in ('ks_stat', 'p_value', 'anderson_darling', 'cramer_von_mises'):
+                self.assertAlmostEqual(raw[dist][key], compressed[dist][key], places=8, msg=f"{dist} {key}")
+
+    def test_sample_sorted_once_for_all_candidates(self):
+        with patch('view.goodness_of_fit.np.unique', wraps=np.unique) as mock_unique:
+            results = evaluate_distributions(self.time_to_event, None, DISTRIBUTIONS)
+            self.assertEqual(mock_unique.call_count, 1)
+        for dist in DISTRIBUTIONS:
+            self.assertIn('anderson_darling', results[dist])
+
+
+class KaplanMeierTests(TestCase):
+    def setUp(self):
+        self.time_to_event, self.event_status = weibull_sample(np.random.default_rng(13), 500, 1.2, 40, event_rate=0.6)
+
+    def test_matches_lifelines(self):
+        from lifelines import KaplanMeierFitter, NelsonAalenFitter
+        reference = KaplanMeierFitter(alpha=0.05).fit(self.time_to_event, event_observed=self.event_status)
+        nelson_aalen = NelsonAalenFitter(nelson_aalen_smoothing=False).fit(
+            self.time_to_event, event_observed=self.event_status
+        )
+        kmf = calculate_kaplan_meier(self.time_to_event, self.event_status)
+
+        np.testing.assert_allclose(kmf.timeline, reference.timeline)
+        np.testing.assert_allclose(kmf.survival_function, reference.survival_function_.values.flatten())
+        np.testing.assert_allclose(kmf.confidence_interval, reference.confidence_interval_.values)
+        np.testing.assert_allclose(kmf.cumulative_hazard, nelson_aalen.cumulative_hazard_.values.flatten())
+        self.assertEqual(kmf.median_survival_time, reference.median_survival_time_)
+
+    def test_curve_that_stays_above_half_has_infinite_median(self):
+        kmf = calculate_kaplan_meier([1, 2, 3, 4], [1, 0, 0, 0])
+        self.assertEqual(kmf.survival_function[-1], 0.75)
+        self.assertEqual(kmf.median_survival_time, np.inf)
+
+    def test_plain_greenwood_band_contains_estimate(self):
+        survival_data = SurvivalData(self.time_to_event, self.event_status)
+        kmf = kaplan_meier_from_life_table(survival_data.unique_times, survival_data.event_counts,
+                                           survival_data.censored_counts, ci_method="greenwood")
+        self.assertTrue(np.all(kmf.confidence_interval[:, 0] <= kmf.survival_function + 1e-12))
+        self.assertTrue(np.all(kmf.confidence_interval[:, 1] >= kmf.survival_function - 1e-12))
+
+
+class ImportTimeTests(TestCase):
+    # Importing the views must stay cheap; scipy, matplotlib and openai load on first use
+    IMPORT_BUDGET_SECONDS = 1.0
+    HEAVY_MODULES = ['matplotlib', 'scipy', 'pandas', 'lifelines', 'openai']
+
+    def test_views_import_within_budget_without_heavy_modules(self):
+        code = (
+            "import json, sys, time, django\n"
+            "django.setup()\n"
+            "start = time.perf_counter()\n"
+            "import dino_chatbot.views, dino_chatbot.urls\n"
+            "elapsed = time.perf_counter() - start\n"
+            f"print(json.dumps([elapsed, [m for m in {self.HEAVY_MODULES!r} if m in sys.modules]]))\n"
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='dino_gpt.settings')
+        result = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env,
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        elapsed, loaded = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(loaded, [])
+        self.assertLess(elapsed, self.IMPORT_BUDGET_SECONDS)
+
+    def test_warmup_loads_heavy_modules(self):
+        from view.warmup import warmup
+        warmup(freeze=False)
+        for module in ('matplotlib.figure', 'scipy.stats', 'scipy.optimize', 'openai'):
+            self.assertIn(module, sys.modules)
+
+    def test_warmup_leaves_templates_to_each_thread(self):
+        from view.warmup import warmup
+        # Start from no templates: this thread's from other tests are closed, and those of
+        # finished threads are only dropped once collected
+        clear_templates()
+        gc.collect()
+        figures = open_figure_count()
+        warmup(freeze=False)
+        # The warmup's own templates are closed; request threads build theirs on first use
+        self.assertEqual(open_figure_count(), figures)
+        barrier = threading.Barrier(2)
+
+        def template(_):
+            built = get_template('hazard')
+            # Both threads hold their template at once, so neither can be handed the other's
+            barrier.wait(timeout=30)
+            return built
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first, second = pool.map(template, range(2))
+            self.assertIsNot(first, second)
+
+
+class RenderDataTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        time_to_event, event_status = weibull_sample(np.random.default_rng(17), 120, 1.4, 30)
+        self.payload = {"time_to_event": time_to_event.tolist(), "event_status": event_status.tolist()}
+
+    @patch('view.helper.ask_openai_gpt', return_value="interpretasi")
+    @patch('dino_chatbot.views.ask_openai', return_value="weibull")
+    def test_render_data_skips_matplotlib(self, mock_openai, mock_gpt):
+        with patch('view.figure_templates.plot_to_bytes') as mock_render:
+            response = self.client.post(reverse('get_survival') + '?render=data', json.dumps(self.payload),
+                                        content_type='application/json')
+            mock_render.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIsNone(data['kaplan_meier_plot'])
+        plot_data = data['plot_data']
+        self.assertEqual(plot_data['distribution'], data['best_distribution'])
+        self.assertEqual(plot_data['kaplan_meier']['time'], data['kaplan_meier']['timeline'])
+        self.assertEqual(len(plot_data['kaplan_meier']['ci_lower']), len(plot_data['kaplan_meier']['time']))
+        self.assertEqual(len(plot_data['survival_curve']['survival']), 200)
+        self.assertEqual(len(plot_data['hazard_curve']['hazard']), 200)
+
+    def test_png_mode_draws_the_same_series(self):
+        survival_data = SurvivalData(self.payload["time_to_event"], self.payload["event_status"])
+        visualizations = generate_visualizations(survival_data, 'weibull', (1.4, 30.0))
+        self.assertNotIn('plot_data', visualizations)
+        for key in ('kaplan_meier_plot', 'hazard_plot', 'survival_plot', 'survival_function'):
+            self.assertIsInstance(visualizations[key], str)
+
+    def test_unknown_render_mode_rejected(self):
+        response = self.client.post(reverse('get_survival'), json.dumps({**self.payload, "render": "svg"}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class FigureTemplateTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(19)
+        censored = SurvivalData(*weibull_sample(rng, 300, 0.9, 20, event_rate=0.5))
+        complete = SurvivalData(np.round(rng.weibull(1.6, 80) * 40) + 1)
+        self.first = survival_plot_data(censored, 'lognormal', (1.0, 20.0))
+        self.second = survival_plot_data(complete, 'weibull', (1.6, 40.0))
+
+    def test_reused_template_matches_fresh_figure(self):
+        for kind in ('hazard', 'kaplan_meier', 'survival_comparison', 'survival_function'):
+            fresh = render_plot(kind, self.second, reuse=False)
+            render_plot(kind, self.first, reuse=True)
+            self.assertEqual(render_plot(kind, self.second, reuse=True), fresh, kind)
+
+    def test_descriptive_templates_drop_previous_artists(self):
+        fresh = render_plot('boxplot', box_statistics([1.0, 2.0, 2.5, 9.0]), reuse=False)
+        render_plot('boxplot', box_statistics(list(range(100))), reuse=True)
+        self.assertEqual(render_plot('boxplot', box_statistics([1.0, 2.0, 2.5, 9.0]), reuse=True), fresh)
+        fresh = render_plot('barchart', (['x', 'y'], [4, 1]), reuse=False)
+        render_plot('barchart', (['a', 'b', 'c'], [1, 2, 3]), reuse=True)
+        self.assertEqual(render_plot('barchart', (['x', 'y'], [4, 1]), reuse=True), fresh)
+
+    def test_template_built_once_per_worker(self):
+        self.assertIs(get_template('kaplan_meier'), get_template('kaplan_meier'))
+
+
+class ConcurrentRenderTests(TestCase):
+    def test_parallel_renders_are_byte_identical(self):
+        import matplotlib
+        rng = np.random.default_rng(23)
+        cohorts = [
+            survival_plot_data(SurvivalData(*weibull_sample(rng, 150, shape, 30)), 'weibull', (shape, 30.0))
+            for shape in (0.8, 1.6)
+        ]
+        jobs = [(kind, data, reuse) for kind in ('hazard', 'kaplan_meier', 'survival_comparison', 'survival_function')
+                for data in cohorts for reuse in (False, True)]
+        jobs += [('histogram', histogram_counts(rng.normal(10, 2, 200)), False), ('barchart', (['a', 'b'], [3, 4]), True)]
+        rc_before = dict(matplotlib.rcParams)
+        expected = [render_plot(*job) for job in jobs]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for _ in range(2):
+                order = rng.permutation(len(jobs))
+                rendered = list(executor.map(lambda index: render_plot(*jobs[index]), order))
+                for index, image in zip(order, rendered):
+                    self.assertEqual(image, expected[index], jobs[index][0])
+        self.assertEqual(dict(matplotlib.rcParams), rc_before)
+
+
+class RenderPoolTests(TestCase):
+    def setUp(self):
+        self.survival_data = SurvivalData(*weibull_sample(np.random.default_rng(29), 200, 1.2, 40))
+        self.addCleanup(shutdown_render_executor)
+
+    def test_pool_matches_serial_renders(self):
+        serial = generate_visualizations(self.survival_data, 'weibull', (1.2, 40.0))
+        with patch('view.rendering.RENDER_POOL_SIZE', 2):
+            pooled = generate_visualizations(self.survival_data, 'weibull', (1.2, 40.0))
+        self.assertEqual(pooled, serial)
+        self.assertIsNotNone(pooled['hazard_plot'])
+
+    def test_timed_out_render_returns_none(self):
+        plot_data = survival_plot_data(self.survival_data, 'weibull', (1.2, 40.0))
+        with patch('view.rendering.RENDER_POOL_SIZE', 2):
+            executor = get_render_executor()
+            self.assertEqual(executor._mp_context.get_start_method(), 'forkserver')
+            executor.submit(int).result(timeout=60)
+            processes = list(executor._processes.values())
+            images = render_plots([('kaplan_meier', plot_data), ('survival_function', plot_data)], timeout=0)
+        self.assertEqual(images, [None, None])
+        # The renders still running cannot be cancelled, so the pool was killed and is rebuilt on next use
+        for process in processes:
+            process.join(timeout=10)
+            self.assertFalse(process.is_alive())
+        self.assertIsNot(get_render_executor(), executor)
+
+
+class PlotStoreTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.store_dir = use_plot_store(self)
+        self.survival_data = SurvivalData(*weibull_sample(np.random.default_rng(31), 150, 1.1, 20))
+
+    def test_url_mode_serves_the_png_mode_image(self):
+        png = generate_visualizations(self.survival_data, 'weibull', (1.1, 20.0))
+        urls = generate_visualizations(self.survival_data, 'weibull', (1.1, 20.0), render="url")
+        for key in ('kaplan_meier_plot', 'hazard_plot', 'survival_plot', 'survival_function'):
+            self.assertTrue(urls[key].startswith('/plots/'))
+            response = self.client.get(urls[key])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'image/png')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertEqual(response.content, base64.b64decode(png[key]))
+
+    def test_identical_plots_render_once(self):
+        first = generate_visualizations(self.survival_data, 'weibull', (1.1, 20.0), render="url")
+        second = generate_visualizations(self.survival_data, 'weibull', (1.1, 20.0), render="url")
+        self.assertEqual(first, second)
+        self.assertNotEqual(first['kaplan_meier_plot'],
+                            generate_visualizations(self.survival_data, 'weibull', (1.2, 20.0),
+                                                    render="url")['kaplan_meier_plot'])
+
+        with patch('view.plot_store.render_image', wraps=render_image) as mock_render:
+            etag = self.client.get(first['survival_plot'])['ETag']
+            # Another worker: nothing in its memory LRU, the PNG comes from the shared directory
+            with patch.dict('view.plot_store._memory', clear=True):
+                self.assertEqual(self.client.get(first['survival_plot']).status_code, 200)
+            self.assertEqual(mock_render.call_count, 1)
+        not_modified = self.client.get(first['survival_plot'], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+    def test_statistics_url_mode(self):
+        response = self.client.post(reverse('get_statistics'), json.dumps(
+            {"variable": "x", "data": [1, 2, 2, 3, 5, 8], "render": "url"}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        image = self.client.get(response.json()['histogram'])
+        self.assertEqual(image.status_code, 200)
+        invalid = self.client.post(reverse('get_statistics'), json.dumps(
+            {"variable": "x", "data": [1, 2], "render": "data"}), content_type='application/json')
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_unknown_and_evicted_plots_are_404(self):
+        self.assertEqual(self.client.get('/plots/hazard/standard/' + '0' * 64 + '.png').status_code, 404)
+        self.assertEqual(self.client.get('/plots/unknown/standard/' + '0' * 64 + '.png').status_code, 404)
+        self.assertEqual(self.client.get('/plots/hazard/poster/' + '0' * 64 + '.png').status_code, 404)
+        url = plot_url('barchart', (['a', 'b'], [1, 2]))
+        # A digest is only served as the kind of plot it was stored for
+        self.assertEqual(self.client.get(url.replace('/barchart/', '/boxplot/')).status_code, 404)
+        survival_url = generate_visualizations(self.survival_data, 'weibull', (1.1, 20.0), render="url")['hazard_plot']
+        self.assertEqual(self.client.get(survival_url.replace('/hazard/', '/histogram/')).status_code, 404)
+        prune_plot_store(max_bytes=0)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        # "*" is not the plot's ETag, so an evicted plot is still a 404 and not a 304
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='*').status_code, 404)
+
+    def test_url_mode_needs_a_plot_store(self):
+        url = plot_url('barchart', (['a', 'b'], [1, 2]))
+        with override_settings(PLOT_STORE_DIR=''):
+            response = self.client.post(reverse('get_statistics'), json.dumps(
+                {"variable": "x", "data": [1, 2, 3], "render": "url"}), content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['error'], "'render' must be one of png.")
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_store_stays_within_budget(self):
+        for index in range(20):
+            plot_url('histogram', histogram_counts(np.arange(index * 50, index * 50 + 200), bins=200))
+        prune_plot_store(max_bytes=20000)
+        self.assertLessEqual(sum(os.path.getsize(os.path.join(self.store_dir, name))
+                                 for name in os.listdir(self.store_dir)), 20000)
+
+
+class KaplanMeierDownsampleTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(37)
+        self.survival_data = SurvivalData(rng.weibull(1.3, 20000) * 100, (rng.random(20000) < 0.7).astype(int))
+        self.kmf = self.survival_data.kaplan_meier
+
+    def _step_error(self, keep, values):
+        # Each point is drawn at the value of the last kept point at or before it
+        drawn = values[keep[np.searchsorted(keep, np.arange(len(values)), side='right') - 1]]
+        return np.max(np.abs(values - drawn))
+
+    def test_short_curves_are_untouched(self):
+        survival_data = SurvivalData([1, 2, 2, 3, 5, 8, 13], [1, 1, 0, 1, 1, 0, 1])
+        self.assertEqual(kaplan_meier_to_dict(survival_data, max_points=10)['timeline'],
+                         survival_data.kaplan_meier.timeline.tolist())
+
+    def test_decimation_stays_within_tolerance(self):
+        keep = self.kmf.downsample(5000, tolerance=0.001)
+        self.assertLessEqual(len(keep), 5000)
+        self.assertEqual(keep[0], 0)
+        self.assertEqual(keep[-1], len(self.kmf.timeline) - 1)
+        self.assertLess(self._step_error(keep, self.kmf.survival_function), 0.001)
+        self.assertLess(self._step_error(keep, self.kmf.confidence_interval[:, 0]), 0.001)
+        self.assertLess(self._step_error(keep, self.kmf.confidence_interval[:, 1]), 0.001)
+
+    def test_significant_drops_are_kept(self):
+        survival = np.concatenate([np.linspace(1, 0.9, 1000), [0.5], np.linspace(0.5, 0.45, 1000)])
+        keep = downsample_steps([survival], 50, tolerance=0.01)
+        self.assertIn(1000, keep)
+        self.assertLessEqual(len(keep), 50)
+
+    def test_max_points_bounds_json_and_plot_data(self):
+        plot_data = survival_plot_data(self.survival_data, 'weibull', (1.3, 100.0), max_points=300)
+        serialized = kaplan_meier_to_dict(self.survival_data, max_points=300)
+        self.assertLessEqual(len(serialized['timeline']), 300)
+        self.assertEqual(len(serialized['confidence_interval']), 2 * len(serialized['timeline']))
+        np.testing.assert_allclose(plot_data['kaplan_meier']['time'], serialized['timeline'], rtol=1e-5)
+
+    def test_invalid_max_points_rejected(self):
+        response = Client().post(reverse('get_survival'), json.dumps({
+            "time_to_event": [1, 2, 3], "event_status": [1, 1, 0], "max_points": 2}),
+            content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class DistributionRegistryTests(TestCase):
+    PARAMS = {
+        'weibull': (0.7, 5.0), 'exponential': (4.0,), 'lognormal': (1.2, 3.0),
+        'gamma': (0.6, 4.0), 'loglogistic': (1.5, 2.0), 'pareto': (2.0, 1.5),
+    }
+
+    def test_registry_covers_every_distribution(self):
+        self.assertEqual(list(REGISTRY), DISTRIBUTIONS)
+
+    def test_kernels_match_scipy(self):
+        t = np.logspace(-3, 3, 200)
+        for name, params in self.PARAMS.items():
+            distribution, frozen = REGISTRY[name], REGISTRY[name].frozen(params)
+            values = distribution.evaluate(t, params)
+            np.testing.assert_allclose(values['pdf'], frozen.pdf(t), rtol=1e-10, atol=1e-300, err_msg=name)
+            np.testing.assert_allclose(values['sf'], frozen.sf(t), rtol=1e-10, atol=1e-14, err_msg=name)
+            self.assertEqual(distribution.sf(0.0, params), 1.0, name)
+
+    def test_hazard_is_finite_in_the_far_tail(self):
+        t = np.array([1e4, 1e6])
+        frozen = REGISTRY['lognormal'].frozen((0.2, 1.0))
+        with np.errstate(invalid='ignore'):
+            self.assertTrue(np.all(np.isnan(frozen.pdf(t) / frozen.sf(t))))
+        hazard = REGISTRY['lognormal'].hazard(t, (0.2, 1.0))
+        self.assertTrue(np.all(np.isfinite(hazard)))
+        # Lognormal hazard tends to log(t) / (sigma^2 t)
+        np.testing.assert_allclose(hazard, np.log(t) / (0.04 * t), rtol=0.05)
+
+    def test_curves_are_evaluated_once_per_request(self):
+        survival_data = SurvivalData([2, 3, 3, 5, 8, 13, 21], [1, 1, 0, 1, 1, 0, 1])
+        with patch.object(SurvivalDistribution, 'evaluate', autospec=True,
+                          side_effect=SurvivalDistribution.evaluate) as mock_evaluate:
+            plot_data = survival_plot_data(survival_data, 'weibull', (1.2, 8.0))
+            curves = survival_data.model_curves('weibull', (1.2, 8.0))
+            self.assertEqual(mock_evaluate.call_count, 1)
+        self.assertEqual(plot_data['param_text'], "Weibull Parameters:\nShape (c): 1.200\nScale (λ): 8.000")
+        self.assertEqual(len(curves.summary_points()), 10)
+        self.assertAlmostEqual(curves.median, stats.weibull_min(1.2, scale=8.0).median())
+
+
+class AggregatePlotTests(TestCase):
+    def test_box_statistics_match_matplotlib(self):
+        from matplotlib import cbook
+        values = np.random.default_rng(41).standard_t(3, 500)
+        expected = cbook.boxplot_stats(values)[0]
+        box = box_statistics(values)
+        for key in ('med', 'q1', 'q3', 'whislo', 'whishi'):
+            self.assertAlmostEqual(box[key], expected[key])
+        self.assertEqual(box['fliers'], expected['fliers'].tolist())
+
+    def test_fliers_are_capped_but_keep_the_extremes(self):
+        values = np.concatenate([np.zeros(100000), np.arange(1, 5001) * 1000.0])
+        box = box_statistics(values, max_fliers=50)
+        self.assertEqual(len(box['fliers']), 50)
+        self.assertEqual(box['n_fliers'], 5000)
+        self.assertEqual(max(box['fliers']), 5000 * 1000.0)
+
+    def test_histogram_counts_match_numpy(self):
+        values = np.random.default_rng(43).exponential(3, 1000)
+        counts, edges = np.histogram(values, bins=10)
+        histogram = histogram_counts(values)
+        self.assertEqual(histogram['counts'], counts.tolist())
+        np.testing.assert_array_equal(histogram['edges'], edges)
+
+    def test_sorted_aggregates_match_the_unsorted_ones(self):
+        rng = np.random.default_rng(45)
+        # Rounded values put many ties on the bin edges and quartiles
+        for values in (rng.standard_t(3, 501), rng.normal(0, 1, 2000).round(1), np.full(7, 2.5)):
+            aggregates = numeric_aggregates(np.sort(values), presorted=True)
+            box = box_statistics(values)
+            self.assertEqual(aggregates['box'], {**box, 'fliers': sorted(box['fliers'])})
+            self.assertEqual(aggregates['histogram'], histogram_counts(values))
+            self.assertEqual(numeric_aggregates(values), aggregates)
+
+    def test_category_counts_single_pass(self):
+        self.assertEqual(category_counts(['b', 'a', 'b', 'c', 'b']), (['b', 'a', 'c'], [3, 1, 1]))
+
+    def test_plots_are_drawn_from_aggregates(self):
+        values = list(np.random.default_rng(47).normal(0, 1, 300))
+        with patch('view.descriptive_stats.numeric_aggregates', wraps=numeric_aggregates) as mock_aggregates, \
+                patch('view.plotting.box_statistics') as mock_box, patch('view.plotting.histogram_counts') as mock_hist:
+            result = process_statistics(values, True)
+        mock_aggregates.assert_called_once()
+        mock_box.assert_not_called()
+        mock_hist.assert_not_called()
+        self.assertIsInstance(result['boxplot'], str)
+        self.assertIsInstance(result['histogram'], str)
+
+
+class RenderProfileTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.survival_data = SurvivalData(*weibull_sample(np.random.default_rng(53), 150, 1.3, 25))
+        self.plot_data = survival_plot_data(self.survival_data, 'weibull', (1.3, 25.0))
+
+    def test_profiles_produce_their_formats(self):
+        self.assertTrue(render_image('survival_function', self.plot_data, profile='thumbnail').startswith(b'\x89PNG'))
+        webp = render_image('survival_function', self.plot_data, profile='mobile')
+        self.assertEqual((webp[:4], webp[8:12]), (b'RIFF', b'WEBP'))
+        self.assertIn(b'<svg', render_image('survival_function', self.plot_data, profile='print')[:500])
+
+    def test_thumbnail_is_smaller_than_standard(self):
+        for kind in ('kaplan_meier', 'survival_function'):
+            thumbnail = render_image(kind, self.plot_data, profile='thumbnail')
+            self.assertLess(len(thumbnail), len(render_image(kind, self.plot_data, profile='standard')) / 2, kind)
+
+    def test_svg_and_fixed_bbox_renders_are_deterministic(self):
+        for profile in ('print', 'thumbnail'):
+            first = render_image('hazard', self.plot_data, profile=profile)
+            render_image('hazard', survival_plot_data(SurvivalData([1, 2, 4, 8]), 'exponential', (3.0,)),
+                         profile=profile)
+            self.assertEqual(render_image('hazard', self.plot_data, profile=profile), first, profile)
+
+    def test_fixed_bbox_does_not_depend_on_render_history(self):
+        def render(kinds, profile):
+            # Each worker thread has its own templates, so every call starts from fresh ones
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                return pool.submit(lambda: [render_image(kind, self.plot_data, profile=profile)
+                                            for kind in kinds][-1]).result()
+
+        for profile in ('thumbnail', 'mobile'):
+            spec = RENDER_PROFILES[profile]
+            x0, y0, x1, y1 = spec['bbox']
+            expected = (round((x1 - x0) * spec['dpi']), round((y1 - y0) * spec['dpi']))
+            for kind, other in (('hazard', 'kaplan_meier'), ('kaplan_meier', 'survival_function')):
+                alone = render([kind], profile)
+                self.assertEqual(render([other, kind], profile), alone, (profile, kind))
+                self.assertEqual(Image.open(io.BytesIO(alone)).size, expected, (profile, kind))
+
+    def test_png_profiles_set_the_compression_level(self):
+        for profile in ('thumbnail', 'standard'):
+            self.assertIn('compress_level', RENDER_PROFILES[profile])
+        fig = Mock()
+        plot_to_bytes(fig, 'thumbnail')
+        self.assertEqual(fig.savefig.call_args.kwargs['pil_kwargs'],
+                         {'compress_level': RENDER_PROFILES['thumbnail']['compress_level']})
+
+    def test_profile_threads_through_the_views(self):
+        visualizations = generate_visualizations(self.survival_data, 'weibull', (1.3, 25.0), profile='mobile')
+        self.assertEqual(visualizations['image_format'], 'webp')
+        self.assertEqual(base64.b64decode(visualizations['survival_function'])[8:12], b'WEBP')
+
+        use_plot_store(self)
+        url = plot_url('barchart', (['a', 'b'], [1, 2]), 'print')
+        self.assertTrue(url.endswith('.svg'))
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertEqual(self.client.get(url[:-len('svg')] + 'png').status_code, 404)
+
+    def test_unknown_profile_rejected(self):
+        response = self.client.post(reverse('get_statistics'), json.dumps(
+            {"variable": "x", "data": [1, 2, 3], "profile": "poster"}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse('get_survival') + '?profile=poster', json.dumps(
+            {"time_to_event": [1, 2, 3], "event_status": [1, 1, 0]}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class FigureLifecycleTests(TestCase):
+    def setUp(self):
+        self.histogram = histogram_counts(np.random.default_rng(59).normal(5, 1, 100))
+
+    def test_fresh_figures_are_closed(self):
+        before = open_figure_count()
+        render_plot('histogram', self.histogram, reuse=False)
+        self.assertEqual(open_figure_count(), before)
+
+    def test_failed_render_replaces_the_template(self):
+        expected = render_plot('histogram', self.histogram, reuse=False)
+        template = get_template('histogram')
+        original_draw = HistogramTemplate.draw
+
+        def broken_draw(self, ax, histogram):
+            original_draw(self, ax, histogram)
+            raise RuntimeError("draw failed")
+
+        before = open_figure_count()
+        with patch.object(HistogramTemplate, 'draw', broken_draw):
+            with self.assertRaises(RuntimeError):
+                render_plot('histogram', self.histogram, reuse=True)
+        self.assertEqual(open_figure_count(), before - 1)
+        # The half-drawn bars are gone with the old template
+        self.assertIsNot(get_template('histogram'), template)
+        self.assertEqual(render_plot('histogram', self.histogram, reuse=True), expected)
+
+
+class MemoryWatchdogTests(TestCase):
+    def setUp(self):
+        self.addCleanup(install_watchdog, None)
+
+    def test_recycle_requested_once_past_the_limit(self):
+        recycle = Mock()
+        install_watchdog(recycle)
+        self.assertFalse(check_memory(0))
+        self.assertFalse(check_memory(1 << 50))
+        with self.assertLogs('view.watchdog', 'WARNING'):
+            self.assertTrue(check_memory(1))
+        self.assertFalse(check_memory(1))
+        recycle.assert_called_once_with()
+
+    def test_report_lists_allocation_sites_while_tracing(self):
+        self.assertIsNone(memory_report()['tracemalloc'])
+        install_watchdog(None, trace_frames=1)
+        self.addCleanup(tracemalloc.stop)
+        retained = [bytearray(1000) for _ in range(100)]
+        report = memory_report(top=3)
+        self.assertGreater(report['rss_bytes'], 0)
+        self.assertGreaterEqual(report['open_figures'], 0)
+        self.assertEqual(len(report['tracemalloc']['top']), 3)
+        self.assertGreaterEqual(report['tracemalloc']['current_bytes'], 100000)
+        del retained
+
+    @override_settings(WORKER_MAX_RSS_MB=1)
+    def test_middleware_checks_every_response(self):
+        recycle = Mock()
+        install_watchdog(recycle)
+        with self.assertLogs('view.watchdog', 'WARNING'):
+            self.assertEqual(Client().get(reverse('home')).status_code, 200)
+        recycle.assert_called_once_with()
+
+
+class NumericSummaryTests(TestCase):
+    def test_matches_statistics_and_scipy(self):
+        import statistics
+        rng = np.random.default_rng(61)
+        for size in (1, 2, 3, 4, 7, 50, 501):
+            values = [float(value) for value in rng.integers(0, 12, size)] + [0.5]
+            summary = numeric_summary(values)
+            self.assertAlmostEqual(summary['mean'], statistics.mean(values))
+            self.assertEqual(summary['median'], statistics.median(values))
+            self.assertEqual(summary['sum'], sum(values))
+            self.assertEqual(summary['unique_count'], len(set(values)))
+            self.assertEqual((summary['min'], summary['max']), (min(values), max(values)))
+            self.assertAlmostEqual(summary['std'], statistics.stdev(values))
+            if len(values) > 3:
+                self.assertAlmostEqual(summary['skewness'], stats.skew(values))
+                self.assertAlmostEqual(summary['kurtosis'], stats.kurtosis(values))
+
+    def test_mode_is_the_first_most_common_value(self):
+        self.assertEqual(numeric_summary([3.0, 1.0, 1.0, 3.0, 2.0])['mode'], 3.0)
+        self.assertEqual(numeric_summary([5.0, 1.0, 1.0, 3.0, 3.0, 3.0])['mode'], 3.0)
+        self.assertIsNone(numeric_summary([1.0, 2.0, 3.0])['mode'])
+
+    def test_rounding_and_none_rules(self):
+        self.assertEqual(calculate_numeric_statistics([2.0]), {
+            "mean": 2.0, "median": 2.0, "mode": None, "std": None, "kurtosis": None, "skewness": None,
+            "min": 2.0, "max": 2.0, "range": 0.0, "sum": 2.0, "count": 1, "uniqueCount": 1,
+        })
+        result = calculate_numeric_statistics([1.0, 2.0, 2.0, 10.0])
+        self.assertEqual((result['mean'], result['std'], result['mode']), (3.75, 4.19, 2.0))
+        self.assertEqual(result['skewness'], round(stats.skew([1.0, 2.0, 2.0, 10.0]), 2))
+        self.assertIsNone(calculate_numeric_statistics([]))
+
+
+class CategoricalTopKTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def test_rare_categories_fold_into_other(self):
+        values = ['a'] * 5 + ['b'] * 3 + ['c'] * 3 + ['d', 'e']
+        result = calculate_categorical_statistics(values, top_k=2)
+        self.assertEqual(result, {
+            "mode": 'a',
+            "uniqueCount": 5,
+            "categoryCount": {'a': 5, 'b': 3, "Other (3 categories)": 5},
+        })
+        self.assertEqual(calculate_categorical_statistics(values, top_k=5)["categoryCount"],
+                         {'a': 5, 'b': 3, 'c': 3, 'd': 1, 'e': 1})
+
+    def test_barchart_draws_the_truncated_counts(self):
+        values = [f"id-{index}" for index in range(5000)] + ['id-7'] * 3
+        with patch('view.descriptive_stats.plot_url', return_value='/plots/x') as mock_url:
+            result = process_statistics(values, False, render="url", top_k=10)
+        categories, counts = mock_url.call_args.args[1]
+        self.assertEqual(list(result['categoryCount']), categories)
+        self.assertEqual(len(categories), 11)
+        self.assertEqual((categories[0], counts[0]), ('id-7', 4))
+        self.assertEqual((categories[-1], sum(counts)), ("Other (4990 categories)", 5003))
+        self.assertEqual(result['uniqueCount'], 5000)
+
+    def test_top_k_validated(self):
+        for top_k in (0, "many", 10 ** 6):
+            response = self.client.post(reverse('get_statistics'), json.dumps(
+                {"variable": "x", "data": ["a", "b"], "isNumeric": False, "top_k": top_k}),
+                content_type='application/json')
+            self.assertEqual(response.status_code, 400, top_k)
+        response = self.client.post(reverse('get_statistics') + '?top_k=1', json.dumps(
+            {"variable": "x", "data": ["a", "b", "b"], "isNumeric": False}), content_type='application/json')
+        self.assertEqual(response.json()['categoryCount'], {'b': 2, "Other (1 category)": 1})
+
+
+class StreamingStatisticsTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def _stream(self, chunks, is_numeric=True, **finalize):
+        session, status = stream_chunks(self.client, chunks, isNumeric=is_numeric)
+        self.assertEqual(status, 200)
+        return session, self.client.post(reverse('finalize_statistics_stream', args=[session]), json.dumps(finalize),
+                                         content_type='application/json')
+
+    def test_small_column_matches_get_statistics(self):
+        values = [float(value) for value in np.random.default_rng(67).integers(0, 40, 300)]
+        for is_numeric, data in ((True, values), (False, [f"c{int(value) % 7}" for value in values])):
+            expected = self.client.post(reverse('get_statistics'), json.dumps(
+                {"variable": "x", "data": data, "isNumeric": is_numeric}), content_type='application/json').json()
+            _, response = self._stream([data[:120], data[120:]], is_numeric)
+            self.assertEqual(response.json(), expected)
+
+    def test_chunks_merge_like_one_pass(self):
+        rng = np.random.default_rng(71)
+        values = rng.gamma(2.0, 3.0, 20000)
+        merged, single = MomentAccumulator(), MomentAccumulator()
+        single.update(values)
+        for chunk in np.array_split(values, 7):
+            part = MomentAccumulator()
+            part.update(chunk)
+            merged.merge(part)
+        expected = numeric_summary(values)
+        for got, want in zip(merged.shape(), (expected['std'], expected['skewness'], expected['kurtosis'])):
+            self.assertAlmostEqual(got, want, places=9)
+        self.assertEqual(merged.count, single.count)
+
+        sketch = QuantileSketch(k=128)
+        for chunk in np.array_split(values, 13):
+            part = QuantileSketch(k=128)
+            part.update(chunk)
+            sketch.merge(part)
+        self.assertEqual(sketch.count, len(values))
+        self.assertEqual(sum(weight for weight in sketch.weighted_items()[1]), len(values))
+        rank = np.mean(values <= sketch.quantiles([0.5])[0])
+        self.assertAlmostEqual(rank, 0.5, delta=0.03)
+
+    def test_large_column_stays_bounded(self):
+        values = np.random.default_rng(73).normal(50, 10, 400000)
+        accumulator = ColumnAccumulator(True)
+        sizes = []
+        for chunk in np.array_split(values, 8):
+            accumulator.update(chunk.tolist())
+            sizes.append(len(pickle.dumps(accumulator)))
+        self.assertLess(max(sizes), 200 * 1024)
+        summary = accumulator.numeric_summary()
+        self.assertIsNone(summary['unique_count'])
+        self.assertAlmostEqual(summary['mean'], values.mean(), places=9)
+        self.assertAlmostEqual(summary['median'], np.median(values), delta=0.1)
+        expected = histogram_counts(values)['counts']
+        np.testing.assert_allclose(accumulator.histogram()['counts'], expected, atol=0.002 * len(values))
+
+    def test_chunk_order_and_unknown_sessions(self):
+        session, _ = self._stream([[1, 2, 3]])
+        # Finalizing closes the session
+        chunk = self.client.post(reverse('add_statistics_chunk', args=[session]), json.dumps({"data": [4], "seq": 1}),
+                                 content_type='application/json')
+        self.assertEqual(chunk.status_code, 404)
+
+        session = self.client.post(reverse('start_statistics_stream'), '{}', content_type='application/json').json()['session']
+        url = reverse('add_statistics_chunk', args=[session])
+        self.assertEqual(self.client.post(url, json.dumps({"data": [1, 2], "seq": 0}),
+                                          content_type='application/json').json()['count'], 2)
+        # A retried chunk is not counted twice, a skipped one is rejected
+        self.assertEqual(self.client.post(url, json.dumps({"data": [1, 2], "seq": 0}),
+                                          content_type='application/json').json()['count'], 2)
+        self.assertEqual(self.client.post(url, json.dumps({"data": [5], "seq": 2}),
+                                          content_type='application/json').status_code, 400)
+
+    def test_too_many_categories_rejected(self):
+        with patch('view.streaming_stats.STATS_STREAM_MAX_DISTINCT', 5):
+            _, status = stream_chunks(self.client, [[str(index) for index in range(10)]], isNumeric=False)
+        self.assertEqual(status, 400)
+
+    def test_chunks_of_one_session_are_applied_one_at_a_time(self):
+        session, _ = stream_chunks(self.client, [], isNumeric=True)
+        url = reverse('add_statistics_chunk', args=[session])
+        with patch('view.streaming_stats.STATS_STREAM_LOCK_WAIT', 0.1):
+            with session_lock(session):
+                # Another worker is applying a chunk: this one waits, then gives up without touching the state
+                busy = self.client.post(url, json.dumps({"data": [1, 2], "seq": 0}), content_type='application/json')
+                self.assertEqual(busy.status_code, 409)
+                finalize = self.client.post(reverse('finalize_statistics_stream', args=[session]), '{}',
+                                            content_type='application/json')
+                self.assertEqual(finalize.status_code, 409)
+        self.assertEqual(self.client.post(url, json.dumps({"data": [1, 2], "seq": 0}),
+                                          content_type='application/json').json()['count'], 2)
+
+    def test_process_local_cache_is_refused(self):
+        local = {**settings.CACHES, 'stats-stream': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=local):
+            response = self.client.post(reverse('start_statistics_stream'), '{}', content_type='application/json')
+        self.assertEqual(response.status_code, 503)
+
+
+class DatasetStatisticsTests(TestCase):
+    CSV = (b"age,income,city,member,notes\n"
+           b"34,1200.5,Jakarta,True,\n"
+           b",980.25,Bandung,False,\n"
+           b"29,,Jakarta,True,\n"
+           b"41,1500.0,,True,\n"
+           b"29,2100.75,Surabaya,False,\n")
+
+    def setUp(self):
+        self.client = Client()
+
+    def _upload(self, content, name='data.csv', **params):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        return self.client.post(reverse('get_dataset_statistics'),
+                                {'file': SimpleUploadedFile(name, content), **params})
+
+    def test_columns_match_get_statistics(self):
+        response = self._upload(self.CSV)
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual((result['rowCount'], result['columnCount']), (5, 5))
+        columns = {column['variable']: column for column in result['columns']}
+        self.assertEqual(list(columns), ['age', 'income', 'city', 'member', 'notes'])
+
+        self.assertEqual(columns['age'], {"variable": "age", "type": "Numeric",
+                                          **calculate_numeric_statistics([34.0, 29.0, 41.0, 29.0])})
+        self.assertEqual(columns['income'], {"variable": "income", "type": "Numeric",
+                                             **calculate_numeric_statistics([1200.5, 980.25, 1500.0, 2100.75])})
+        self.assertEqual(columns['city'], {"variable": "city", "type": "Categorical", **calculate_categorical_statistics(
+            ['Jakarta', 'Bandung', 'Jakarta', 'Surabaya'])})
+        self.assertEqual(columns['member']['type'], "Categorical")
+        self.assertEqual(columns['member']['categoryCount'], {'True': 3, 'False': 2})
+        self.assertEqual(columns['notes'], {"variable": "notes", "error": "Column has no values."})
+
+    def test_plots_follow_the_render_mode(self):
+        use_plot_store(self)
+        with patch('view.descriptive_stats.plot_url', return_value='/plots/x'):
+            columns = self._upload(self.CSV, plots='true', render='url', top_k='1').json()['columns']
+        self.assertEqual((columns[0]['boxplot'], columns[0]['histogram'], columns[0]['barchart']),
+                         ('/plots/x', '/plots/x', None))
+        self.assertEqual(columns[2]['barchart'], '/plots/x')
+        self.assertEqual(columns[2]['categoryCount'], {'Jakarta': 2, "Other (2 categories)": 2})
+
+        column = process_statistics([34.0, 29.0, 41.0, 29.0], True)
+        self.assertEqual(self._upload(self.CSV, plots='true').json()['columns'][0], {"variable": "age", **column})
+
+    def test_invalid_uploads(self):
+        response = self.client.post(reverse('get_dataset_statistics'), {'render': 'png'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._upload(self.CSV, top_k='0').status_code, 400)
+        self.assertEqual(self.client.get(reverse('get_dataset_statistics')).status_code, 405)
+        self.assertEqual(self._upload(b"PAR1" + b"\0" * 16 + b"PAR1", name='data.parquet').status_code, 400)
+        with patch('dino_chatbot.views.DATASET_MAX_BYTES', 64):
+            response = self.client.post(reverse('get_dataset_statistics'), self.CSV, content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+
+    def test_parquet_matches_csv(self):
+        import io
+        import pandas as pd
+        parquet = io.BytesIO()
+        pd.read_csv(io.BytesIO(self.CSV)).to_parquet(parquet, engine='pyarrow')
+        response = self._upload(parquet.getvalue(), name='data.parquet')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self._upload(self.CSV).json())
+
+    def test_raw_csv_body(self):
+        response = self.client.post(reverse('get_dataset_statistics'), self.CSV, content_type='text/csv')
+        self.assertEqual(response.json()['columns'][0]['count'], 4)
+
+    def test_raw_body_over_the_request_body_limit(self):
+        rows = 250000
+        content = b"value,group\n" + b"".join(b"%d.25,g%d\n" % (index, index % 3) for index in range(rows))
+        self.assertGreater(len(content), settings.DATA_UPLOAD_MAX_MEMORY_SIZE)
+        response = self.client.post(reverse('get_dataset_statistics'), content, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        columns = response.json()['columns']
+        self.assertEqual((columns[0]['count'], columns[0]['max']), (rows, rows - 1 + 0.25))
+        self.assertEqual(columns[1]['uniqueCount'], 3)
+
+    def test_summaries_of_columns_match_one_column(self):
+        rng = np.random.default_rng(73)
+        matrix = rng.integers(0, 30, (400, 4)).astype(float)
+        matrix[rng.random(matrix.shape) < 0.2] = np.nan
+        matrix[:, 3] = np.nan
+        summaries = numeric_summaries(matrix)
+        for column, summary in zip(matrix.T[:3], summaries):
+            expected = numeric_summary(column[~np.isnan(column)])
+            for key, value in expected.items():
+                if value is None:
+                    self.assertIsNone(summary[key])
+                else:
+                    self.assertAlmostEqual(summary[key], value, places=9)
+        self.assertIsNone(summaries[3])
+
+
+class ApproximateStatisticsTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        use_plot_store(self)
+
+    def _stream(self, chunks, is_numeric=True, approximate=True, **finalize):
+        """Status of the last chunk and the finalize response of a streaming session."""
+        session, status = stream_chunks(self.client, chunks, isNumeric=is_numeric, approximate=approximate)
+        if status != 200:
+            return status, None
+        with patch('view.descriptive_stats.plot_url', return_value='/plots/x'):
+            return status, self.client.post(reverse('finalize_statistics_stream', args=[session]),
+                                            json.dumps({"render": "url", **finalize}),
+                                            content_type='application/json').json()
+
+    def test_small_column_is_exact_with_zero_errors(self):
+        values = [float(value) for value in np.random.default_rng(79).integers(0, 40, 300)]
+        for is_numeric, data in ((True, values), (False, [f"c{int(value) % 7}" for value in values])):
+            _, expected = self._stream([data[:100], data[100:]], is_numeric, approximate=False)
+            _, result = self._stream([data[:100], data[100:]], is_numeric)
+            # get-statistics takes approximate=true too, with the same response as a session
+            with patch('view.descriptive_stats.plot_url', return_value='/plots/x'):
+                single = self.client.post(reverse('get_statistics'), json.dumps(
+                    {"variable": "x", "data": data, "isNumeric": is_numeric, "approximate": True, "render": "url"}),
+                    content_type='application/json')
+            self.assertEqual(single.json(), result)
+            self.assertTrue(result.pop('approximate'))
+            errors = {key: result.pop(key) for key in list(result) if key.endswith('Error')}
+            self.assertEqual(result, expected)
+            self.assertEqual(errors['modeError'], {"count": 0})
+            self.assertEqual(errors['uniqueCountError']['relative'], 0.0)
+            if is_numeric:
+                self.assertEqual(errors['medianError']['rank'], 0.0)
+                self.assertEqual(errors['histogramError']['count'], 0)
+
+    def test_handles_columns_the_exact_path_cannot(self):
+        # More distinct categories than an exact session keeps, in a session of fixed size
+        values = [f"id-{index}" for index in range(30000)] + ["id-7"] * 500
+        chunks = [values[start:start + 10000] for start in range(0, len(values), 10000)]
+        status, _ = self._stream(chunks, False, approximate=False)
+        self.assertEqual(status, 400)
+        column = ApproximateColumn(False)
+        sizes = []
+        for chunk in chunks:
+            column.update(chunk)
+            sizes.append(len(pickle.dumps(column)))
+        self.assertLess(max(sizes), 2 * sizes[0])
+        status, result = self._stream(chunks, False, top_k=3)
+        self.assertEqual(status, 200)
+        self.assertEqual(result['mode'], "id-7")
+        self.assertGreaterEqual(result['categoryCount']["id-7"] + result['categoryCountError']['count'], 501)
+        bounds = result['uniqueCountError']
+        self.assertTrue(bounds['low'] <= 30000 <= bounds['high'])
+
+        # A raw CSV over the request body limit, fed to the sketches a chunk of rows at a time
+        rows = 250000
+        content = b"value\n" + b"".join(b"%d\n" % (index % 1000) for index in range(rows))
+        update = ApproximateColumn.update
+        with patch.object(ApproximateColumn, 'update', autospec=True, side_effect=update) as mock_update:
+            response = self.client.post(reverse('get_dataset_statistics') + '?approximate=true', content,
+                                        content_type='text/csv')
+        self.assertEqual(mock_update.call_count, 4)
+        column = response.json()['columns'][0]
+        self.assertEqual((column['count'], column['min'], column['max']), (rows, 0.0, 999.0))
+        self.assertTrue(column['approximate'])
+        self.assertTrue(column['medianError']['low'] <= 499.5 <= column['medianError']['high'])
+
+    def test_large_numeric_column_within_its_bounds(self):
+        values = np.random.default_rng(83).lognormal(0, 1, 200000)
+        column = ApproximateColumn(True)
+        for chunk in np.array_split(values, 4):
+            column.update(chunk)
+        with patch('view.descriptive_stats.plot_url', side_effect=lambda kind, data, profile: data):
+            result = column.statistics(render="url")
+            exact = process_statistics(values, True, render="url")
+        for key in ('mean', 'std', 'skewness', 'kurtosis', 'min', 'max', 'sum', 'count'):
+            self.assertEqual(result[key], exact[key])
+
+        error = result['medianError']
+        self.assertGreater(error['rank'], 0)
+        self.assertLessEqual(error['low'], exact['median'])
+        self.assertGreaterEqual(error['high'], exact['median'])
+        self.assertLessEqual(abs(np.mean(values <= result['median']) - 0.5), error['rank'])
+        self.assertLessEqual(abs(result['boxplot']['q3'] - exact['boxplot']['q3']), 0.05)
+
+        bounds = result['uniqueCountError']
+        self.assertLessEqual(bounds['low'], exact['uniqueCount'])
+        self.assertGreaterEqual(bounds['high'], exact['uniqueCount'])
+
+        counts = np.array(result['histogram']['counts'])
+        self.assertEqual(result['histogram']['edges'], exact['histogram']['edges'])
+        self.assertLessEqual(np.max(np.abs(counts - exact['histogram']['counts'])), result['histogramError']['count'])
+        self.assertEqual(result['histogramError']['sampleSize'], 10000)
+
+    def test_large_categorical_column_within_its_bounds(self):
+        rng = np.random.default_rng(89)
+        values = [f"u{value}" for value in rng.zipf(1.3, 200000)]
+        _, result = self._stream([values[:100000], values[100000:]], False, top_k=5)
+        exact = calculate_categorical_statistics(values, top_k=5)
+        self.assertEqual(result['mode'], exact['mode'])
+        error = result['categoryCountError']['count']
+        self.assertGreater(error, 0)
+        for category, count in list(result['categoryCount'].items())[:5]:
+            self.assertIn(category, exact['categoryCount'])
+            self.assertLessEqual(count, exact['categoryCount'][category])
+            self.assertGreaterEqual(count + error, exact['categoryCount'][category])
+        self.assertEqual(sum(result['categoryCount'].values()), len(values))
+        bounds = result['uniqueCountError']
+        self.assertTrue(bounds['low'] <= exact['uniqueCount'] <= bounds['high'])
+
+    def test_dataset_columns_without_plots(self):
+        content = b"value,group,text\n" + b"".join(b"%d,g%d,\n" % (index, index % 4) for index in range(300))
+        response = self.client.post(reverse('get_dataset_statistics') + '?approximate=true', content,
+                                    content_type='text/csv')
+        exact = self.client.post(reverse('get_dataset_statistics'), content, content_type='text/csv').json()
+        result = response.json()
+        self.assertEqual(result['rowCount'], 300)
+        self.assertEqual(result['columns'][2], exact['columns'][2])
+        for column, expected in zip(result['columns'][:2], exact['columns']):
+            self.assertNotIn('boxplotError', column)
+            self.assertEqual({key: value for key, value in column.items()
+                              if not key.endswith('Error') and key != 'approximate'}, expected)
+
+        # Text after the first chunk of rows makes the column categorical, as in the exact path
+        mixed = b"value,number\n" + b"1,2\n" * 70000 + b"text,3\n"
+        response = self.client.post(reverse('get_dataset_statistics') + '?approximate=true', mixed,
+                                    content_type='text/csv')
+        exact = self.client.post(reverse('get_dataset_statistics'), mixed, content_type='text/csv').json()
+        for column, expected in zip(response.json()['columns'], exact['columns']):
+            self.assertEqual({key: value for key, value in column.items()
+                              if not key.endswith('Error') and key != 'approximate'}, expected)
+        self.assertEqual(exact['columns'][0]['categoryCount'], {"1": 70000, "text": 1})
+
+    def test_heavy_hitters_bound(self):
+        rng = np.random.default_rng(97)
+        values = np.concatenate([rng.normal(size=50000), np.full(3000, 7.0)])
+        rng.shuffle(values)
+        hitters = HeavyHitters(capacity=50)
+        for chunk in np.array_split(values, 9):
+            hitters.update(chunk)
+        self.assertLessEqual(hitters.error, len(values) / 51)
+        self.assertLessEqual(hitters.counts[7.0], 3000)
+        self.assertGreaterEqual(hitters.counts[7.0] + hitters.error, 3000)
+        self.assertEqual(hitters.counts.most_common(1)[0][0], 7.0)
+
+    def test_hyperloglog_error_and_merge(self):
+        for count in (100, 20000, 300000):
+            sketch = HyperLogLog()
+            sketch.update(hash_values(np.arange(count, dtype=float)))
+            self.assertLess(abs(sketch.estimate() / count - 1), 2 * sketch.relative_error)
+        left, right = HyperLogLog(), HyperLogLog()
+        left.update(hash_values([f"a{index}" for index in range(5000)]))
+        right.update(hash_values([f"a{index}" for index in range(2500, 7500)]))
+        left.merge(right)
+        self.assertLess(abs(left.estimate() / 7500 - 1), 2 * left.relative_error)
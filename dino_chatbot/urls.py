@@ -7,5 +7,12 @@ urlpatterns = [
     path('usage/', views.usage_views, name="usage"),
     path('statistic/', views.statistic_views, name="statistic"),
     path('get-statistics/', views.get_statistics, name='get_statistics'),
+    path('get-statistics/dataset/', views.get_dataset_statistics, name='get_dataset_statistics'),
+    path('get-statistics/stream/', views.start_statistics_stream, name='start_statistics_stream'),
+    path('get-statistics/stream/<slug:session>/chunk/', views.add_statistics_chunk, name='add_statistics_chunk'),
+    path('get-statistics/stream/<slug:session>/finalize/', views.finalize_statistics_stream,
+         name='finalize_statistics_stream'),
     path('get-survival/', views.get_survival, name='get_survival'),
+    path('get-survival-batch/', views.get_survival_batch, name='get_survival_batch'),
+    path('plots/<slug:kind>/<slug:profile>/<slug:digest>.<slug:extension>', views.get_plot_image, name='plot_image'),
 ]
\ No newline at end of file
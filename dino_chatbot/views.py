@@ -1,22 +1,33 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, Http404
+from django.views.decorators.http import require_safe
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
-import openai
-import matplotlib
-matplotlib.use('Agg')  
+from django.core.exceptions import ImproperlyConfigured
 import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import statistics
-from scipy import stats
-from view.utils import ask_openai, parse_data
+from view.lazy import lazy_import
+from view.utils import ask_openai, parse_data, parse_life_table
 from view.distributions import kaplan_meier_to_dict
 from view.descriptive_stats import process_statistics
-from view.llm_handlers import generate_message, handle_predictions
+from view.approximate_stats import ApproximateColumn
+from view.dataset_stats import read_dataset, dataset_statistics, approximate_dataset_statistics
+from view.streaming_stats import (ColumnAccumulator, start_session, load_session, add_chunk, end_session,
+                                  finalize_statistics, session_lock)
+from view.llm_handlers import generate_message, generate_life_table_message, handle_predictions
 from view.helper import evaluate_all_distributions, find_best_distribution, generate_visualizations, calculate_survival_metrics, generate_interpretation
+from view.survival_data import SurvivalData
+from view.fitting import fit_cohorts
+from view.plot_store import get_plot_image as get_plot_image_bytes, plot_etag, is_enabled as plot_store_enabled
+from view.constants import (DISTRIBUTIONS, MAX_BATCH_COHORTS, LLM_MAX_WORKERS, RENDER_MODES, STATISTICS_RENDER_MODES, PLOT_CACHE_MAX_AGE,
+                            KM_MAX_POINTS, KM_MIN_POINTS, RENDER_PROFILES, DEFAULT_RENDER_PROFILE, IMAGE_CONTENT_TYPES,
+                            CATEGORY_TOP_K, MAX_CATEGORY_TOP_K, STATS_STREAM_MAX_CHUNK, DATASET_MAX_BYTES,
+                            UPLOAD_READ_SIZE, APPROX_CHUNK)
 
-
-# konfigurasi OpenAI API key
-openai.api_key = settings.OPENAI_API_KEY
+# scipy, matplotlib dan openai dimuat saat pertama dipakai (lihat view.warmup untuk preload)
+stats = lazy_import('scipy.stats')
 
 @csrf_exempt
 def get_survival(request):
@@ -25,52 +36,69 @@ def get_survival(request):
 
     try:
         data = json.loads(request.body)
+        render_mode = _render_mode(request, data)
+        if render_mode is None:
+            return JsonResponse({'error': f"'render' must be one of {', '.join(_available_render_modes())}."}, status=400)
+        max_points = _max_points(request, data)
+        if max_points is None:
+            return JsonResponse({'error': f"'max_points' must be an integer of at least {KM_MIN_POINTS}."}, status=400)
+        profile = _render_profile(request, data)
+        if profile is None:
+            return JsonResponse({'error': f"'profile' must be one of {', '.join(RENDER_PROFILES)}."}, status=400)
         
-        # Parse and clean data
-        cleaned_time_to_event, cleaned_event_status = parse_data(data)
+        if 'life_table' in data:
+            # Life table (waktu unik, jumlah event, jumlah tersensor) sebagai alternatif data mentah
+            try:
+                times, events, censored = parse_life_table(data)
+                survival_data = SurvivalData.from_life_table(times, events, censored)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+            try:
+                openai_message = generate_life_table_message(times, events, censored, *survival_data.summary_statistics())
+            except ValueError as e:
+                return JsonResponse({'warning': str(e)}, status=200)
+        else:
+            # Parse and clean data
+            cleaned_time_to_event, cleaned_event_status = parse_data(data)
 
-        # Generate message for OpenAI
-        try:
-            openai_message = generate_message(cleaned_time_to_event, cleaned_event_status, statistics.mean(cleaned_time_to_event), statistics.stdev(cleaned_time_to_event),stats.skew(cleaned_time_to_event), stats.kurtosis(cleaned_time_to_event))
-        except ValueError as e:
-            return JsonResponse({'warning': str(e)}, status=200)
+            # Generate message for OpenAI
+            try:
+                openai_message = generate_message(cleaned_time_to_event, cleaned_event_status, statistics.mean(cleaned_time_to_event), statistics.stdev(cleaned_time_to_event),stats.skew(cleaned_time_to_event), stats.kurtosis(cleaned_time_to_event))
+            except ValueError as e:
+                return JsonResponse({'warning': str(e)}, status=200)
+
+            # Validate and collapse into a life table once, the Kaplan-Meier fit is shared by every consumer
+            survival_data = SurvivalData(cleaned_time_to_event, cleaned_event_status)
 
         # Get predicted distribution from OpenAI
         predicted_distribution = ask_openai(openai_message)
 
-        # Handle predictions and calculate metrics
-        prediction_results = handle_predictions(
-            cleaned_time_to_event, 
-            cleaned_event_status, 
-            predicted_distribution
-        )
-        result_message, aic, bic, params, goodness_of_fit = prediction_results
-
         # Evaluate all distributions
-        distributions = ["weibull", "exponential", "lognormal", "gamma", "loglogistic", "pareto"]
         all_results = evaluate_all_distributions(
-            cleaned_time_to_event,
-            cleaned_event_status,
-            distributions
+            survival_data,
+            DISTRIBUTIONS
         )
 
+        # Handle predictions, reusing the fit already computed for the predicted distribution
+        prediction_results = handle_predictions(predicted_distribution, all_results)
+        result_message, aic, bic, params, goodness_of_fit = prediction_results
+
         # Find best distribution based on AIC
         best_dist, _ = find_best_distribution(all_results)
         best_params = all_results[best_dist]['params'] if best_dist else params
 
         # Generate visualizations
         visualization_data = generate_visualizations(
-            cleaned_time_to_event,
-            cleaned_event_status,
+            survival_data,
             best_dist,
-            best_params
+            best_params,
+            render_mode,
+            max_points,
+            profile
         )
 
         # Calculate Kaplan-Meier and median survival
-        kaplan_meier_data = calculate_survival_metrics(
-            cleaned_time_to_event,
-            cleaned_event_status
-        )
+        kaplan_meier_data = calculate_survival_metrics(survival_data)
         kaplan_meier = kaplan_meier_data['kaplan_meier']
         median_survival = kaplan_meier_data['median_survival']
 
@@ -80,7 +108,8 @@ def get_survival(request):
             best_dist,
             best_params,
             median_survival,
-            goodness_of_fit
+            goodness_of_fit,
+            survival_data.model_curves(best_dist, best_params) if best_dist and kaplan_meier else None
         )
 
         # Prepare response
@@ -98,10 +127,13 @@ def get_survival(request):
             'survival_plot': visualization_data['survival_plot'],
             'survival_function': visualization_data['survival_function'],
             'all_distributions_results': all_results,
-            'kaplan_meier': kaplan_meier_to_dict(kaplan_meier) if kaplan_meier else None,
+            'kaplan_meier': kaplan_meier_to_dict(survival_data, max_points) if kaplan_meier else None,
             'median_survival': median_survival,
             'interpretation': interpretation
         }
+        for key in ('plot_data', 'image_format'):
+            if key in visualization_data:
+                response[key] = visualization_data[key]
         
         return JsonResponse(response)
 
@@ -111,6 +143,208 @@ def get_survival(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def _available_render_modes(modes=RENDER_MODES):
+    """`modes` without url when no plot store is configured."""
+    return modes if plot_store_enabled() else tuple(mode for mode in modes if mode != "url")
+
+
+def _render_mode(request, data, modes=RENDER_MODES):
+    """One of `modes` ('png' by default) from the body or the query string; None when invalid."""
+    render_mode = data.get('render', request.GET.get('render', 'png'))
+    return render_mode if render_mode in _available_render_modes(modes) else None
+
+
+def _render_profile(request, data):
+    """One of RENDER_PROFILES from the body or the query string; None when invalid."""
+    profile = data.get('profile', request.GET.get('profile', DEFAULT_RENDER_PROFILE))
+    return profile if isinstance(profile, str) and profile in RENDER_PROFILES else None
+
+
+def _flag(request, data, name, default=False):
+    """Boolean option from the body or the query string (true/1/yes), `default` when absent."""
+    value = data.get(name, request.GET.get(name, default))
+    return value is True or value == 1 or (isinstance(value, str) and value.lower() in ('1', 'true', 'yes'))
+
+
+def _top_k(request, data):
+    """Number of categories to report from the body or the query string; None when invalid."""
+    top_k = data.get('top_k', request.GET.get('top_k', CATEGORY_TOP_K))
+    if isinstance(top_k, bool):
+        return None
+    try:
+        top_k = int(top_k)
+    except (TypeError, ValueError):
+        return None
+    return top_k if 1 <= top_k <= MAX_CATEGORY_TOP_K else None
+
+
+def _max_points(request, data):
+    """Kaplan-Meier point budget from the body or the query string; None when invalid."""
+    max_points = data.get('max_points', request.GET.get('max_points', KM_MAX_POINTS))
+    if isinstance(max_points, bool):
+        return None
+    try:
+        max_points = int(max_points)
+    except (TypeError, ValueError):
+        return None
+    return max_points if max_points >= KM_MIN_POINTS else None
+
+
+@require_safe
+def get_plot_image(request, kind, profile, digest, extension):
+    """Serve a stored plot; the URL is content-addressed, so the image never changes."""
+    etag = plot_etag(kind, profile, digest)
+    headers = {'ETag': etag, 'Cache-Control': f'public, max-age={PLOT_CACHE_MAX_AGE}, immutable'}
+    if_none_match = request.headers.get('If-None-Match', '')
+    # Only an exact ETag: "*" would answer 304 for a plot that was never stored or was evicted
+    if etag in [tag.strip() for tag in if_none_match.split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        image = get_plot_image_bytes(kind, profile, digest, extension)
+        if image is None:
+            raise Http404("Plot not found")
+        response = HttpResponse(image, content_type=IMAGE_CONTENT_TYPES[extension])
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def _parse_cohort(cohort, include_interpretation):
+    """Build the SurvivalData of one batch cohort, plus its LLM message when interpretation is on."""
+    if not isinstance(cohort, dict):
+        raise ValueError("Each cohort must be an object.")
+
+    if 'life_table' in cohort:
+        times, events, censored = parse_life_table(cohort)
+        survival_data = SurvivalData.from_life_table(times, events, censored)
+    else:
+        cleaned_time_to_event, cleaned_event_status = parse_data(cohort)
+        survival_data = SurvivalData(cleaned_time_to_event, cleaned_event_status)
+    if len(survival_data) < 2:
+        raise ValueError("At least two observations are required.")
+    if not include_interpretation:
+        return survival_data, None
+
+    summary = survival_data.summary_statistics()
+    if 'life_table' in cohort:
+        message = generate_life_table_message(times, events, censored, *summary)
+    else:
+        message = generate_message(cleaned_time_to_event, cleaned_event_status, *summary)
+    return survival_data, message
+
+
+def _summarize_cohort(name, survival_data, all_results, include_plots, render_mode="png",
+                      max_points=KM_MAX_POINTS, profile=DEFAULT_RENDER_PROFILE):
+    """Run the best-fit, Kaplan-Meier and optional plot stages for one fitted cohort."""
+    best_dist, _ = find_best_distribution(all_results)
+    best_params = all_results[best_dist]['params'] if best_dist else None
+    kaplan_meier_data = calculate_survival_metrics(survival_data)
+
+    result = {
+        'name': name,
+        'best_distribution': best_dist,
+        'best_params': best_params,
+        'all_distributions_results': all_results,
+        'kaplan_meier': kaplan_meier_to_dict(survival_data, max_points),
+        'median_survival': kaplan_meier_data['median_survival'],
+    }
+
+    if include_plots and best_dist:
+        result.update(generate_visualizations(survival_data, best_dist, best_params, render_mode, max_points, profile))
+
+    return result
+
+
+def _interpret_cohort(survival_data, openai_message, result):
+    """Run the two LLM stages (predicted distribution, then interpretation) for one summarized cohort."""
+    all_results = result['all_distributions_results']
+    best_dist = result['best_distribution']
+    best_params = result['best_params']
+    predicted_distribution = ask_openai(openai_message)
+    result_message, aic, bic, params, goodness_of_fit = handle_predictions(predicted_distribution, all_results)
+    return {
+        'predicted_distribution': result_message,
+        'aic': aic,
+        'bic': bic,
+        'params': params,
+        'hasil_uji_goodness_of_fit': goodness_of_fit,
+        'interpretation': generate_interpretation(
+            survival_data.kaplan_meier,
+            best_dist,
+            best_params,
+            result['median_survival'],
+            goodness_of_fit,
+            survival_data.model_curves(best_dist, best_params) if best_dist else None
+        ),
+    }
+
+
+@csrf_exempt
+def get_survival_batch(request):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        cohorts = data.get('cohorts')
+        if not isinstance(cohorts, list) or not cohorts:
+            return JsonResponse({'error': "'cohorts' must be a non-empty list."}, status=400)
+        if len(cohorts) > MAX_BATCH_COHORTS:
+            return JsonResponse({'error': f"At most {MAX_BATCH_COHORTS} cohorts per batch."}, status=400)
+
+        include_plots = _flag(request, data, 'plots', default=True)
+        include_interpretation = _flag(request, data, 'interpretation', default=True)
+        render_mode = _render_mode(request, data)
+        if render_mode is None:
+            return JsonResponse({'error': f"'render' must be one of {', '.join(_available_render_modes())}."}, status=400)
+        max_points = _max_points(request, data)
+        if max_points is None:
+            return JsonResponse({'error': f"'max_points' must be an integer of at least {KM_MIN_POINTS}."}, status=400)
+        profile = _render_profile(request, data)
+        if profile is None:
+            return JsonResponse({'error': f"'profile' must be one of {', '.join(RENDER_PROFILES)}."}, status=400)
+
+        # Parse every cohort first so all fits can be dispatched to the pool together
+        parsed = []
+        for index, cohort in enumerate(cohorts):
+            name = str(cohort.get('name', index)) if isinstance(cohort, dict) else str(index)
+            try:
+                survival_data, openai_message = _parse_cohort(cohort, include_interpretation)
+                parsed.append((name, survival_data, openai_message, None))
+            except ValueError as e:
+                parsed.append((name, None, None, str(e)))
+
+        valid = [(survival_data.time_to_event, survival_data.event_status, survival_data.weights)
+                 for _, survival_data, _, error in parsed if error is None]
+        fitted = iter(fit_cohorts(valid, DISTRIBUTIONS))
+
+        results = []
+        pending = []
+        for name, survival_data, openai_message, error in parsed:
+            if error is not None:
+                results.append({'name': name, 'error': error})
+                continue
+            result = _summarize_cohort(name, survival_data, next(fitted), include_plots, render_mode, max_points,
+                                       profile)
+            results.append(result)
+            if include_interpretation:
+                pending.append((survival_data, openai_message, result))
+
+        # The LLM calls only wait on the network, so the cohorts run them side by side
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(LLM_MAX_WORKERS, len(pending))) as executor:
+                interpretations = list(executor.map(lambda job: _interpret_cohort(*job), pending))
+            for (_, _, result), interpretation in zip(pending, interpretations):
+                result.update(interpretation)
+
+        return JsonResponse({'count': len(results), 'results': results})
+
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON input'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 # view untuk menangani permintaan statistik
 @csrf_exempt
 def get_statistics(request):
@@ -120,19 +354,34 @@ def get_statistics(request):
             variable = data.get('variable')
             data_values = data.get('data')
             is_numeric = data.get('isNumeric', True)
+            render_mode = _render_mode(request, data, STATISTICS_RENDER_MODES)
+            if render_mode is None:
+                return JsonResponse({'error': f"'render' must be one of {', '.join(_available_render_modes(STATISTICS_RENDER_MODES))}."}, status=400)
+            profile = _render_profile(request, data)
+            if profile is None:
+                return JsonResponse({'error': f"'profile' must be one of {', '.join(RENDER_PROFILES)}."}, status=400)
+            top_k = _top_k(request, data)
+            if top_k is None:
+                return JsonResponse({'error': f"'top_k' must be an integer from 1 to {MAX_CATEGORY_TOP_K}."}, status=400)
 
             if not variable or not data_values:
                 return JsonResponse({'error': 'Missing required fields'}, status=400)
 
-            # pastikan data yang dikirim adalah angka jika is_numeric True, jika tidak maka anggap string
-            if is_numeric:
-                data_values = [float(value) for value in data_values if value is not None]
-            else:
-                # data string tidak perlu dikonversi
-                data_values = [str(value) for value in data_values if value is not None]
+            data_values = _clean_values(data_values, is_numeric)
+
+            if _flag(request, data, 'approximate'):
+                # Body sudah dibatasi DATA_UPLOAD_MAX_MEMORY_SIZE, jadi kolom ini kecil: the sketches
+                # give the approximate response (exact, with errors of 0, while nothing is dropped).
+                # Columns too large for one request go to get-statistics/stream/ or get-statistics/dataset/.
+                if not data_values:
+                    return JsonResponse({'error': 'Missing required fields'}, status=400)
+                column = ApproximateColumn(bool(is_numeric))
+                for start in range(0, len(data_values), APPROX_CHUNK):
+                    column.update(data_values[start:start + APPROX_CHUNK])
+                return JsonResponse(column.statistics(render_mode, profile, top_k))
 
             # proses statistik
-            stats_result = process_statistics(data_values, is_numeric)
+            stats_result = process_statistics(data_values, is_numeric, render_mode, profile, top_k)
 
             return JsonResponse(stats_result)
 
@@ -142,6 +391,142 @@ def get_statistics(request):
             return JsonResponse({'error': str(e)}, status=400)
 
 
+def _clean_values(data_values, is_numeric):
+    # pastikan data yang dikirim adalah angka jika is_numeric True, jika tidak maka anggap string
+    if is_numeric:
+        return [float(value) for value in data_values if value is not None]
+    # data string tidak perlu dikonversi
+    return [str(value) for value in data_values if value is not None]
+
+
+def _spool_body(request):
+    """The raw request body in a temporary file (in memory up to FILE_UPLOAD_MAX_MEMORY_SIZE, then
+    on disk), like a multipart upload. request.body would stop at DATA_UPLOAD_MAX_MEMORY_SIZE."""
+    upload = tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+    for piece in iter(lambda: request.read(UPLOAD_READ_SIZE), b''):
+        upload.write(piece)
+    upload.seek(0)
+    return upload
+
+
+# Statistik semua kolom dari satu file CSV/Parquet (multipart 'file' atau body mentah)
+@csrf_exempt
+def get_dataset_statistics(request):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+    try:
+        if request.content_type == 'multipart/form-data':
+            data = request.POST
+            upload = request.FILES.get('file')
+            size = upload.size if upload is not None else 0
+        else:
+            data = {}
+            size = int(request.META.get('CONTENT_LENGTH') or 0)
+            upload = None
+        if size > DATASET_MAX_BYTES:
+            return JsonResponse({'error': f"Datasets are limited to {DATASET_MAX_BYTES // (1024 * 1024)} MiB."}, status=400)
+        if upload is None and size:
+            upload = _spool_body(request)
+        if upload is None:
+            return JsonResponse({'error': "Upload a CSV or Parquet file as 'file'."}, status=400)
+
+        render_mode = _render_mode(request, data, STATISTICS_RENDER_MODES)
+        if render_mode is None:
+            return JsonResponse({'error': f"'render' must be one of {', '.join(_available_render_modes(STATISTICS_RENDER_MODES))}."}, status=400)
+        profile = _render_profile(request, data)
+        if profile is None:
+            return JsonResponse({'error': f"'profile' must be one of {', '.join(RENDER_PROFILES)}."}, status=400)
+        top_k = _top_k(request, data)
+        if top_k is None:
+            return JsonResponse({'error': f"'top_k' must be an integer from 1 to {MAX_CATEGORY_TOP_K}."}, status=400)
+        plots = _flag(request, data, 'plots')
+
+        if _flag(request, data, 'approximate'):
+            return JsonResponse(approximate_dataset_statistics(upload, plots, render_mode, profile, top_k))
+        return JsonResponse(dataset_statistics(read_dataset(upload), plots, render_mode, profile, top_k))
+
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+# Statistik streaming: kolom besar dikirim per potongan ke satu sesi (lihat view.streaming_stats)
+@csrf_exempt
+def start_statistics_stream(request):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON format'}, status=400)
+    is_numeric = bool(data.get('isNumeric', True))
+    # approximate=true: sesi hanya menyimpan sketch berukuran tetap (lihat view.approximate_stats)
+    accumulator = ApproximateColumn(is_numeric) if _flag(request, data, 'approximate') else ColumnAccumulator(is_numeric)
+    try:
+        session_id = start_session(accumulator)
+    except ImproperlyConfigured as e:
+        return JsonResponse({'error': str(e)}, status=503)
+    return JsonResponse({'session': session_id, 'max_chunk': STATS_STREAM_MAX_CHUNK}, status=201)
+
+
+@csrf_exempt
+def add_statistics_chunk(request, session):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+    try:
+        data = json.loads(request.body)
+        data_values = data.get('data')
+        seq = data.get('seq')
+        if not isinstance(data_values, list) or not isinstance(seq, int) or isinstance(seq, bool) or seq < 0:
+            return JsonResponse({'error': "'data' must be a list and 'seq' a chunk number from 0."}, status=400)
+        if len(data_values) > STATS_STREAM_MAX_CHUNK:
+            return JsonResponse({'error': f"At most {STATS_STREAM_MAX_CHUNK} values per chunk."}, status=400)
+        with session_lock(session):
+            accumulator = load_session(session)
+            add_chunk(session, accumulator, _clean_values(data_values, accumulator.is_numeric), seq)
+        return JsonResponse({'session': session, 'chunks': accumulator.chunks, 'count': accumulator.count})
+
+    except LookupError as e:
+        return JsonResponse({'error': str(e)}, status=404)
+    except TimeoutError as e:
+        return JsonResponse({'error': str(e)}, status=409)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON format'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+@csrf_exempt
+def finalize_statistics_stream(request, session):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+    try:
+        data = json.loads(request.body) if request.body else {}
+        render_mode = _render_mode(request, data, STATISTICS_RENDER_MODES)
+        if render_mode is None:
+            return JsonResponse({'error': f"'render' must be one of {', '.join(_available_render_modes(STATISTICS_RENDER_MODES))}."}, status=400)
+        profile = _render_profile(request, data)
+        if profile is None:
+            return JsonResponse({'error': f"'profile' must be one of {', '.join(RENDER_PROFILES)}."}, status=400)
+        top_k = _top_k(request, data)
+        if top_k is None:
+            return JsonResponse({'error': f"'top_k' must be an integer from 1 to {MAX_CATEGORY_TOP_K}."}, status=400)
+
+        # A chunk still being applied finishes first
+        with session_lock(session):
+            stats_result = finalize_statistics(load_session(session), render_mode, profile, top_k)
+            end_session(session)
+        return JsonResponse(stats_result)
+
+    except LookupError as e:
+        return JsonResponse({'error': str(e)}, status=404)
+    except TimeoutError as e:
+        return JsonResponse({'error': str(e)}, status=409)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON format'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
 def index_views(request):
     return render(request, "index.html")
 
@@ -54,6 +54,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'dino_chatbot.middleware.MemoryWatchdogMiddleware',
 ]
 
 ROOT_URLCONF = 'dino_gpt.urls'
@@ -88,6 +89,35 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Hasil fitting distribusi disimpan di sini; gunakan Redis/Memcached agar dibagi antar worker
+
+# Sesi statistik streaming harus dibaca oleh worker mana pun yang menerima potongan berikutnya, so
+# 'stats-stream' cannot be process-local (LocMemCache is refused). The default is a table in the
+# app database (python manage.py createcachetable, run on release); with several hosts point it
+# at a shared server such as Redis.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='survival-app'),
+    },
+    'stats-stream': {
+        'BACKEND': config('STATS_STREAM_CACHE_BACKEND', default='django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': config('STATS_STREAM_CACHE_LOCATION', default='stats_stream_cache'),
+    },
+}
+
+# Direktori plot store untuk render=url; kosong (default) berarti render=url tidak tersedia.
+# Every instance serving the app must read and write the same directory: the gunicorn workers
+# of one host, or a volume mounted on every host. Heroku dynos each have their own disk, cleared
+# on restart, so leave it unset there; the plot URLs would 404 on the other dynos.
+PLOT_STORE_DIR = config('PLOT_STORE_DIR', default='')
+
+# Batas RSS per worker; di atas batas ini worker di-recycle setelah request yang sedang berjalan (0 = mati)
+WORKER_MAX_RSS_MB = config('WORKER_MAX_RSS_MB', default=1024, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -0,0 +1,23 @@
+import os
+
+# Load the Django app in the master and warm it up before forking, so workers start
+# with scipy/matplotlib/openai already imported and share those pages copy-on-write.
+# Figure templates are per thread: every request thread builds its own on its first plot.
+preload_app = True
+
+# Plotting uses per-thread figures and no pyplot state, so one worker can serve several requests at once
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+
+def when_ready(server):
+    from view.warmup import warmup
+    warmup()
+
+
+def post_fork(server, worker):
+    from view.watchdog import install_watchdog
+    # Recycling gracefully: the worker stops accepting, finishes its in-flight requests and the
+    # master starts a fresh one. MEMORY_TRACE_FRAMES > 0 adds tracemalloc allocation sites to the report.
+    install_watchdog(lambda: setattr(worker, 'alive', False),
+                     trace_frames=int(os.environ.get('MEMORY_TRACE_FRAMES', 0)))
@@ -0,0 +1,223 @@
+import math
+from collections import Counter
+import numpy as np
+from .constants import HISTOGRAM_BINS, BOXPLOT_WHISKER, BOXPLOT_MAX_FLIERS, OTHER_CATEGORY
+
+# Ringkasan data untuk plot deskriptif: plot digambar dari agregat ini, bukan dari data mentah,
+# so drawing costs O(bins + fliers) whatever the column size. The dicts are JSON-ready and
+# double as the plot store payloads.
+
+
+def weighted_quantiles(values, weights, quantiles):
+    """Lower weighted quantiles: for each q the first value (in sorted order) reaching q of the total weight."""
+    order = np.argsort(values, kind='stable')
+    cumulative = np.cumsum(np.asarray(weights, dtype=float)[order])
+    index = np.searchsorted(cumulative, np.asarray(quantiles) * cumulative[-1], side='left')
+    return np.asarray(values, dtype=float)[order][np.minimum(index, len(order) - 1)]
+
+
+def box_statistics(values, whis=BOXPLOT_WHISKER, max_fliers=BOXPLOT_MAX_FLIERS, weights=None):
+    """Quartiles, whiskers and outliers in the layout of matplotlib's boxplot_stats (for Axes.bxp).
+
+    Whiskers reach the most extreme values within whis * IQR of the box, like Axes.boxplot.
+    At most max_fliers outliers are kept, evenly spread over their sorted ranks so the
+    extremes are always drawn. With weights (items of a quantile sketch) the quartiles are
+    weighted quantiles and n_fliers counts the weight outside the whiskers.
+    """
+    values = np.asarray(values, dtype=float)
+    if weights is None:
+        q1, med, q3 = np.percentile(values, [25, 50, 75])
+    else:
+        weights = np.asarray(weights, dtype=float)
+        q1, med, q3 = weighted_quantiles(values, weights, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+
+    upper = values[values <= q3 + whis * iqr]
+    whishi = q3 if len(upper) == 0 or np.max(upper) < q3 else np.max(upper)
+    lower = values[values >= q1 - whis * iqr]
+    whislo = q1 if len(lower) == 0 or np.min(lower) > q1 else np.min(lower)
+
+    outside = (values < whislo) | (values > whishi)
+    fliers = np.concatenate([values[values < whislo], values[values > whishi]])
+    if len(fliers) > max_fliers:
+        fliers = np.sort(fliers)[np.linspace(0, len(fliers) - 1, max_fliers).round().astype(int)]
+
+    return {
+        'med': float(med),
+        'q1': float(q1),
+        'q3': float(q3),
+        'whislo': float(whislo),
+        'whishi': float(whishi),
+        'fliers': fliers.tolist(),
+        'n_fliers': int(np.sum(outside)) if weights is None else int(round(weights[outside].sum())),
+    }
+
+
+def histogram_counts(values, bins=HISTOGRAM_BINS):
+    """Bin edges and counts, binned like Axes.hist."""
+    counts, edges = np.histogram(np.asarray(values, dtype=float), bins=bins)
+    return {'edges': edges.tolist(), 'counts': counts.tolist()}
+
+
+def sorted_percentiles(ordered, percentiles):
+    """np.percentile's default (linear) interpolation, read off an already sorted array."""
+    position = np.asarray(percentiles, dtype=float) / 100 * (len(ordered) - 1)
+    lower = np.floor(position).astype(int)
+    upper = np.minimum(lower + 1, len(ordered) - 1)
+    gamma = position - lower
+    below, above = ordered[lower], ordered[upper]
+    # Interpolate from the nearer end, the way numpy does
+    return np.where(gamma >= 0.5, above - (above - below) * (1 - gamma), below + (above - below) * gamma)
+
+
+def sorted_box_statistics(ordered, whis=BOXPLOT_WHISKER, max_fliers=BOXPLOT_MAX_FLIERS):
+    """box_statistics of an already sorted array; whiskers and outliers are binary searches."""
+    q1, med, q3 = sorted_percentiles(ordered, [25, 50, 75])
+    iqr = q3 - q1
+
+    below_upper = np.searchsorted(ordered, q3 + whis * iqr, side='right')
+    whishi = q3 if below_upper == 0 or ordered[below_upper - 1] < q3 else ordered[below_upper - 1]
+    above_lower = np.searchsorted(ordered, q1 - whis * iqr, side='left')
+    whislo = q1 if above_lower == len(ordered) or ordered[above_lower] > q1 else ordered[above_lower]
+
+    fliers = np.concatenate([ordered[:np.searchsorted(ordered, whislo, side='left')],
+                             ordered[np.searchsorted(ordered, whishi, side='right'):]])
+    n_fliers = len(fliers)
+    if n_fliers > max_fliers:
+        fliers = fliers[np.linspace(0, n_fliers - 1, max_fliers).round().astype(int)]
+
+    return {
+        'med': float(med),
+        'q1': float(q1),
+        'q3': float(q3),
+        'whislo': float(whislo),
+        'whishi': float(whishi),
+        'fliers': fliers.tolist(),
+        'n_fliers': n_fliers,
+    }
+
+
+def sorted_histogram_counts(ordered, bins=HISTOGRAM_BINS):
+    """histogram_counts of an already sorted array: each count is the gap between two binary searches."""
+    edges = np.histogram_bin_edges(ordered, bins=bins, range=(ordered[0], ordered[-1]))
+    # Values on an inner edge belong to the bin on its right, the last bin keeps its right edge
+    bounds = np.concatenate([[0], np.searchsorted(ordered, edges[1:-1], side='left'), [len(ordered)]])
+    return {'edges': edges.tolist(), 'counts': np.diff(bounds).tolist()}
+
+
+def numeric_aggregates(values, bins=HISTOGRAM_BINS, presorted=False):
+    """Everything the boxplot and histogram need, read off one sorted array.
+
+    presorted=True skips the sort when the caller already sorted the values (for numeric_summary).
+    """
+    values = np.asarray(values, dtype=float)
+    ordered = values if presorted else np.sort(values)
+    return {'box': sorted_box_statistics(ordered), 'histogram': sorted_histogram_counts(ordered, bins)}
+
+
+def numeric_summary(values, ordered=None):
+    """Moments, extremes, median, mode and distinct count of a numeric column, from one sort.
+
+    Definitions follow the statistics module and scipy.stats: sample standard deviation,
+    biased skewness and excess kurtosis, the median averaging the middle pair, and the mode as
+    the most common value seen first in the data (None when every value is distinct).
+    Values that need more observations than there are (std, skewness, kurtosis) are None.
+    ordered, the values already sorted, skips the sort.
+    """
+    ordered = None if ordered is None else np.asarray(ordered, dtype=float).reshape(-1, 1)
+    return numeric_summaries(np.asarray(values, dtype=float).reshape(-1, 1), ordered)[0]
+
+
+def numeric_summaries(columns, ordered=None):
+    """numeric_summary of every column of a 2-D array at once; NaN marks a missing value.
+
+    A single sort along the rows serves every column and the moments are masked array
+    arithmetic over all columns together. ordered, the columns already sorted along the rows,
+    skips that sort. Returns one summary per column, None for a column without values.
+    """
+    columns = np.asarray(columns, dtype=float)
+    # Column-major, so every per-column reduction runs over contiguous memory
+    ordered = np.asfortranarray(np.sort(columns, axis=0) if ordered is None else ordered)
+    valid = ~np.isnan(ordered)
+    counts = valid.sum(axis=0)
+    present = np.flatnonzero(counts)
+    index = np.arange(ordered.shape[1])
+
+    # Runs of equal values in each sorted column (NaNs sort last) give the distinct values
+    starts = valid.copy()
+    starts[1:] &= ordered[1:] != ordered[:-1]
+    unique_counts = starts.sum(axis=0)
+
+    # Exactly rounded sums, so the mean rounds like statistics.mean at the 2-decimal boundaries
+    totals = np.zeros(ordered.shape[1])
+    totals[present] = [math.fsum(ordered[:counts[column], column].tolist()) for column in present]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = totals / counts
+        deviations = np.where(valid, ordered - means, 0.0)
+        squared = deviations * deviations
+        m2 = squared.sum(axis=0) / counts
+        skewness = (squared * deviations).sum(axis=0) / counts / m2 ** 1.5
+        kurtosis = (squared * squared).sum(axis=0) / counts / m2 ** 2 - 3.0
+        std = np.sqrt(squared.sum(axis=0) / (counts - 1))
+
+    last = np.maximum(counts - 1, 0)
+    medians = (ordered[last // 2, index] + ordered[counts // 2, index]) / 2
+    medians[counts % 2 == 1] = ordered[counts // 2, index][counts % 2 == 1]
+
+    summaries = [None] * ordered.shape[1]
+    for column in present:
+        n = int(counts[column])
+        mode = None
+        if unique_counts[column] < n:
+            run_starts = np.flatnonzero(starts[:n, column])
+            run_lengths = np.diff(np.append(run_starts, n))
+            tied = ordered[run_starts[run_lengths == run_lengths.max()], column]
+            if len(tied) == 1:
+                mode = tied[0]
+            else:
+                original = columns[:, column]
+                mode = original[np.argmax(np.isin(original, tied))]
+        summaries[column] = {
+            'count': n,
+            'sum': float(totals[column]),
+            'mean': float(means[column]),
+            'median': float(medians[column]),
+            'mode': None if mode is None else float(mode),
+            'std': float(std[column]) if n > 1 else None,
+            'skewness': float(skewness[column]) if n > 2 else None,
+            'kurtosis': float(kurtosis[column]) if n > 3 else None,
+            'min': float(ordered[0, column]),
+            'max': float(ordered[n - 1, column]),
+            'unique_count': int(unique_counts[column]),
+        }
+    return summaries
+
+
+def other_category(folded):
+    """Label of the entry that stands for `folded` categories outside the top ones."""
+    return f"{OTHER_CATEGORY} ({folded} {'category' if folded == 1 else 'categories'})"
+
+
+def top_category_counts(counts, top_k):
+    """The top_k most common categories of a Counter, most common first (ties in order of first
+    appearance), and the rest folded into one final "Other (n categories)" entry."""
+    top = counts.most_common(top_k)
+    categories = [category for category, _ in top]
+    totals = [count for _, count in top]
+    folded = len(counts) - len(top)
+    if folded:
+        categories.append(other_category(folded))
+        totals.append(counts.total() - sum(totals))
+    return categories, totals
+
+
+def category_counts(values, top_k=None):
+    """Categories with their counts, from one hash-counting pass over the values.
+
+    Without top_k every category is returned in order of first appearance; with top_k the
+    result is truncated by top_category_counts, so it stays bounded whatever the cardinality.
+    """
+    counts = Counter(values)
+    if top_k is None:
+        return list(counts), list(counts.values())
+    return top_category_counts(counts, top_k)
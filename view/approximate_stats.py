@@ -0,0 +1,286 @@
+import heapq
+import math
+from collections import Counter
+import numpy as np
+from .aggregates import histogram_counts, other_category
+from .descriptive_stats import numeric_statistics_from_summary, statistics_response
+from .streaming_stats import MomentAccumulator, QuantileSketch, sketch_box
+from .constants import (HISTOGRAM_BINS, CATEGORY_TOP_K, DEFAULT_RENDER_PROFILE, APPROX_HLL_PRECISION, APPROX_SKETCH_K,
+                        APPROX_HEAVY_HITTERS, APPROX_RESERVOIR_SIZE)
+from .lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+# Statistik aproksimasi untuk kolom yang sangat besar (approximate=true pada sesi streaming dan
+# upload dataset). The column arrives a chunk at a time and only fixed-size sketches are kept:
+# HyperLogLog for the distinct count, the KLL quantile sketch for the median and the boxplot, a
+# Misra-Gries heavy-hitters summary for the mode and the category counts and a reservoir sample
+# for the histogram.
+# Count, sum, mean, std, skewness, kurtosis, min and max stay exact (streamed moments). Every
+# approximate field is followed by "<field>Error": "count" is an absolute count error, "rank"
+# a normalized rank error and "relative" a relative error; "low"/"high" bound the value.
+# A sketch that never had to drop anything reports an error of 0, and its value is exact.
+
+
+def kll_rank_error(k):
+    """Normalized rank error of a KLL sketch with parameter k (DataSketches' two-sided 99% bound)."""
+    return 2.296 / k ** 0.9723
+
+
+def hash_values(values):
+    """64-bit hashes of numbers or strings, the same in every process."""
+    if isinstance(values, np.ndarray):
+        # -0.0 + 0.0 is 0.0, so equal numbers hash alike
+        return pd.util.hash_array(values + 0.0)
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+class HyperLogLog:
+    """Distinct count estimate from 2 ** precision registers (Flajolet et al., with linear
+    counting for small counts); relative standard error 1.04 / sqrt(2 ** precision)."""
+
+    def __init__(self, precision=APPROX_HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update(self, hashes):
+        """Add values by their 64-bit hashes (hash_values)."""
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # Position of the first 1 in the next 32 bits, counted from the top: 32 minus their
+        # bit length, which frexp reads off exactly as a float's exponent
+        words = ((hashes << np.uint64(self.precision)) >> np.uint64(32)).astype(float)
+        rank = 33 - np.frexp(words)[1]
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+
+class HeavyHitters:
+    """Misra-Gries summary of at most `capacity` counters, merged a chunk at a time.
+
+    Each kept count is low by at most `error`, and so is the count of a value that was
+    dropped (taken as 0); `error` never exceeds total / (capacity + 1). While it is 0 the
+    counts are exact and in order of first appearance, like a Counter of every value.
+    """
+
+    def __init__(self, capacity=APPROX_HEAVY_HITTERS):
+        self.capacity = capacity
+        self.counts = Counter()
+        self.error = 0
+        self.total = 0
+
+    def update(self, values):
+        """Add a chunk: a list of values, or a float array (counted with numpy)."""
+        if isinstance(values, np.ndarray):
+            ordered = np.sort(values)
+            starts = np.flatnonzero(np.concatenate([[True], ordered[1:] != ordered[:-1]]))
+            items, counts = ordered[starts], np.diff(np.append(starts, len(ordered)))
+            if len(counts) <= self.capacity:
+                # Few distinct values: keep them in order of first appearance, like a Counter
+                first = np.full(len(items), len(values))
+                np.minimum.at(first, np.searchsorted(items, values), np.arange(len(values)))
+                order = np.argsort(first)
+                items, counts = items[order], counts[order]
+            else:
+                # Reduced on its own first, so only the chunk's frequent values reach the Counter
+                cut = np.sort(counts)[-(self.capacity + 1)]
+                self.error += int(cut)
+                keep = counts > cut
+                items, counts = items[keep], counts[keep] - cut
+            self.counts.update(dict(zip(items.tolist(), counts.tolist())))
+        else:
+            self.counts.update(values)
+        self.total += len(values)
+        self._reduce()
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.error += other.error
+        self._reduce()
+
+    def _reduce(self):
+        if len(self.counts) <= self.capacity:
+            return
+        # Subtracting the (capacity + 1)-th largest count takes that much from at least
+        # capacity + 1 counters, so the sum of all cuts stays within total / (capacity + 1)
+        cut = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+        self.error += cut
+        self.counts = Counter({value: count - cut for value, count in self.counts.items() if count > cut})
+
+
+class Reservoir:
+    """Uniform random sample of at most `size` of the values seen (Vitter's algorithm R)."""
+
+    def __init__(self, size=APPROX_RESERVOIR_SIZE, seed=0):
+        self.size = size
+        self.seen = 0
+        self.sample = np.empty(0)
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def is_exact(self):
+        return self.seen <= self.size
+
+    def update(self, values):
+        free = max(self.size - len(self.sample), 0)
+        self.sample = np.concatenate([self.sample, values[:free]])
+        rest = values[free:]
+        if len(rest):
+            # Value number j (0-based) takes a random slot with probability size / (j + 1)
+            positions = self.seen + free + np.arange(len(rest))
+            slots = self._rng.integers(0, positions + 1)
+            taken = slots < self.size
+            # Of the values drawing the same slot the last one stays
+            slots, items = slots[taken][::-1], rest[taken][::-1]
+            slots, last = np.unique(slots, return_index=True)
+            self.sample[slots] = items[last]
+        self.seen += len(values)
+
+    def histogram(self, minimum, maximum, bins=HISTOGRAM_BINS):
+        """Bins like aggregates.histogram_counts, with the sample counts scaled to every value."""
+        if self.is_exact:
+            return histogram_counts(self.sample, bins)
+        counts, edges = np.histogram(self.sample, bins=bins, range=(minimum, maximum))
+        counts = np.round(counts * (self.seen / len(self.sample))).astype(np.int64)
+        return {'edges': edges.tolist(), 'counts': counts.tolist()}
+
+    def count_error(self):
+        """Two standard errors of a scaled bin count, at its worst (a bin holding half the values)."""
+        return 0 if self.is_exact else int(math.ceil(self.seen / math.sqrt(len(self.sample))))
+
+
+def _unique_count(distinct, hitters):
+    """Distinct count with its error: exact while the heavy hitters kept every value, else the
+    HyperLogLog estimate with a range of three standard errors."""
+    if hitters.error == 0:
+        return len(hitters.counts), {"relative": 0.0, "low": len(hitters.counts), "high": len(hitters.counts)}
+    estimate = min(distinct.estimate(), hitters.total)
+    relative = 3 * distinct.relative_error
+    low = max(int(math.floor(estimate * (1 - relative))), len(hitters.counts))
+    high = min(int(math.ceil(estimate * (1 + relative))), hitters.total)
+    return max(int(round(estimate)), len(hitters.counts)), {"relative": round(relative, 4), "low": low, "high": high}
+
+
+def _with_errors(response, errors):
+    """The response with every "<field>Error" right after its field."""
+    result = {}
+    for key, value in response.items():
+        result[key] = value
+        if key in errors:
+            result[f"{key}Error"] = errors[key]
+    return result
+
+
+class ApproximateColumn:
+    """Sketches of one column, fed a chunk at a time, in the interface of
+    streaming_stats.ColumnAccumulator, so it can back a streaming session or a dataset column.
+
+    Its size is fixed whatever the number of values or categories: the moments, the quantile
+    sketch, HyperLogLog registers, APPROX_HEAVY_HITTERS counters and the reservoir.
+    """
+
+    def __init__(self, is_numeric):
+        self.is_numeric = is_numeric
+        self.chunks = 0
+        self.distinct = HyperLogLog()
+        self.hitters = HeavyHitters()
+        if is_numeric:
+            self.moments = MomentAccumulator()
+            self.sketch = QuantileSketch(k=APPROX_SKETCH_K)
+            self.reservoir = Reservoir()
+
+    @property
+    def count(self):
+        return self.hitters.total
+
+    def update(self, values):
+        """Add one chunk: floats for a numeric column, strings for a categorical one."""
+        if self.is_numeric:
+            values = np.asarray(values, dtype=float)
+            self.moments.update(values)
+            self.sketch.update(values)
+            self.reservoir.update(values)
+        if len(values):
+            self.distinct.update(hash_values(values))
+            self.hitters.update(values)
+        self.chunks += 1
+
+    def statistics(self, render="png", profile=DEFAULT_RENDER_PROFILE, top_k=CATEGORY_TOP_K, plots=True):
+        """The process_statistics response, each approximate field followed by its error."""
+        if self.is_numeric:
+            statistics, errors = self._numeric_statistics()
+        else:
+            statistics, errors = self._categorical_statistics(top_k)
+        if not plots:
+            response = {"type": "Numeric" if self.is_numeric else "Categorical", **statistics}
+        elif self.is_numeric:
+            moments = self.moments
+            response = statistics_response(statistics, render, profile,
+                                           sketch_box(self.sketch, moments.minimum, moments.maximum),
+                                           self.reservoir.histogram(moments.minimum, moments.maximum))
+            errors["boxplot"] = {"rank": errors["median"]["rank"]}
+            errors["histogram"] = {"count": self.reservoir.count_error(), "sampleSize": len(self.reservoir.sample)}
+        else:
+            response = statistics_response(statistics, render, profile)
+        return _with_errors({**response, "approximate": True}, errors)
+
+    def _numeric_statistics(self):
+        sketch, hitters, moments = self.sketch, self.hitters, self.moments
+        rank = 0.0 if sketch.is_exact else kll_rank_error(sketch.k)
+        median, low, high = sketch.quantiles([0.5, max(0.5 - rank, 0.0), min(0.5 + rank, 1.0)])
+        mode, mode_count = hitters.counts.most_common(1)[0] if hitters.counts else (None, 0)
+        unique_count, unique_error = _unique_count(self.distinct, hitters)
+        std, skewness, kurtosis = moments.shape()
+        summary = {
+            'count': moments.count,
+            'sum': moments.total,
+            'mean': moments.total / moments.count,
+            'median': float(median),
+            'mode': mode if mode_count > 1 else None,
+            'std': std,
+            'skewness': skewness,
+            'kurtosis': kurtosis,
+            'min': moments.minimum,
+            'max': moments.maximum,
+            'unique_count': unique_count,
+        }
+        return numeric_statistics_from_summary(summary), {
+            "median": {"rank": round(rank, 4), "low": round(float(low), 2), "high": round(float(high), 2)},
+            "mode": {"count": hitters.error},
+            "uniqueCount": unique_error,
+        }
+
+    def _categorical_statistics(self, top_k):
+        hitters = self.hitters
+        unique_count, unique_error = _unique_count(self.distinct, hitters)
+        top = hitters.counts.most_common(top_k)
+        categories = [category for category, _ in top]
+        totals = [count for _, count in top]
+        folded = unique_count - len(top)
+        if folded > 0:
+            categories.append(other_category(folded))
+            totals.append(hitters.total - sum(totals))
+        # Without any kept category there is no mode to report, like a numeric column without one
+        statistics = {"mode": top[0][0] if top else None, "uniqueCount": unique_count,
+                      "categoryCount": dict(zip(categories, totals))}
+        # The top counts are low by at most the heavy hitters' error, so "Other" is high by up to top_k times it
+        return statistics, {
+            "mode": {"count": hitters.error},
+            "uniqueCount": unique_error,
+            "categoryCount": {"count": hitters.error},
+        }
@@ -28,4 +28,118 @@ PLOT_STYLE = {
 KAPLAN_MEIER = "Kaplan-Meier Estimate"
 SURVIVAL_PROBABILITY = "Survival Probability"
 
-DISTRIBUTIONS = ["weibull", "exponential", "lognormal", "gamma", "loglogistic", "pareto"]
\ No newline at end of file
+# Profil render: format, dpi, bounding box dan kompresi gambar plot, dipilih per request (profile=...).
+# bbox 'tight' measures the layout on every render (an extra draw pass); FIXED_BBOX is a constant
+# box, so the image size never depends on the data or on what was rendered before.
+# compress_level is the lossless PNG zlib level (6 is the default; 9 is smaller and slower).
+# 'standard' is the original output and the default.
+# Box (inci: x0, y0, x1, y1) covering every plot type on the FIGURE_FIGSIZE figure, including the
+# Kaplan-Meier sample info below the axes and bar labels above the tallest bar
+FIXED_BBOX = (0.0, -0.3, 7.6, 6.4)
+RENDER_PROFILES = {
+    'thumbnail': {'format': 'png', 'dpi': 40, 'bbox': FIXED_BBOX, 'compress_level': 9},
+    'mobile': {'format': 'webp', 'dpi': 80, 'bbox': FIXED_BBOX, 'quality': 80},
+    'standard': {'format': 'png', 'dpi': 120, 'bbox': 'tight', 'compress_level': 6},
+    'print': {'format': 'svg', 'dpi': 300, 'bbox': 'tight'},
+}
+DEFAULT_RENDER_PROFILE = 'standard'
+IMAGE_CONTENT_TYPES = {'png': 'image/png', 'webp': 'image/webp', 'svg': 'image/svg+xml'}
+
+# Figure template per jenis plot dibuat sekali per worker lalu dipakai ulang (False: figure baru per plot)
+PLOT_TEMPLATE_REUSE = True
+
+# Titik grid untuk kurva survival dan hazard teoretis
+PLOT_CURVE_POINTS = 200
+
+# Batas titik kurva Kaplan-Meier di JSON dan plot; kurva yang lebih panjang didesimasi dengan
+# toleransi vertikal ini (dilebarkan bila perlu sampai muat di max_points)
+KM_MAX_POINTS = 2000
+KM_MIN_POINTS = 10
+KM_DOWNSAMPLE_TOLERANCE = 0.001
+
+# render=png mengembalikan gambar base64, render=data mengembalikan deret kurva untuk digambar di klien
+# url menyimpan plot di plot store dan mengembalikan URL gambarnya (lihat view.plot_store)
+RENDER_MODES = ("png", "data", "url")
+
+# Naikkan versi ini setiap kali tampilan plot berubah, URL plot lama otomatis tidak terpakai
+PLOT_STYLE_VERSION = 3
+
+# Agregat plot deskriptif: jumlah bin histogram, panjang whisker (x IQR) dan batas outlier yang digambar
+HISTOGRAM_BINS = 10
+BOXPLOT_WHISKER = 1.5
+BOXPLOT_MAX_FLIERS = 1000
+
+# Statistik kategorikal: hanya kategori terbanyak yang dikembalikan, sisanya digabung jadi satu
+CATEGORY_TOP_K = 20
+MAX_CATEGORY_TOP_K = 1000
+OTHER_CATEGORY = "Other"
+
+# Mode render untuk get-statistics (tidak ada deret data untuk plot deskriptif)
+STATISTICS_RENDER_MODES = ("png", "url")
+
+# URL plot berbasis hash isi tidak pernah berubah, jadi boleh di-cache browser selama setahun
+PLOT_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Batas plot store: total file di disk per host dan cache PNG di memori per proses
+PLOT_STORE_MAX_BYTES = 256 * 1024 * 1024
+PLOT_STORE_MEMORY_BYTES = 32 * 1024 * 1024
+
+DISTRIBUTIONS = ["weibull", "exponential", "lognormal", "gamma", "loglogistic", "pareto"]
+
+# Konfigurasi fitting paralel
+# Below this many observations the fits are cheaper than shipping the data to a worker process
+PARALLEL_FIT_MIN_SIZE = 5000
+FIT_TIMEOUT_SECONDS = 30
+
+# Konfigurasi rendering paralel: plot survival dirender bersamaan di pool proses yang tetap hangat
+PARALLEL_RENDER = True
+RENDER_TIMEOUT_SECONDS = 30
+
+# Cara memulai proses pool fitting dan render. gthread workers are multi-threaded, and forking
+# them can copy a lock another thread holds into the child; forkserver forks from a clean
+# single-threaded server instead
+POOL_START_METHOD = 'forkserver'
+
+# Batas jumlah kohort per request batch
+MAX_BATCH_COHORTS = 500
+
+# Jumlah panggilan LLM yang berjalan bersamaan dalam satu request batch
+LLM_MAX_WORKERS = 8
+
+# Cache hasil fitting: LRU lokal per proses di depan backend cache Django bersama
+FIT_CACHE_ALIAS = 'default'
+FIT_CACHE_LOCAL_SIZE = 1024
+FIT_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+# Generasi cache dibaca ulang dari cache bersama paling sering sekali per interval ini (detik), so a
+# local hit needs no round trip; a full invalidation in another worker reaches this one within it
+FIT_CACHE_GENERATION_TTL = 5
+
+# Laporan memori worker: jumlah lokasi alokasi tracemalloc terbesar yang dicatat
+MEMORY_REPORT_TOP = 10
+
+# Statistik streaming: kolom dikirim per potongan ke satu sesi, hanya akumulator yang disimpan.
+# The alias must be a cache every worker shares (settings.CACHES['stats-stream'])
+STATS_STREAM_CACHE_ALIAS = 'stats-stream'
+STATS_STREAM_TIMEOUT = 60 * 60
+# Kunci per sesi: satu potongan diterapkan pada satu waktu. A lock expires after
+# STATS_STREAM_LOCK_TIMEOUT seconds (a crashed worker), a chunk waits at most STATS_STREAM_LOCK_WAIT
+STATS_STREAM_LOCK_TIMEOUT = 60
+STATS_STREAM_LOCK_WAIT = 10
+# Batas nilai per potongan, agar body JSON tetap di bawah DATA_UPLOAD_MAX_MEMORY_SIZE
+STATS_STREAM_MAX_CHUNK = 100000
+# Ukuran sketsa kuantil (KLL), jumlah bin histogram halus dan batas nilai unik yang dihitung persis
+STATS_STREAM_SKETCH_K = 512
+STATS_STREAM_HISTOGRAM_BINS = 2048
+STATS_STREAM_MAX_DISTINCT = 10000
+
+# Upload dataset (CSV/Parquet) untuk statistik semua kolom sekaligus
+DATASET_MAX_BYTES = 50 * 1024 * 1024
+DATASET_MAX_COLUMNS = 500
+UPLOAD_READ_SIZE = 64 * 1024  # body mentah dibaca per 64 KiB, bukan lewat request.body
+
+# Statistik aproksimasi (approximate=true): sketch berukuran tetap, berapa pun panjang kolomnya
+APPROX_CHUNK = 65536  # baris per potongan saat membaca dataset
+APPROX_HLL_PRECISION = 14  # 16384 register, galat relatif standar ~0.8%
+APPROX_SKETCH_K = 512
+APPROX_HEAVY_HITTERS = 1024
+APPROX_RESERVOIR_SIZE = 10000
@@ -0,0 +1,151 @@
+from collections import Counter
+import numpy as np
+from .aggregates import numeric_summaries, numeric_aggregates
+from .descriptive_stats import numeric_statistics_from_summary, categorical_statistics_from_counts, statistics_response
+from .approximate_stats import ApproximateColumn
+from .constants import CATEGORY_TOP_K, DEFAULT_RENDER_PROFILE, DATASET_MAX_COLUMNS, APPROX_CHUNK
+from .lazy import lazy_import
+
+pd = lazy_import('pandas')
+parquet = lazy_import('pyarrow.parquet')
+
+# Statistik deskriptif untuk seluruh dataset (CSV atau Parquet) dalam satu request.
+# The file is parsed once; the numeric columns are summarized together from one 2-D array
+# (aggregates.numeric_summaries) and every categorical column is counted in one pass.
+# With approximate=true the file is read APPROX_CHUNK rows at a time into the sketches of
+# approximate_stats instead, so only one chunk of rows is ever in memory. It is read twice: the
+# first pass only decides each column's type, the same way the whole-file read does.
+
+PARQUET_MAGIC = b'PAR1'
+
+
+def read_dataset(upload):
+    """DataFrame of an uploaded CSV or Parquet file (told apart by the Parquet magic bytes)."""
+    head = upload.read(len(PARQUET_MAGIC))
+    upload.seek(0)
+    if head == PARQUET_MAGIC:
+        return pd.read_parquet(upload, engine='pyarrow')
+    try:
+        return pd.read_csv(upload)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Could not parse the CSV file: {e}")
+
+
+def read_dataset_chunks(upload, rows=APPROX_CHUNK, text_columns=()):
+    """DataFrames of at most `rows` rows of an uploaded CSV or Parquet file, in file order.
+
+    CSV columns named in text_columns are read as the text in the file, never as numbers.
+    """
+    upload.seek(0)
+    head = upload.read(len(PARQUET_MAGIC))
+    upload.seek(0)
+    if head == PARQUET_MAGIC:
+        for batch in parquet.ParquetFile(upload).iter_batches(batch_size=rows):
+            yield batch.to_pandas()
+        return
+    try:
+        yield from pd.read_csv(upload, chunksize=rows, dtype={name: str for name in text_columns})
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Could not parse the CSV file: {e}")
+
+
+def is_numeric_column(series):
+    """Numbers (not booleans) are numeric, everything else is treated as categories."""
+    return pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+
+
+def dataset_statistics(frame, plots=False, render="png", profile=DEFAULT_RENDER_PROFILE, top_k=CATEGORY_TOP_K):
+    """get-statistics results of every column, in column order, plus the row count.
+
+    Missing values are left out per column, like the None values of get-statistics. A column
+    without any value reports an error instead. With plots, each column also gets its plots
+    in the given render mode.
+    """
+    if frame.shape[1] > DATASET_MAX_COLUMNS:
+        raise ValueError(f"At most {DATASET_MAX_COLUMNS} columns per dataset.")
+
+    names = [str(name) for name in frame.columns]
+    numeric = [index for index, (_, series) in enumerate(frame.items()) if is_numeric_column(series)]
+    numeric_indexes = set(numeric)
+    results = [None] * len(names)
+
+    if numeric:
+        matrix = frame.iloc[:, numeric].to_numpy(dtype=float, na_value=np.nan)
+        # NaNs sort last, so each sorted column starts with its values for the plot aggregates
+        ordered = np.sort(matrix, axis=0)
+        for position, (index, summary) in enumerate(zip(numeric, numeric_summaries(matrix, ordered))):
+            if summary is None:
+                continue
+            statistics = numeric_statistics_from_summary(summary)
+            if plots:
+                aggregates = numeric_aggregates(ordered[:summary['count'], position], presorted=True)
+                results[index] = statistics_response(statistics, render, profile, aggregates['box'],
+                                                     aggregates['histogram'])
+            else:
+                results[index] = {"type": "Numeric", **statistics}
+
+    for index, (_, series) in enumerate(frame.items()):
+        if index in numeric_indexes:
+            continue
+        values = [str(value) for value in series.dropna().tolist()]
+        if not values:
+            continue
+        statistics = categorical_statistics_from_counts(Counter(values), top_k)
+        results[index] = (statistics_response(statistics, render, profile) if plots
+                          else {"type": "Categorical", **statistics})
+
+    columns = [{"variable": name, **result} if result is not None else {"variable": name, "error": "Column has no values."}
+               for name, result in zip(names, results)]
+    return {"rowCount": int(frame.shape[0]), "columnCount": len(names), "columns": columns}
+
+
+def _column_types(upload):
+    """Labels of the file's columns, whether each is numeric and the labels of the mixed ones.
+
+    Like the type of a column read whole (is_numeric_column), a column is numeric only when
+    every chunk reads its values as numbers. A categorical column that some chunk reads as
+    numbers is mixed, and must be read again as text to get the values as written.
+    """
+    labels, numeric, read_as_numbers = None, None, None
+    for frame in read_dataset_chunks(upload):
+        if labels is None:
+            if frame.shape[1] > DATASET_MAX_COLUMNS:
+                raise ValueError(f"At most {DATASET_MAX_COLUMNS} columns per dataset.")
+            labels = list(frame.columns)
+            numeric = [True] * len(labels)
+            read_as_numbers = [False] * len(labels)
+        for index, (_, series) in enumerate(frame.items()):
+            if not series.notna().any():
+                continue
+            if is_numeric_column(series):
+                read_as_numbers[index] = True
+            else:
+                numeric[index] = False
+    if labels is None:
+        raise ValueError("The file has no rows.")
+    mixed = [label for label, is_numeric, as_numbers in zip(labels, numeric, read_as_numbers)
+             if as_numbers and not is_numeric]
+    return labels, numeric, mixed
+
+
+def approximate_dataset_statistics(upload, plots=False, render="png", profile=DEFAULT_RENDER_PROFILE,
+                                   top_k=CATEGORY_TOP_K):
+    """dataset_statistics from the sketches of approximate_stats, reading the file a chunk of rows
+    at a time: once to type the columns (_column_types), once to feed the sketches."""
+    labels, numeric, mixed = _column_types(upload)
+    names = [str(label) for label in labels]
+    columns, rows = [None] * len(names), 0
+    for frame in read_dataset_chunks(upload, text_columns=mixed):
+        rows += len(frame)
+        for index, (_, series) in enumerate(frame.items()):
+            series = series.dropna()
+            if not len(series):
+                continue
+            if columns[index] is None:
+                columns[index] = ApproximateColumn(numeric[index])
+            column = columns[index]
+            column.update(series.to_numpy(dtype=float) if column.is_numeric else series.astype(str).tolist())
+
+    results = [{"variable": name, **column.statistics(render, profile, top_k, plots)} if column is not None
+               else {"variable": name, "error": "Column has no values."} for name, column in zip(names, columns)]
+    return {"rowCount": rows, "columnCount": len(names), "columns": results}
@@ -1,52 +1,97 @@
-import statistics
-from scipy import stats
+from collections import Counter
+import numpy as np
 from .plotting import create_boxplot_base64, create_histogram_base64, create_barchart_base64
+from .aggregates import numeric_aggregates, numeric_summary, top_category_counts
+from .plot_store import plot_url, image_format
+from .constants import DEFAULT_RENDER_PROFILE, CATEGORY_TOP_K
 
-def calculate_numeric_statistics(data_values):
-    if not data_values:
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def calculate_numeric_statistics(data_values, ordered=None):
+    if len(data_values) == 0:
         return None
+    # Satu konversi ke array dan satu sort untuk semua statistik
+    return numeric_statistics_from_summary(numeric_summary(data_values, ordered))
+
+
+def numeric_statistics_from_summary(summary):
+    """Rounded response fields of a numeric summary (aggregates.numeric_summary or a streamed one)."""
     return {
-        "mean": round(statistics.mean(data_values), 2),
-        "median": round(statistics.median(data_values), 2),
-        "mode": round(statistics.mode(data_values), 2) if len(set(data_values)) != len(data_values) else None,
-        "std": round(statistics.stdev(data_values), 2) if len(data_values) > 1 else None,
-        "kurtosis": round(stats.kurtosis(data_values), 2) if len(data_values) > 3 else None,
-        "skewness": round(stats.skew(data_values), 2) if len(data_values) > 2 else None,
-        "min": round(min(data_values), 2),
-        "max": round(max(data_values), 2),
-        "range": round(max(data_values) - min(data_values), 2),
-        "sum": round(sum(data_values), 2),
-        "count": len(data_values),
-        "uniqueCount": len(set(data_values)),
+        "mean": _round(summary['mean']),
+        "median": _round(summary['median']),
+        "mode": _round(summary['mode']),
+        "std": _round(summary['std']),
+        "kurtosis": _round(summary['kurtosis']),
+        "skewness": _round(summary['skewness']),
+        "min": _round(summary['min']),
+        "max": _round(summary['max']),
+        "range": _round(summary['max'] - summary['min']),
+        "sum": _round(summary['sum']),
+        "count": summary['count'],
+        "uniqueCount": summary['unique_count'],
     }
 
 
 # fungsi menghitung statistik untuk data kategori
-def calculate_categorical_statistics(data_values):
+def calculate_categorical_statistics(data_values, top_k=CATEGORY_TOP_K):
+    """Mode, distinct count and the top_k category counts (plus an "Other" bucket), from one counting pass."""
     if not data_values:
         return None
-    category_counts = {category: data_values.count(category) for category in set(data_values)}
+    return categorical_statistics_from_counts(Counter(data_values), top_k)
+
+
+def categorical_statistics_from_counts(counts, top_k=CATEGORY_TOP_K):
+    """Response fields of a Counter of categories."""
+    categories, totals = top_category_counts(counts, top_k)
     return {
-        "mode": max(category_counts, key=category_counts.get),
-        "uniqueCount": len(category_counts),
-        "categoryCount": category_counts
+        "mode": categories[0],
+        "uniqueCount": len(counts),
+        "categoryCount": dict(zip(categories, totals))
     }
 
-def process_statistics(data_values, is_numeric):
-    if is_numeric:
-        return {
+
+def statistics_response(statistics, render="png", profile=DEFAULT_RENDER_PROFILE, box=None, histogram=None):
+    """get-statistics response from computed statistics and their plot aggregates.
+
+    Numeric statistics come with box statistics and bin counts; categorical ones are plotted
+    from their categoryCount, so the bar chart shows the same truncated counts as the table.
+    """
+    if box is not None:
+        result = {
             "type": "Numeric",
-            **calculate_numeric_statistics(data_values),
-            "boxplot": create_boxplot_base64(data_values),
-            "histogram": create_histogram_base64(data_values),
+            **statistics,
+            "boxplot": plot_url('boxplot', box, profile) if render == "url" else create_boxplot_base64(None, box, profile),
+            "histogram": plot_url('histogram', histogram, profile) if render == "url" else create_histogram_base64(None, histogram=histogram, profile=profile),
             "barchart": None
         }
     else:
-        return {
+        counts = (list(statistics["categoryCount"]), list(statistics["categoryCount"].values()))
+        result = {
             "type": "Categorical",
-             **calculate_categorical_statistics(data_values),
+             **statistics,
             "boxplot": None,  # Boxplot tidak relevan untuk data kategorikal
-            "barchart": create_barchart_base64(data_values)
+            "barchart": plot_url('barchart', counts, profile) if render == "url" else create_barchart_base64(None, counts, profile)
         }
+    if render == "png":
+        result["image_format"] = image_format(profile)
+    return result
+
 
+def process_statistics(data_values, is_numeric, render="png", profile=DEFAULT_RENDER_PROFILE, top_k=CATEGORY_TOP_K):
+    """Statistics plus plots; render="url" returns plot URLs from the plot store instead of base64.
 
+    The plots are drawn from aggregates computed once here (box statistics, bin counts,
+    category counts), never from the raw values. profile picks the image format and size.
+    Categorical columns report and plot only their top_k categories plus an "Other" bucket.
+    """
+    if is_numeric:
+        data_values = np.asarray(data_values, dtype=float)
+        # One sort serves the statistics and the plot aggregates
+        ordered = np.sort(data_values)
+        aggregates = numeric_aggregates(ordered, presorted=True)
+        return statistics_response(calculate_numeric_statistics(data_values, ordered), render, profile,
+                                   aggregates['box'], aggregates['histogram'])
+    return statistics_response(calculate_categorical_statistics(data_values, top_k), render, profile)
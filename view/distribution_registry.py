@@ -0,0 +1,200 @@
+import numpy as np
+from .constants import DISTRIBUTIONS, PLOT_CURVE_POINTS
+from .lazy import lazy_import
+from .likelihood import LOG_SQRT_2PI, _gamma_logsf
+
+special = lazy_import('scipy.special')
+stats = lazy_import('scipy.stats')
+
+# One entry per candidate distribution: closed-form log-density and log-survival kernels,
+# parameterized like the fitted params (shape first, then scale), plus the scipy frozen
+# distribution for the CDF-based statistics and the labels shown in the plots.
+# pdf, sf and hazard are all derived from the two log kernels, the hazard as
+# exp(log f - log S) so it stays finite far into the tail where f / S would be 0 / 0.
+
+
+def _weibull_logpdf(t, params):
+    shape, scale = params
+    z = t / scale
+    return np.log(shape) - np.log(scale) + special.xlogy(shape - 1, z) - z ** shape
+
+
+def _weibull_logsf(t, params):
+    shape, scale = params
+    return -(t / scale) ** shape
+
+
+def _exponential_logpdf(t, params):
+    return -np.log(params[0]) - t / params[0]
+
+
+def _exponential_logsf(t, params):
+    return -t / params[0]
+
+
+def _lognormal_z(t, params):
+    s, scale = params
+    return (np.log(t) - np.log(scale)) / s
+
+
+def _lognormal_logpdf(t, params):
+    z = _lognormal_z(t, params)
+    return -np.log(params[0]) - np.log(t) - LOG_SQRT_2PI - 0.5 * z ** 2
+
+
+def _lognormal_logsf(t, params):
+    return special.log_ndtr(-_lognormal_z(t, params))
+
+
+def _gamma_logpdf(t, params):
+    a, scale = params
+    x = t / scale
+    return special.xlogy(a - 1, x) - x - special.gammaln(a) - np.log(scale)
+
+
+def _gamma_logsf_kernel(t, params):
+    a, scale = params
+    return _gamma_logsf(a, t / scale)
+
+
+def _loglogistic_logpdf(t, params):
+    shape, scale = params
+    z = t / scale
+    return np.log(shape) - np.log(scale) + special.xlogy(shape - 1, z) - 2 * np.logaddexp(0, shape * np.log(z))
+
+
+def _loglogistic_logsf(t, params):
+    shape, scale = params
+    return -np.logaddexp(0, shape * np.log(t / scale))
+
+
+def _pareto_logpdf(t, params):
+    b, scale = params
+    return np.where(t >= scale, np.log(b) + b * np.log(scale) - (b + 1) * np.log(t), -np.inf)
+
+
+def _pareto_logsf(t, params):
+    b, scale = params
+    return np.where(t >= scale, b * (np.log(scale) - np.log(t)), 0.0)
+
+
+class SurvivalDistribution:
+    """Vectorized pdf / sf / hazard kernels of one candidate distribution."""
+
+    def __init__(self, name, title, parameter_labels, logpdf, logsf, frozen):
+        self.name = name
+        self.title = title
+        self.label = f"{title} Survival"
+        self.parameter_labels = parameter_labels
+        self._logpdf = logpdf
+        self._logsf = logsf
+        self._frozen = frozen
+
+    def frozen(self, params):
+        """Equivalent scipy.stats frozen distribution."""
+        return self._frozen(params)
+
+    def logpdf(self, t, params):
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return self._logpdf(np.asarray(t, dtype=float), params)
+
+    def logsf(self, t, params):
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return self._logsf(np.asarray(t, dtype=float), params)
+
+    def pdf(self, t, params):
+        return np.exp(self.logpdf(t, params))
+
+    def sf(self, t, params):
+        return np.exp(self.logsf(t, params))
+
+    def hazard(self, t, params):
+        with np.errstate(invalid='ignore', over='ignore'):
+            return np.exp(self.logpdf(t, params) - self.logsf(t, params))
+
+    def evaluate(self, t, params):
+        """pdf, sf, log-sf and hazard on one grid, each kernel evaluated once."""
+        logpdf = self.logpdf(t, params)
+        logsf = self.logsf(t, params)
+        with np.errstate(invalid='ignore', over='ignore'):
+            return {
+                'pdf': np.exp(logpdf),
+                'sf': np.exp(logsf),
+                'log_sf': logsf,
+                'hazard': np.exp(logpdf - logsf),
+            }
+
+    def median(self, params):
+        return float(self.frozen(params).median())
+
+    def param_text(self, params):
+        heading = "Parameters" if len(self.parameter_labels) > 1 else "Parameter"
+        lines = [f"{label}: {value:.3f}" for label, value in zip(self.parameter_labels, params)]
+        return f"{self.title} {heading}:\n" + "\n".join(lines)
+
+
+_DEFINITIONS = {
+    "weibull": SurvivalDistribution(
+        "weibull", "Weibull", ["Shape (c)", "Scale (λ)"], _weibull_logpdf, _weibull_logsf,
+        lambda params: stats.weibull_min(params[0], scale=params[1])),
+    "exponential": SurvivalDistribution(
+        "exponential", "Exponential", ["Rate (λ)"], _exponential_logpdf, _exponential_logsf,
+        lambda params: stats.expon(scale=params[0])),
+    "lognormal": SurvivalDistribution(
+        "lognormal", "Lognormal", ["Shape (σ)", "Scale (μ)"], _lognormal_logpdf, _lognormal_logsf,
+        lambda params: stats.lognorm(params[0], scale=params[1])),
+    "gamma": SurvivalDistribution(
+        "gamma", "Gamma", ["Shape (k)", "Scale (θ)"], _gamma_logpdf, _gamma_logsf_kernel,
+        lambda params: stats.gamma(params[0], scale=params[1])),
+    "loglogistic": SurvivalDistribution(
+        "loglogistic", "Log-Logistic", ["Shape (c)", "Scale (λ)"], _loglogistic_logpdf, _loglogistic_logsf,
+        lambda params: stats.fisk(params[0], scale=params[1])),
+    "pareto": SurvivalDistribution(
+        "pareto", "Pareto", ["Shape (α)", "Scale (xm)"], _pareto_logpdf, _pareto_logsf,
+        lambda params: stats.pareto(params[0], scale=params[1])),
+}
+
+REGISTRY = {name: _DEFINITIONS[name] for name in DISTRIBUTIONS}
+
+
+def get_distribution(name):
+    if name not in REGISTRY:
+        raise ValueError(f"Unsupported distribution: {name}")
+    return REGISTRY[name]
+
+
+class ModelCurves:
+    """Fitted survival and hazard curves of one request, evaluated once on a shared grid.
+
+    The survival grid spans 0 to 110% of the last time; the hazard grid only the range of
+    observed events (None without events). Both are evaluated in a single kernel call.
+    """
+
+    def __init__(self, survival_data, distribution, params):
+        self.distribution = get_distribution(distribution)
+        self.params = tuple(float(p) for p in params)
+
+        self.time = np.linspace(0, survival_data.time_to_event[-1] * 1.1, PLOT_CURVE_POINTS)
+        event_times = survival_data.time_to_event[survival_data.observed == 1]
+        self.hazard_time = None
+        grid = self.time
+        if event_times.size:
+            self.hazard_time = np.linspace(max(0.01, event_times[0]), event_times[-1], PLOT_CURVE_POINTS)
+            grid = np.concatenate([self.time, self.hazard_time])
+
+        values = self.distribution.evaluate(grid, self.params)
+        self.survival = values['sf'][:PLOT_CURVE_POINTS]
+        self.hazard = values['hazard'][PLOT_CURVE_POINTS:] if self.hazard_time is not None else None
+        self._median = None
+
+    @property
+    def median(self):
+        """Model median survival time, computed on first use."""
+        if self._median is None:
+            self._median = self.distribution.median(self.params)
+        return self._median
+
+    def summary_points(self, count=10):
+        """(time, survival) pairs at evenly spaced grid points, for the interpretation prompt."""
+        index = np.linspace(0, PLOT_CURVE_POINTS - 1, count).round().astype(int)
+        return list(zip(self.time[index], self.survival[index]))
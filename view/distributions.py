@@ -1,16 +1,33 @@
 import numpy as np
-from scipy.stats import weibull_min, expon, lognorm, gamma, pareto, fisk
-from scipy.optimize import minimize
-from scipy.stats import kstest
-from lifelines import KaplanMeierFitter
+from .constants import KM_MAX_POINTS
+from .lazy import lazy_import
+from .likelihood import LIKELIHOODS, negative_log_likelihood
+from .goodness_of_fit import SortedSample, goodness_of_fit_statistics
+from .kaplan_meier import kaplan_meier_from_life_table
 
-def calculate_aic(time_to_event, distribution, event_status=None):
-    """Calculate AIC for all distributions with robust error handling."""
+optimize = lazy_import('scipy.optimize')
+special = lazy_import('scipy.special')
+
+# Shape bounds shared by the profile solvers and the general optimizer
+SHAPE_BOUNDS = (0.1, 20)
+LOGNORMAL_SHAPE_BOUNDS = (0.01, 5)
+
+def calculate_aic(time_to_event, distribution, event_status=None, return_info=False, weights=None):
+    """Calculate AIC for all distributions with robust error handling.
+
+    weights are optional row multiplicities (e.g. a tie-compressed life table).
+    With return_info=True a fourth element describes how the fit was obtained
+    (method, iterations, evaluations).
+    """
     if len(time_to_event) == 0:
         raise ValueError("Time-to-event data cannot be empty.")
     
     time_to_event = np.array(time_to_event)
-    n = len(time_to_event)  # Sample size for BIC calculation
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+        if len(weights) != len(time_to_event) or np.any(weights < 0):
+            raise ValueError("Weights must be non-negative and match time-to-event length")
+    n = len(time_to_event) if weights is None else np.sum(weights)  # Sample size for BIC calculation
     
     if not np.all(time_to_event > 0):
         raise ValueError("All time-to-event values must be positive")
@@ -23,65 +40,158 @@ def calculate_aic(time_to_event, distribution, event_status=None):
             raise ValueError("Event status must be 0 (censored) or 1 (event)")
 
     try:
-        # Special handling for Pareto distribution
-        if distribution == "pareto":
-            if event_status is None:
-                # MLE for complete data
-                xm = np.min(time_to_event)
-                alpha = len(time_to_event) / np.sum(np.log(time_to_event/xm))
-            else:
-                # MLE for censored data
-                xm = np.min(time_to_event)
-                alpha = np.sum(event_status) / np.sum(event_status * np.log(time_to_event/xm))
-            
-            params = (alpha, xm)
-            log_likelihood = pareto_log_likelihood(time_to_event, params, event_status)
+        # Closed-form or profiled 1-D solution where one exists, general optimizer otherwise
+        fast_fit = fit_closed_form(time_to_event, distribution, event_status, weights)
+        if fast_fit is not None:
+            params, log_likelihood, fit_info = fast_fit
         else:
-            # For other distributions
-            params, log_likelihood = fit_distribution(time_to_event, distribution, event_status)
+            params, log_likelihood, fit_info = fit_distribution(
+                time_to_event, distribution, event_status, return_info=True, weights=weights
+            )
         
         k = len(params)
         aic = 2 * k - 2 * log_likelihood
         bic = k * np.log(n) - 2 * log_likelihood
         
+        if return_info:
+            return aic, bic, params, fit_info
         return aic,bic, params
     
     except Exception as e:
         raise ValueError(f"Error calculating AIC/BIC for {distribution}: {str(e)}")
 
 
-def fit_distribution(time_to_event, distribution, event_status=None):
+def fit_closed_form(time_to_event, distribution, event_status=None, weights=None):
+    """Fit with a closed-form or profile-likelihood solver.
+
+    Returns (params, log_likelihood, fit_info), or None when the distribution/censoring
+    combination has no fast path and the general optimizer must be used.
+    """
+    if weights is None:
+        weights = np.ones(len(time_to_event))
+    event_weights = weights if event_status is None else weights * event_status
+    censored = event_status is not None and np.any((weights > 0) & (event_status == 0))
+    n_events = np.sum(event_weights)
+    if n_events == 0:
+        return None
+
+    if distribution == "pareto":
+        xm = np.min(time_to_event)
+        # MLE for complete or censored data: events over summed log-excess of the events
+        alpha = n_events / np.sum(event_weights * np.log(time_to_event/xm))
+        params = (alpha, xm)
+        return params, pareto_log_likelihood(time_to_event, params, event_status, weights), _fit_info("closed_form")
+
+    if distribution == "exponential":
+        # Total exposure divided by number of events
+        params = (np.sum(weights * time_to_event) / n_events,)
+        fit_info = _fit_info("closed_form")
+
+    elif distribution == "lognormal" and not censored:
+        log_t = np.log(time_to_event)
+        mean_log_t = np.average(log_t, weights=weights)
+        params = (np.sqrt(np.average((log_t - mean_log_t) ** 2, weights=weights)), np.exp(mean_log_t))
+        if not LOGNORMAL_SHAPE_BOUNDS[0] <= params[0] <= LOGNORMAL_SHAPE_BOUNDS[1]:
+            return None
+        fit_info = _fit_info("closed_form")
+
+    elif distribution == "weibull":
+        profiled = _profile_weibull(time_to_event, event_weights, weights, n_events)
+        if profiled is None:
+            return None
+        params, fit_info = profiled
+
+    elif distribution == "gamma" and not censored:
+        profiled = _profile_gamma(time_to_event, weights)
+        if profiled is None:
+            return None
+        params, fit_info = profiled
+
+    else:
+        return None
+
+    log_likelihood, _ = LIKELIHOODS[distribution](time_to_event, params, event_status, weights)
+    if not np.isfinite(log_likelihood):
+        return None
+    return tuple(float(p) for p in params), log_likelihood, fit_info
+
+
+def _fit_info(method, iterations=0, evaluations=0):
+    return {'method': method, 'iterations': int(iterations), 'evaluations': int(evaluations)}
+
+
+def _profile_weibull(time_to_event, event_weights, weights, n_events):
+    """Weibull MLE: the scale is profiled out, leaving a monotone 1-D score in the shape."""
+    # Work on t / max(t) so t**c cannot overflow, the shape score is scale invariant
+    t_max = np.max(time_to_event)
+    log_u = np.log(time_to_event / t_max)
+    mean_event_log_u = np.sum(event_weights * log_u) / n_events
+
+    def shape_score(c):
+        u_c = weights * np.exp(c * log_u)
+        return np.sum(u_c * log_u) / np.sum(u_c) - 1 / c - mean_event_log_u
+
+    lower, upper = SHAPE_BOUNDS
+    if shape_score(lower) * shape_score(upper) > 0:
+        return None
+    c, root = optimize.brentq(shape_score, lower, upper, xtol=1e-10, full_output=True)
+    scale = t_max * (np.sum(weights * np.exp(c * log_u)) / n_events) ** (1 / c)
+    return (c, scale), _fit_info("profile", root.iterations, root.function_calls)
+
+
+def _profile_gamma(time_to_event, weights):
+    """Complete-data gamma MLE: scale = mean / shape, shape from log(a) - digamma(a) = log(mean) - mean(log t)."""
+    mean_t = np.average(time_to_event, weights=weights)
+    s = np.log(mean_t) - np.average(np.log(time_to_event), weights=weights)
+    if not s > 0:
+        return None
+
+    def shape_score(a):
+        return np.log(a) - special.digamma(a) - s
+
+    lower, upper = SHAPE_BOUNDS
+    if shape_score(lower) * shape_score(upper) > 0:
+        return None
+    a, root = optimize.brentq(shape_score, lower, upper, xtol=1e-10, full_output=True)
+    return (a, mean_t / a), _fit_info("profile", root.iterations, root.function_calls)
+
+
+def fit_distribution(time_to_event, distribution, event_status=None, return_info=False, weights=None):
     """Fit distribution parameters with enhanced stability for all distributions."""
     time_to_event = np.array(time_to_event)
-    mean_t = np.mean(time_to_event)
-    std_t = np.std(time_to_event)
+    mean_t = np.average(time_to_event, weights=weights)
+    var_t = np.average((time_to_event - mean_t) ** 2, weights=weights)
+    log_t = np.log(time_to_event)
+    mean_log_t = np.average(log_t, weights=weights)
+    std_log_t = max(np.sqrt(np.average((log_t - mean_log_t) ** 2, weights=weights)), 1e-3)
+    median_log_t = _weighted_median(log_t, weights) if weights is not None else np.median(log_t)
+    
+    # Moment-based starting points on the log scale, kept inside the bounds
+    weibull_shape = np.clip(np.pi / (np.sqrt(6) * std_log_t), *SHAPE_BOUNDS)
+    gamma_shape = np.clip(mean_t ** 2 / var_t if var_t > 0 else 1.0, *SHAPE_BOUNDS)
+    loglogistic_shape = np.clip(np.pi / (np.sqrt(3) * std_log_t), *SHAPE_BOUNDS)
     
     # Distribution-specific configurations
     dist_config = {
         "weibull": {
-            "initial_guess": [1.5, mean_t],
-            "bounds": [(0.1, 20), (0.1, None)],
-            "fit_func": weibull_log_likelihood
+            "initial_guess": [weibull_shape, max(0.1, np.exp(mean_log_t + np.euler_gamma / weibull_shape))],
+            "bounds": [SHAPE_BOUNDS, (0.1, None)]
         },
         "gamma": {
-            "initial_guess": [1.0, mean_t],
-            "bounds": [(0.1, 20), (0.1, None)],
-            "fit_func": gamma_log_likelihood
+            "initial_guess": [gamma_shape, max(0.1, mean_t / gamma_shape)],
+            "bounds": [SHAPE_BOUNDS, (0.1, None)]
         },
         "lognormal": {
-            "initial_guess": [max(0.1, std_t/mean_t), mean_t],
-            "bounds": [(0.01, 5), (0.1, None)],
-            "fit_func": lognormal_log_likelihood
+            "initial_guess": [np.clip(std_log_t, *LOGNORMAL_SHAPE_BOUNDS), max(0.1, np.exp(mean_log_t))],
+            "bounds": [LOGNORMAL_SHAPE_BOUNDS, (0.1, None)]
         },
         "loglogistic": {
-            "initial_guess": [1.5, mean_t],
-            "bounds": [(0.1, 20), (0.1, None)],
-            "fit_func": loglogistic_log_likelihood
+            "initial_guess": [loglogistic_shape, max(0.1, np.exp(median_log_t))],
+            "bounds": [SHAPE_BOUNDS, (0.1, None)]
         },
         "exponential": {
             "initial_guess": [mean_t],
-            "bounds": [(0.1, None)],
-            "fit_func": exponential_log_likelihood
+            "bounds": [(0.1, None)]
         }
     }
     
@@ -90,16 +200,13 @@ def fit_distribution(time_to_event, distribution, event_status=None):
     
     config = dist_config[distribution]
     
-    def neg_log_likelihood(params):
-        try:
-            ll = config["fit_func"](time_to_event, params, event_status)
-            return -ll if np.isfinite(ll) else 1e10
-        except Exception:
-            return 1e10
+    # Closed-form log-likelihood with analytic gradient, handed to the optimizer as jac
+    neg_log_likelihood = negative_log_likelihood(distribution, time_to_event, event_status, weights)
     
     try:
-        result = minimize(neg_log_likelihood, 
+        result = optimize.minimize(neg_log_likelihood, 
                          config["initial_guess"],
+                         jac=True,
                          bounds=config["bounds"],
                          method='L-BFGS-B',
                          options={'maxiter': 1000, 'ftol': 1e-8})
@@ -111,35 +218,34 @@ def fit_distribution(time_to_event, distribution, event_status=None):
         if any(not np.isfinite(p) for p in params):
             raise RuntimeError("Invalid parameter values obtained")
         
+        if return_info:
+            return params, -result.fun, _fit_info("optimizer", result.nit, result.nfev)
         return params, -result.fun
     
     except Exception as e:
         raise RuntimeError(f"Failed to fit {distribution} distribution: {str(e)}")
 
+def _weighted_median(values, weights):
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order])
+    return values[order][np.searchsorted(cumulative, cumulative[-1] / 2)]
+
 # Specific log-likelihood functions for each distribution
-def lognormal_log_likelihood(time_to_event, params, event_status=None):
+def lognormal_log_likelihood(time_to_event, params, event_status=None, weights=None):
     """Log-likelihood for lognormal distribution."""
-    s, scale = params
-    if event_status is None:
-        return np.sum(lognorm.logpdf(time_to_event, s, scale=scale))
-    else:
-        logpdf = lognorm.logpdf(time_to_event, s, scale=scale)
-        logsf = lognorm.logsf(time_to_event, s, scale=scale)
-        return np.sum(event_status * logpdf + (1 - event_status) * logsf)
+    ll, _ = LIKELIHOODS["lognormal"](time_to_event, params, event_status, weights)
+    return ll
 
-def loglogistic_log_likelihood(time_to_event, params, event_status=None):
+def loglogistic_log_likelihood(time_to_event, params, event_status=None, weights=None):
     """Log-likelihood for loglogistic (fisk) distribution."""
-    c, scale = params
-    if event_status is None:
-        return np.sum(fisk.logpdf(time_to_event, c, scale=scale))
-    else:
-        logpdf = fisk.logpdf(time_to_event, c, scale=scale)
-        logsf = fisk.logsf(time_to_event, c, scale=scale)
-        return np.sum(event_status * logpdf + (1 - event_status) * logsf)
+    ll, _ = LIKELIHOODS["loglogistic"](time_to_event, params, event_status, weights)
+    return ll
 
-def pareto_log_likelihood(time_to_event, params, event_status=None):
+def pareto_log_likelihood(time_to_event, params, event_status=None, weights=None):
     """Log-likelihood for Pareto distribution with proper handling."""
     alpha, xm = params
+    if weights is None:
+        weights = np.ones(len(time_to_event))
     if xm <= 0 or alpha <= 0:
         return -np.inf
     
@@ -150,93 +256,63 @@ def pareto_log_likelihood(time_to_event, params, event_status=None):
     if event_status is None:
         if alpha <= 1e-10:  # Prevent division by zero
             return -np.inf
-        n = len(time_to_event)
-        return n * np.log(alpha) + n * alpha * np.log(xm) - (alpha + 1) * np.sum(np.log(time_to_event))
+        n = np.sum(weights)
+        return n * np.log(alpha) + n * alpha * np.log(xm) - (alpha + 1) * np.sum(weights * np.log(time_to_event))
     else:
         log_terms = np.where(event_status == 1,
                             np.log(alpha) + alpha * np.log(xm) - (alpha + 1) * np.log(time_to_event),
                             alpha * np.log(xm) - alpha * np.log(time_to_event))
-        return np.sum(log_terms)
+        return np.sum(weights * log_terms)
 
-def exponential_log_likelihood(time_to_event, params, event_status=None):
+def exponential_log_likelihood(time_to_event, params, event_status=None, weights=None):
     """Log-likelihood for exponential distribution."""
-    scale = params[0]
-    if event_status is None:
-        return np.sum(expon.logpdf(time_to_event, scale=scale))
-    else:
-        logpdf = expon.logpdf(time_to_event, scale=scale)
-        logsf = expon.logsf(time_to_event, scale=scale)
-        return np.sum(event_status * logpdf + (1 - event_status) * logsf)
+    ll, _ = LIKELIHOODS["exponential"](time_to_event, params, event_status, weights)
+    return ll
 
-def weibull_log_likelihood(time_to_event, params, event_status=None):
+def weibull_log_likelihood(time_to_event, params, event_status=None, weights=None):
     """Log-likelihood for weibull distribution."""
-    shape, scale = params
-    if event_status is None:
-        return np.sum(weibull_min.logpdf(time_to_event, shape, scale=scale))
-    else:
-        logpdf = weibull_min.logpdf(time_to_event, shape, scale=scale)
-        logsf = weibull_min.logsf(time_to_event, shape, scale=scale)
-        return np.sum(event_status * logpdf + (1 - event_status) * logsf)
+    ll, _ = LIKELIHOODS["weibull"](time_to_event, params, event_status, weights)
+    return ll
 
-def gamma_log_likelihood(time_to_event, params, event_status=None):
+def gamma_log_likelihood(time_to_event, params, event_status=None, weights=None):
     """Log-likelihood for gamma distribution."""
-    shape, scale = params
-    if event_status is None:
-        return np.sum(gamma.logpdf(time_to_event, shape, scale=scale))
-    else:
-        logpdf = gamma.logpdf(time_to_event, shape, scale=scale)
-        logsf = gamma.logsf(time_to_event, shape, scale=scale)
-        return np.sum(event_status * logpdf + (1 - event_status) * logsf)
+    ll, _ = LIKELIHOODS["gamma"](time_to_event, params, event_status, weights)
+    return ll
 
-def evaluate_goodness_of_fit(time_to_event, distribution, params):
+def evaluate_goodness_of_fit(time_to_event, distribution, params, weights=None):
     """Evaluate goodness of fit using Kolmogorov-Smirnov test."""
-    if distribution == "weibull":
-        cdf_func = lambda x: weibull_min.cdf(x, *params)
-    elif distribution == "exponential":
-        cdf_func = lambda x: expon.cdf(x, *params)
-    elif distribution == "lognormal":
-        cdf_func = lambda x: lognorm.cdf(x, *params)
-    elif distribution == "gamma":
-        cdf_func = lambda x: gamma.cdf(x, *params)
-    elif distribution == "loglogistic":
-        cdf_func = lambda x: fisk.cdf(x, *params)
-    elif distribution == "pareto":
-        cdf_func = lambda x: pareto.cdf(x, *params)
-    else:
-        raise ValueError("Unsupported distribution")
-    
-    ks_stat, p_value = kstest(time_to_event, cdf_func)
-    return ks_stat, p_value
+    statistics = goodness_of_fit_statistics(SortedSample(time_to_event, weights), distribution, params)
+    return statistics['ks_stat'], statistics['p_value']
 
-def calculate_kaplan_meier(time_to_event, event_status=None):
+def calculate_kaplan_meier(time_to_event, event_status=None, weights=None):
     """Calculate Kaplan-Meier survival estimate with confidence intervals."""
-    if not time_to_event:
+    if len(time_to_event) == 0:
         return None
 
-    time_to_event = np.array(time_to_event)
-    if event_status is None:
-        event_status = np.ones_like(time_to_event)
-    
-    # Initialize with 95% confidence interval
-    kmf = KaplanMeierFitter(alpha=0.05)  # 95% CI
-    kmf.fit(time_to_event, event_observed=event_status)
-    
-    # Force confidence interval calculation if not automatically computed
-    if kmf.confidence_interval_ is None:
-        kmf.confidence_interval_ = kmf._compute_confidence_interval()
-    
-    return kmf
+    time_to_event = np.asarray(time_to_event, dtype=float)
+    weights = np.ones(len(time_to_event)) if weights is None else np.asarray(weights, dtype=float)
+    event_weights = weights if event_status is None else weights * np.asarray(event_status, dtype=float)
 
-def kaplan_meier_to_dict(kmf):
+    # Sort once, then everything else is cumulative sums over distinct times (95% CI)
+    unique_times, inverse = np.unique(time_to_event, return_inverse=True)
+    events = np.bincount(inverse, weights=event_weights, minlength=len(unique_times))
+    total = np.bincount(inverse, weights=weights, minlength=len(unique_times))
+    return kaplan_meier_from_life_table(unique_times, events, total - events, alpha=0.05)
+
+def kaplan_meier_to_dict(survival_data, max_points=KM_MAX_POINTS):
+    """Serialize the shared Kaplan-Meier fit of a SurvivalData object, decimated to max_points steps."""
+    kmf = survival_data.kaplan_meier
+    if kmf is None:
+        return None
+    keep = kmf.downsample(max_points)
     return {
-        'timeline': kmf.timeline.tolist(),
-        'survival_function': kmf.survival_function_.values.flatten().tolist(),
-        'confidence_interval': kmf.confidence_interval_.values.flatten().tolist() 
-        if hasattr(kmf, 'confidence_interval_') else None
+        'timeline': kmf.timeline[keep].tolist(),
+        'survival_function': kmf.survival_function[keep].tolist(),
+        'confidence_interval': kmf.confidence_interval[keep].flatten().tolist()
     }
 
 def calculate_median_survival(kmf):
     """Calculate median survival time from Kaplan-Meier fit."""
     if kmf is None:
         return None
-    return kmf.median_survival_time_
+    return kmf.median_survival_time
@@ -0,0 +1,352 @@
+import threading
+import weakref
+from contextlib import contextmanager
+import numpy as np
+import base64
+from .constants import (COLORS, PLOT_STYLE, FIGURE_FIGSIZE, UPPER_RIGHT, KAPLAN_MEIER, SURVIVAL_PROBABILITY,
+                        PLOT_TEMPLATE_REUSE, DEFAULT_RENDER_PROFILE)
+from .utils import plot_to_bytes
+from .lazy import lazy_import
+
+
+def _configure_matplotlib(module):
+    # Fixed salt for SVG element ids (otherwise random per file), so identical plots give identical SVGs.
+    # Set once at import, before any render thread runs.
+    import matplotlib
+    matplotlib.rcParams['svg.hashsalt'] = 'survival-plots'
+
+
+# Object-oriented matplotlib only: no pyplot, no rcParams changes while rendering, so threads can render concurrently
+figure = lazy_import('matplotlib.figure', on_load=_configure_matplotlib)
+ticker = lazy_import('matplotlib.ticker')
+backend_agg = lazy_import('matplotlib.backends.backend_agg')
+
+# Each plot type is a template: build() creates the styled figure, axes, titles, grid and the
+# persistent artists once; update() swaps in one request's line data and texts, and draw() adds
+# the per-request artists (fills, bars, labels) that are removed again before the next render.
+# Templates are cached per worker thread, so the styling cost is paid once instead of per plot
+# and no figure is ever shared between threads.
+
+_local = threading.local()
+# Every figure built and not yet closed, in any thread (weak, so collected figures drop out)
+_open_figures = weakref.WeakSet()
+
+
+def _array(values):
+    """Float array from a compact series (null back to NaN)."""
+    return np.array(values, dtype=float)
+
+
+class FigureTemplate:
+    """Styled figure for one plot type; render() swaps in the request's data and rasterizes."""
+
+    def __init__(self):
+        self.fig = figure.Figure(figsize=PLOT_STYLE[FIGURE_FIGSIZE], facecolor='white')
+        backend_agg.FigureCanvasAgg(self.fig)
+        _open_figures.add(self.fig)
+        self.ax = self.fig.add_subplot()
+        # PLOT_STYLE applied to this axes only instead of through the global rcParams
+        self.ax.tick_params(axis='x', labelsize=PLOT_STYLE['xtick.labelsize'])
+        self.ax.tick_params(axis='y', labelsize=PLOT_STYLE['ytick.labelsize'])
+        for spine in ['top', 'right']:
+            self.ax.spines[spine].set_visible(False)
+        self.build(self.ax)
+        self._dynamic = []
+
+    @staticmethod
+    def _title(ax, title):
+        return ax.set_title(title, pad=20, fontsize=PLOT_STYLE['axes.titlesize'])
+
+    @staticmethod
+    def _axis_labels(ax, xlabel, ylabel):
+        if xlabel:
+            ax.set_xlabel(xlabel, labelpad=10, fontsize=PLOT_STYLE['axes.labelsize'])
+        ax.set_ylabel(ylabel, labelpad=10, fontsize=PLOT_STYLE['axes.labelsize'])
+
+    def build(self, ax):
+        """Create the styling and the artists every render reuses."""
+
+    def update(self, ax, data):
+        """Swap the request's data into the persistent artists."""
+
+    def draw(self, ax, data):
+        """Add per-request artists; return them so the next render can remove them."""
+        return []
+
+    def render(self, data, profile=DEFAULT_RENDER_PROFILE):
+        """Encoded image bytes of this template with the request's data, in the given render profile."""
+        for artist in self._dynamic:
+            artist.remove()
+        self.update(self.ax, data)
+        # Data limits from the persistent lines first, the new artists extend them as they are added
+        self.ax.relim()
+        self._dynamic = self.draw(self.ax, data)
+        self.ax.autoscale_view()
+        return plot_to_bytes(self.fig, profile)
+
+    def close(self):
+        """Release the figure's artists; the template cannot render afterwards."""
+        _open_figures.discard(self.fig)
+        self._dynamic = []
+        self.fig.clear()
+
+
+class _SurvivalTemplate(FigureTemplate):
+    """Shared pieces of the survival plots: KM step line, its band and the annotation boxes."""
+
+    def _build_axes_labels(self, ax, ylabel):
+        self.title = self._title(ax, "")
+        self._axis_labels(ax, "Time", ylabel)
+        ax.grid(True, linestyle='--', alpha=0.3)
+
+    def _build_km_line(self, ax, label):
+        self.km_line, = ax.plot([], [], drawstyle='steps-post', color=COLORS['primary'], linewidth=2.5, label=label)
+
+    def _build_curve_line(self, ax):
+        self.curve_line, = ax.plot([], [], color=COLORS['accent'], linewidth=2.5, linestyle='--', label=" ")
+
+    def _build_param_box(self, ax):
+        self.param_box = ax.text(0.95, 0.95, "", transform=ax.transAxes,
+                                 fontsize=10, verticalalignment='top', horizontalalignment='right',
+                                 bbox=dict(boxstyle='round', facecolor='white', alpha=0.8, edgecolor='gray'))
+
+    def _build_sample_info(self, ax):
+        self.sample_info = ax.text(0.99, -0.15, "", transform=ax.transAxes, ha='right', va='top', fontsize=9)
+
+    def _update_km(self, data, label=None):
+        kaplan_meier = data['kaplan_meier']
+        self.km_line.set_data(_array(kaplan_meier['time']), _array(kaplan_meier['survival']))
+        self.sample_info.set_text(f"N = {data['n']} | Events = {data['events']}")
+        if label is not None:
+            self._set_legend_label(self.km_line, label)
+
+    def _update_curve(self, data):
+        curve = data['survival_curve']
+        self.curve_line.set_data(_array(curve['time']), _array(curve['survival']))
+        self._set_legend_label(self.curve_line, curve['label'])
+
+    def _build_legend(self, ax, lines):
+        self.legend = ax.legend(loc=UPPER_RIGHT, fontsize=PLOT_STYLE['legend.fontsize'])
+        self.legend_texts = dict(zip(lines, self.legend.get_texts()))
+
+    def _set_legend_label(self, line, label):
+        line.set_label(label)
+        self.legend_texts[line].set_text(label)
+
+    def _draw_km_band(self, ax, data):
+        kaplan_meier = data['kaplan_meier']
+        return [ax.fill_between(_array(kaplan_meier['time']), _array(kaplan_meier['ci_lower']),
+                                _array(kaplan_meier['ci_upper']),
+                                step='post', alpha=0.25, color=COLORS['primary'], linewidth=0)]
+
+
+class HazardTemplate(_SurvivalTemplate):
+    def build(self, ax):
+        self.hazard_line, = ax.plot([], [], color=COLORS['accent'], linewidth=PLOT_STYLE['lines.linewidth'],
+                                    label='Hazard Function')
+        self._build_axes_labels(ax, "Hazard Rate")
+        self._build_param_box(ax)
+
+    def update(self, ax, data):
+        curve = data['hazard_curve']
+        self.hazard_line.set_data(_array(curve['time']), _array(curve['hazard']))
+        self.title.set_text(f"Hazard Function ({data['distribution'].capitalize()})")
+        self.param_box.set_text(data['param_text'])
+
+    def draw(self, ax, data):
+        curve = data['hazard_curve']
+        return [ax.fill_between(_array(curve['time']), _array(curve['hazard']), color=COLORS['accent'], alpha=0.1)]
+
+
+class KaplanMeierTemplate(_SurvivalTemplate):
+    def build(self, ax):
+        self._build_km_line(ax, KAPLAN_MEIER)
+        self._build_axes_labels(ax, SURVIVAL_PROBABILITY)
+        self._build_legend(ax, [self.km_line])
+        # At-risk counts below the plot
+        self._build_sample_info(ax)
+
+    def update(self, ax, data):
+        self._update_km(data)
+        self.title.set_text(f"Kaplan-Meier Survival Estimate ({data['distribution'].capitalize()})")
+
+    def draw(self, ax, data):
+        return self._draw_km_band(ax, data)
+
+
+class SurvivalComparisonTemplate(_SurvivalTemplate):
+    def build(self, ax):
+        self._build_km_line(ax, KAPLAN_MEIER)
+        self._build_curve_line(ax)
+        self._build_axes_labels(ax, SURVIVAL_PROBABILITY)
+        self._build_legend(ax, [self.km_line, self.curve_line])
+        self._build_sample_info(ax)
+
+    def update(self, ax, data):
+        self._update_km(data)
+        self._update_curve(data)
+        self.title.set_text(f"Survival Function Comparison\n({data['distribution'].capitalize()})")
+
+
+class SurvivalFunctionTemplate(_SurvivalTemplate):
+    def build(self, ax):
+        self._build_curve_line(ax)
+        self._build_km_line(ax, KAPLAN_MEIER)
+        self._build_axes_labels(ax, SURVIVAL_PROBABILITY)
+        self._build_legend(ax, [self.curve_line, self.km_line])
+        self._build_param_box(ax)
+        self._build_sample_info(ax)
+
+    def update(self, ax, data):
+        # If no event_status provided, every observation is treated as an event
+        self._update_km(data, KAPLAN_MEIER if data['has_event_status'] else 'Empirical Survival')
+        self._update_curve(data)
+        self.title.set_text(f"Survival Function ({data['distribution'].capitalize()})")
+        self.param_box.set_text(data['param_text'])
+
+    def draw(self, ax, data):
+        # Confidence band only if there's censoring
+        return [] if data['all_observed'] else self._draw_km_band(ax, data)
+
+
+class BoxplotTemplate(FigureTemplate):
+    def build(self, ax):
+        self._title(ax, 'Distribution Boxplot')
+        self._axis_labels(ax, None, 'Values')
+        ax.grid(True, linestyle='--', alpha=0.3)
+
+    def draw(self, ax, box):
+        # bxp appends its tick to the axis' fixed locator, so start from an empty one every render
+        ax.xaxis.set_major_locator(ticker.FixedLocator([]))
+        ax.xaxis.set_major_formatter(ticker.FixedFormatter([]))
+        # Drawn from the precomputed box statistics (view.aggregates), styled like Axes.boxplot(patch_artist=True)
+        parts = ax.bxp([box],
+                       patch_artist=True,
+                       boxprops=dict(facecolor=COLORS['primary'], edgecolor=COLORS['primary'], linewidth=1.5,
+                                     linestyle='solid'),
+                       whiskerprops=dict(color=COLORS['text'], linewidth=1.5),
+                       capprops=dict(color=COLORS['text'], linewidth=1.5),
+                       flierprops=dict(markerfacecolor=COLORS['primary'], marker='o', markersize=6, alpha=0.6),
+                       medianprops=dict(color=COLORS['accent'], linewidth=2))
+        return [artist for artists in parts.values() for artist in artists]
+
+
+class HistogramTemplate(FigureTemplate):
+    def build(self, ax):
+        self._title(ax, "Value Distribution")
+        self._axis_labels(ax, "Value", "Frequency")
+        ax.grid(True, linestyle='--', alpha=0.3)
+        # Ensure y-axis shows only integers
+        ax.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
+
+    def draw(self, ax, histogram):
+        # Bars from precomputed bin counts, laid out exactly like Axes.hist
+        edges = _array(histogram['edges'])
+        widths = np.diff(edges)
+        container = ax.bar(edges[:-1] + 0.5 * widths, _array(histogram['counts']), widths, align='center',
+                           color=COLORS['primary'], edgecolor='white', linewidth=1, alpha=0.8)
+        # Frequency labels
+        labels = [
+            ax.text(rect.get_x() + rect.get_width()/2, rect.get_height() + 0.5, f'{int(rect.get_height())}',
+                    ha='center', va='bottom', fontsize=10, color=COLORS['text'])
+            for rect in container if rect.get_height() > 0
+        ]
+        return [container] + labels
+
+
+class BarchartTemplate(FigureTemplate):
+    def build(self, ax):
+        self._title(ax, "Category Distribution")
+        self._axis_labels(ax, 'Category', 'Count')
+        ax.grid(True, linestyle='--', alpha=0.3, axis='y')
+        ax.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
+
+    def draw(self, ax, data):
+        categories, counts = data
+        # Numeric positions with fixed tick labels: a categorical axis would keep the previous request's categories
+        positions = np.arange(len(categories))
+        container = ax.bar(positions, counts, color=COLORS['primary'], edgecolor='white', linewidth=1, width=0.6,
+                           alpha=0.8)
+        ax.set_xticks(positions, [str(category) for category in categories])
+        labels = [
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5, f'{int(bar.get_height())}',
+                    ha='center', va='bottom', fontsize=10, color=COLORS['text'])
+            for bar in container
+        ]
+        return [container] + labels
+
+
+TEMPLATES = {
+    'hazard': HazardTemplate,
+    'kaplan_meier': KaplanMeierTemplate,
+    'survival_comparison': SurvivalComparisonTemplate,
+    'survival_function': SurvivalFunctionTemplate,
+    'boxplot': BoxplotTemplate,
+    'histogram': HistogramTemplate,
+    'barchart': BarchartTemplate,
+}
+
+
+def _thread_templates():
+    if not hasattr(_local, 'templates'):
+        _local.templates = {}
+    return _local.templates
+
+
+def get_template(kind):
+    """This thread's cached template for one plot type, built on first use."""
+    templates = _thread_templates()
+    if kind not in templates:
+        templates[kind] = TEMPLATES[kind]()
+    return templates[kind]
+
+
+@contextmanager
+def figure_context(kind, reuse=None):
+    """Template to render one plot with, whose figure is released however the render ends.
+
+    A fresh figure (reuse=False) is closed on exit. A cached template is kept after a
+    successful render; when the render raises it may hold half-drawn artists, so it is
+    closed and dropped from the cache and the next render builds a clean one.
+    """
+    reuse = PLOT_TEMPLATE_REUSE if reuse is None else reuse
+    if not reuse:
+        template = TEMPLATES[kind]()
+        try:
+            yield template
+        finally:
+            template.close()
+        return
+
+    template = get_template(kind)
+    try:
+        yield template
+    except BaseException:
+        if _thread_templates().get(kind) is template:
+            del _thread_templates()[kind]
+        template.close()
+        raise
+
+
+def render_image(kind, data, reuse=None, profile=DEFAULT_RENDER_PROFILE):
+    """Render one plot to image bytes, reusing the thread's template unless reuse is False."""
+    with figure_context(kind, reuse) as template:
+        return template.render(data, profile)
+
+
+def render_plot(kind, data, reuse=None, profile=DEFAULT_RENDER_PROFILE):
+    """Render one plot to a base64 image (PNG with the standard profile)."""
+    return base64.b64encode(render_image(kind, data, reuse, profile)).decode('utf-8')
+
+
+def clear_templates():
+    """Close and forget this thread's cached template figures."""
+    templates = _thread_templates()
+    for template in templates.values():
+        template.close()
+    templates.clear()
+
+
+def open_figure_count():
+    """Figures built and not yet closed or collected, across all threads of this process."""
+    return len(_open_figures)
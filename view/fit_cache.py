@@ -0,0 +1,149 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from django.core.cache import caches
+from .constants import DISTRIBUTIONS, FIT_CACHE_ALIAS, FIT_CACHE_LOCAL_SIZE, FIT_CACHE_TIMEOUT, FIT_CACHE_GENERATION_TTL
+
+# Naikkan versi ini setiap kali cara fitting atau isi hasil berubah, entri lama otomatis tidak terpakai
+FIT_CACHE_VERSION = 2
+GENERATION_KEY = 'fit-cache:generation'
+
+# LRU lokal per proses di depan cache Django bersama
+_local_cache = OrderedDict()
+_local_lock = threading.Lock()
+_stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'stores': 0}
+# Generasi terakhir yang dibaca dari cache bersama dan kapan (time.monotonic)
+_known_generation = {'value': 0, 'read_at': None}
+
+
+def dataset_digest(time_to_event, event_status=None, weights=None):
+    """Hash of the normalized life table, so row order and tie layout do not change the key."""
+    time_to_event = np.asarray(time_to_event, dtype=float)
+    weights = np.ones(len(time_to_event)) if weights is None else np.asarray(weights, dtype=float)
+    event_weights = weights if event_status is None else weights * np.asarray(event_status, dtype=float)
+
+    unique_times, inverse = np.unique(time_to_event, return_inverse=True)
+    events = np.bincount(inverse, weights=event_weights, minlength=len(unique_times))
+    total = np.bincount(inverse, weights=weights, minlength=len(unique_times))
+
+    digest = hashlib.sha256()
+    for array in (unique_times, events, total - events):
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def _shared_cache():
+    return caches[FIT_CACHE_ALIAS]
+
+
+def _set_generation(generation):
+    with _local_lock:
+        _known_generation.update(value=generation, read_at=time.monotonic())
+
+
+def _generation():
+    """Current cache generation, read from the shared cache at most every FIT_CACHE_GENERATION_TTL seconds."""
+    with _local_lock:
+        read_at = _known_generation['read_at']
+        if read_at is not None and time.monotonic() - read_at < FIT_CACHE_GENERATION_TTL:
+            return _known_generation['value']
+    generation = _shared_cache().get(GENERATION_KEY, 0)
+    _set_generation(generation)
+    return generation
+
+
+def _cache_key(generation, digest, distribution):
+    return f"fit-cache:v{FIT_CACHE_VERSION}:{generation}:{digest}:{distribution}"
+
+
+def _remember_locally(key, result):
+    with _local_lock:
+        _local_cache[key] = result
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > FIT_CACHE_LOCAL_SIZE:
+            _local_cache.popitem(last=False)
+
+
+def lookup_fits(digest, distributions):
+    """Return {distribution: cached result} for every candidate that is already cached."""
+    generation = _generation()
+    keys = {dist: _cache_key(generation, digest, dist) for dist in distributions}
+    found = {}
+
+    with _local_lock:
+        for dist, key in keys.items():
+            if key in _local_cache:
+                _local_cache.move_to_end(key)
+                found[dist] = dict(_local_cache[key])
+                _stats['local_hits'] += 1
+
+    remaining = [key for dist, key in keys.items() if dist not in found]
+    shared = _shared_cache().get_many(remaining) if remaining else {}
+    for dist, key in keys.items():
+        if dist in found:
+            continue
+        if key in shared:
+            _remember_locally(key, shared[key])
+            found[dist] = dict(shared[key])
+            with _local_lock:
+                _stats['shared_hits'] += 1
+        else:
+            with _local_lock:
+                _stats['misses'] += 1
+    return found
+
+
+def store_fits(digest, results):
+    """Cache successful fits; error entries are never cached."""
+    generation = _generation()
+    entries = {
+        _cache_key(generation, digest, dist): result
+        for dist, result in results.items()
+        if result.get('aic') is not None
+    }
+    if not entries:
+        return
+    for key, result in entries.items():
+        _remember_locally(key, dict(result))
+    _shared_cache().set_many(entries, timeout=FIT_CACHE_TIMEOUT)
+    with _local_lock:
+        _stats['stores'] += len(entries)
+
+
+def invalidate_fit_cache(time_to_event=None, event_status=None, distribution=None, weights=None):
+    """Drop cached fits for one dataset (optionally one distribution), or everything when no data is given."""
+    if time_to_event is None:
+        # Naikkan generasi: semua kunci lama di cache bersama tidak lagi terjangkau oleh worker mana pun
+        shared = _shared_cache()
+        generation = 1 if shared.add(GENERATION_KEY, 1, timeout=None) else shared.incr(GENERATION_KEY)
+        # This worker switches at once; the others within FIT_CACHE_GENERATION_TTL
+        _set_generation(generation)
+        with _local_lock:
+            _local_cache.clear()
+        return
+
+    digest = dataset_digest(time_to_event, event_status, weights)
+    generation = _generation()
+    keys = [_cache_key(generation, digest, dist) for dist in ([distribution] if distribution else DISTRIBUTIONS)]
+    _shared_cache().delete_many(keys)
+    with _local_lock:
+        for key in keys:
+            _local_cache.pop(key, None)
+
+
+def fit_cache_stats():
+    """Hit/miss counters of this process plus the current local LRU size."""
+    with _local_lock:
+        stats = dict(_stats)
+        stats['local_size'] = len(_local_cache)
+    lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+    stats['hit_rate'] = (stats['local_hits'] + stats['shared_hits']) / lookups if lookups else None
+    return stats
+
+
+def reset_fit_cache_stats():
+    with _local_lock:
+        for key in _stats:
+            _stats[key] = 0
@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from .constants import DISTRIBUTIONS, PARALLEL_FIT_MIN_SIZE, FIT_TIMEOUT_SECONDS, POOL_START_METHOD
+from .distributions import calculate_aic
+from .goodness_of_fit import evaluate_goodness_of_fit_all, format_goodness_of_fit
+from .fit_cache import dataset_digest, lookup_fits, store_fits
+
+# Pool proses dibuat sekali per worker dan dipakai ulang lintas request
+FIT_POOL_SIZE = min(len(DISTRIBUTIONS), os.cpu_count() or 1)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def evaluate_distribution(time_to_event, event_status, distribution, weights=None):
+    """Fit one distribution. Runs in a pool worker or inline; goodness of fit is added afterwards."""
+    try:
+        aic, bic, params, fit_info = calculate_aic(
+            time_to_event, distribution, event_status, return_info=True, weights=weights
+        )
+        return {
+            'aic': aic,
+            'bic': bic,
+            'params': params,
+            'log_likelihood': len(params) - aic / 2,
+            'fit_method': fit_info['method'],
+            'iterations': fit_info['iterations']
+        }
+    except Exception as e:
+        return {'aic': None, 'error': str(e)}
+
+
+def add_goodness_of_fit(time_to_event, results, weights=None):
+    """Run KS, Anderson-Darling and Cramer-von Mises for every successful fit in one pass over the sorted sample."""
+    fitted = {dist: result['params'] for dist, result in results.items()
+              if result.get('aic') is not None and 'ks_stat' not in result}
+    if not fitted:
+        return results
+    try:
+        statistics = evaluate_goodness_of_fit_all(time_to_event, fitted, weights)
+    except Exception as e:
+        for dist in fitted:
+            results[dist] = {'aic': None, 'error': str(e)}
+        return results
+    for dist, stats in statistics.items():
+        results[dist].update(stats)
+        results[dist]['goodness_of_fit'] = format_goodness_of_fit(stats)
+    return results
+
+
+def evaluate_distributions(time_to_event, event_status, distributions, weights=None):
+    """Fit every candidate for one cohort and score them together; a single pool task in batch mode."""
+    results = {dist: evaluate_distribution(time_to_event, event_status, dist, weights) for dist in distributions}
+    return add_goodness_of_fit(time_to_event, results, weights)
+
+
+def get_fit_executor():
+    """Return the persistent fitting pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=FIT_POOL_SIZE,
+                                            mp_context=multiprocessing.get_context(POOL_START_METHOD))
+        return _executor
+
+
+def shutdown_fit_executor(terminate=False):
+    """Shut the pool down, e.g. after a worker crash or at process exit.
+
+    terminate=True also kills the pool processes, for fits still running past their deadline
+    (a running future cannot be cancelled); the next fit starts a fresh pool.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            if terminate:
+                # ProcessPoolExecutor has no public way to stop a running task
+                for process in list(_executor._processes.values()):
+                    process.terminate()
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def fit_distributions(time_to_event, event_status, distributions, weights=None, timeout=FIT_TIMEOUT_SECONDS):
+    """Fit every candidate concurrently; cached fits are reused and only the misses are computed."""
+    digest = dataset_digest(time_to_event, event_status, weights)
+    results = lookup_fits(digest, distributions)
+    missing = [dist for dist in distributions if dist not in results]
+    if missing:
+        fitted = _fit_uncached(time_to_event, event_status, missing, weights, timeout)
+        store_fits(digest, fitted)
+        results.update(fitted)
+    return {dist: results[dist] for dist in distributions}
+
+
+def _fit_uncached(time_to_event, event_status, distributions, weights, timeout):
+    """Fit the given candidates, each with at most `timeout` seconds."""
+    if len(time_to_event) < PARALLEL_FIT_MIN_SIZE or len(distributions) < 2:
+        return evaluate_distributions(time_to_event, event_status, distributions, weights)
+
+    try:
+        executor = get_fit_executor()
+        futures = {
+            dist: executor.submit(evaluate_distribution, time_to_event, event_status, dist, weights)
+            for dist in distributions
+        }
+    except (BrokenProcessPool, RuntimeError):
+        shutdown_fit_executor()
+        return evaluate_distributions(time_to_event, event_status, distributions, weights)
+
+    deadline = time.monotonic() + timeout
+    results = {}
+    timed_out = False
+    for dist, future in futures.items():
+        try:
+            results[dist] = future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            timed_out = True
+            results[dist] = {'aic': None, 'error': f"Fitting {dist} exceeded the {timeout}s time limit"}
+        except BrokenProcessPool:
+            shutdown_fit_executor()
+            results[dist] = evaluate_distribution(time_to_event, event_status, dist, weights)
+    if timed_out:
+        shutdown_fit_executor(terminate=True)
+    return add_goodness_of_fit(time_to_event, results, weights)
+
+
+def fit_cohorts(cohorts, distributions, timeout=FIT_TIMEOUT_SECONDS):
+    """Fit many cohorts, each a (time_to_event, event_status, weights) tuple, one pool task per cohort."""
+    digests = [dataset_digest(t, s, w) for t, s, w in cohorts]
+    results = [lookup_fits(digest, distributions) for digest in digests]
+    pending = [
+        (index, (t, s, w, [dist for dist in distributions if dist not in results[index]]))
+        for index, (t, s, w) in enumerate(cohorts)
+        if len(results[index]) < len(distributions)
+    ]
+
+    if pending:
+        fitted = _fit_cohorts_uncached([cohort for _, cohort in pending], timeout)
+        for (index, _), cohort_results in zip(pending, fitted):
+            store_fits(digests[index], cohort_results)
+            results[index].update(cohort_results)
+    return [{dist: cohort_results[dist] for dist in distributions} for cohort_results in results]
+
+
+def _fit_cohorts_uncached(cohorts, timeout):
+    """Fit (time_to_event, event_status, weights, distributions) cohorts on the pool."""
+    total_rows = sum(len(cohort[0]) for cohort in cohorts)
+    if total_rows < PARALLEL_FIT_MIN_SIZE or len(cohorts) < 2:
+        return [evaluate_distributions(t, s, dists, w) for t, s, w, dists in cohorts]
+
+    try:
+        executor = get_fit_executor()
+        futures = [executor.submit(evaluate_distributions, t, s, dists, w) for t, s, w, dists in cohorts]
+    except (BrokenProcessPool, RuntimeError):
+        shutdown_fit_executor()
+        return [evaluate_distributions(t, s, dists, w) for t, s, w, dists in cohorts]
+
+    # Cohorts queue behind each other, so the budget grows with the number of pool rounds
+    rounds = -(-len(cohorts) // FIT_POOL_SIZE)
+    deadline = time.monotonic() + timeout * rounds
+    results = []
+    timed_out = False
+    for (t, s, w, dists), future in zip(cohorts, futures):
+        try:
+            results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            timed_out = True
+            results.append({
+                dist: {'aic': None, 'error': f"Fitting {dist} exceeded the {timeout}s time limit"}
+                for dist in dists
+            })
+        except BrokenProcessPool:
+            shutdown_fit_executor()
+            results.append(evaluate_distributions(t, s, dists, w))
+    if timed_out:
+        shutdown_fit_executor(terminate=True)
+    return results
@@ -0,0 +1,89 @@
+import numpy as np
+from .lazy import lazy_import
+from .distribution_registry import REGISTRY
+
+stats = lazy_import('scipy.stats')
+
+# Kolmogorov-Smirnov p-values use the exact distribution up to this size, same rule as scipy's kstest
+KS_EXACT_MAX_N = 10000
+
+
+class SortedSample:
+    """Distinct sorted times with their multiplicities, built once and shared by every candidate."""
+
+    def __init__(self, time_to_event, weights=None):
+        time_to_event = np.asarray(time_to_event, dtype=float)
+        weights = np.ones(len(time_to_event)) if weights is None else np.asarray(weights, dtype=float)
+        unique_times, inverse = np.unique(time_to_event, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights, minlength=len(unique_times))
+        keep = counts > 0
+        self.times = unique_times[keep]
+        self.counts = counts[keep]
+        self.n = int(round(np.sum(self.counts)))
+
+        # Ranks covered by each distinct time: i = before + 1 ... before + count
+        self.after = np.cumsum(self.counts)
+        self.before = self.after - self.counts
+
+
+def goodness_of_fit_statistics(sample, distribution, params):
+    """KS (with p-value), Anderson-Darling and Cramer-von Mises statistics of one fitted candidate."""
+    if distribution not in REGISTRY:
+        raise ValueError("Unsupported distribution")
+    if sample.n == 0:
+        raise ValueError("Time-to-event data cannot be empty.")
+
+    frozen = REGISTRY[distribution].frozen(params)
+    n, before, after, counts = sample.n, sample.before, sample.after, sample.counts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cdf = frozen.cdf(sample.times)
+        log_cdf = frozen.logcdf(sample.times)
+        log_sf = frozen.logsf(sample.times)
+
+    # Kolmogorov-Smirnov: largest gap between the empirical step function and the CDF
+    ks_stat = float(max(np.max(after / n - cdf), np.max(cdf - before / n)))
+    p_value = stats.kstwo.sf(ks_stat, n) if n <= KS_EXACT_MAX_N else stats.kstwobign.sf(ks_stat * np.sqrt(n))
+
+    # Anderson-Darling: -n - sum_i [(2i-1) log F_i + (2(n-i)+1) log(1-F_i)] / n, summed per tie group
+    # (log(0) at the support boundary is clamped to the smallest double so the statistic stays finite)
+    floor = np.log(np.finfo(float).tiny)
+    log_cdf = np.maximum(np.nan_to_num(log_cdf, nan=floor, neginf=floor), floor)
+    log_sf = np.maximum(np.nan_to_num(log_sf, nan=floor, neginf=floor), floor)
+    rank_weight = after ** 2 - before ** 2  # sum of (2i - 1) over the group
+    reverse_weight = counts * (2 * n - 2 * before - counts)  # sum of (2(n - i) + 1) over the group
+    ad_stat = float(-n - np.sum(rank_weight * log_cdf + reverse_weight * log_sf) / n)
+
+    # Cramer-von Mises: 1/(12n) + sum_i (F_i - (2i-1)/(2n))^2, expanded so each tie group is one term
+    def odd_square_sum(m):
+        return m * (2 * m - 1) * (2 * m + 1) / 3  # sum of (2i - 1)^2 for i = 1..m
+
+    cvm_stat = float(1 / (12 * n) + np.sum(
+        counts * cdf ** 2 - cdf * rank_weight / n + (odd_square_sum(after) - odd_square_sum(before)) / (4 * n ** 2)
+    ))
+
+    return {
+        'ks_stat': ks_stat,
+        'p_value': float(np.clip(p_value, 0, 1)),
+        'anderson_darling': ad_stat,
+        'cramer_von_mises': cvm_stat,
+    }
+
+
+def evaluate_goodness_of_fit_all(time_to_event, fitted_params, weights=None):
+    """Goodness of fit of every fitted candidate over a single sort of the sample.
+
+    fitted_params maps distribution name to its params; returns {distribution: statistics}.
+    """
+    sample = SortedSample(time_to_event, weights)
+    return {
+        distribution: goodness_of_fit_statistics(sample, distribution, params)
+        for distribution, params in fitted_params.items()
+    }
+
+
+def format_goodness_of_fit(statistics):
+    return (
+        f"KS-statistic = {statistics['ks_stat']:.4f}, p-value = {statistics['p_value']:.4f}, "
+        f"Anderson-Darling = {statistics['anderson_darling']:.4f}, "
+        f"Cramer-von Mises = {statistics['cramer_von_mises']:.4f}"
+    )
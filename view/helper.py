@@ -1,39 +1,25 @@
 from .utils import ask_openai_gpt
-from .distributions import calculate_aic, evaluate_goodness_of_fit, calculate_kaplan_meier, calculate_median_survival
-from .plotting import create_hazard_plot_base64, create_kaplan_meier_plot_base64, create_survival_comparison_plot, create_survival_plot_base64
-
-def evaluate_all_distributions(time_to_event, event_status, distributions):
-    """Evaluate all distributions and return their metrics."""
-    results = {}
-    for dist in distributions:
-        try:
-            if not time_to_event:
-                results[dist] = {'error': 'Data kosong, tidak dapat menghitung AIC atau KS test.'}
-                continue
-
-            # Calculate AIC/BIC
-            if not event_status:
-                aic_dist, bic_dist, params_dist = calculate_aic(time_to_event, dist)
-            else:
-                aic_dist, bic_dist, params_dist = calculate_aic(time_to_event, dist, event_status)
-
-            # Calculate goodness-of-fit
-            ks_stat_dist, p_value_dist = evaluate_goodness_of_fit(time_to_event, dist, params_dist)
-            goodness_of_fit = f"KS-statistic = {ks_stat_dist:.4f}, p-value = {p_value_dist:.4f}"
-
-            results[dist] = {
-                'aic': aic_dist,
-                'bic': bic_dist,
-                'params': params_dist,
-                'ks_stat': ks_stat_dist,
-                'p_value': p_value_dist,
-                'goodness_of_fit': goodness_of_fit
-            }
-
-        except Exception as e:
-            results[dist] = {'aic': None, 'error': str(e)}
-
-    return results
+from .distributions import calculate_median_survival
+from .fitting import fit_distributions
+from .plotting import survival_plot_data
+from .constants import KM_MAX_POINTS, DEFAULT_RENDER_PROFILE
+from .rendering import render_plots
+from .plot_store import store_payload, image_url, image_format
+
+# Plot survival yang digambar dari satu payload survival_plot_data
+SURVIVAL_PLOT_KINDS = ('hazard', 'kaplan_meier', 'survival_comparison', 'survival_function')
+
+def evaluate_all_distributions(survival_data, distributions):
+    """Evaluate all distributions concurrently and return their metrics."""
+    if survival_data.is_empty:
+        return {dist: {'error': 'Data kosong, tidak dapat menghitung AIC atau KS test.'} for dist in distributions}
+
+    return fit_distributions(
+        survival_data.time_to_event,
+        survival_data.event_status,
+        distributions,
+        weights=survival_data.weights
+    )
 
 
 def find_best_distribution(all_results):
@@ -47,64 +33,93 @@ def find_best_distribution(all_results):
     return best_dist, min_aic
 
 
-def generate_visualizations(time_to_event, event_status, best_dist, best_params):
-    """Generate all visualization plots."""
-    if not time_to_event:
+def generate_visualizations(survival_data, best_dist, best_params, render="png", max_points=KM_MAX_POINTS,
+                            profile=DEFAULT_RENDER_PROFILE):
+    """Generate all visualization plots.
+
+    render="data" skips matplotlib and returns the plotted series under 'plot_data' instead;
+    render="url" stores the series and returns plot URLs, rendered when they are first fetched.
+    profile picks the image format, resolution and bounding box (constants.RENDER_PROFILES).
+    """
+    empty = {
+        'kaplan_meier_plot': None,
+        'distribusi_plot': None,
+        'hazard_plot': None,
+        'survival_plot': None,
+        'survival_function': None
+    }
+    if survival_data.is_empty:
+        return empty
+
+    # Series are computed once and shared by every plot
+    plot_data = survival_plot_data(survival_data, best_dist, best_params, max_points)
+    if render == "data":
+        return {**empty, 'plot_data': plot_data}
+    if render == "url":
+        # One stored payload backs all four images
+        digest = store_payload(plot_data, SURVIVAL_PLOT_KINDS)
         return {
-            'kaplan_meier_plot': None,
-            'distribusi_plot': None,
-            'hazard_plot': None,
-            'survival_plot': None,
-            'survival_function': None
+            **empty,
+            'kaplan_meier_plot': image_url('kaplan_meier', digest, profile),
+            'hazard_plot': image_url('hazard', digest, profile) if plot_data['hazard_curve'] is not None else None,
+            'survival_plot': image_url('survival_comparison', digest, profile),
+            'survival_function': image_url('survival_function', digest, profile),
         }
 
-    if not event_status:
-        hazard_plot = create_hazard_plot_base64(time_to_event, best_dist, best_params)
-        kaplan_meier_plot = create_kaplan_meier_plot_base64(time_to_event, best_dist, best_params)
-        survival_plot = create_survival_comparison_plot(time_to_event, best_dist, best_params)
-        survival_function = create_survival_plot_base64(time_to_event, best_dist, best_params)
-    else:
-        hazard_plot = create_hazard_plot_base64(time_to_event, best_dist, best_params, event_status)
-        kaplan_meier_plot = create_kaplan_meier_plot_base64(time_to_event, best_dist, best_params, event_status)
-        survival_plot = create_survival_comparison_plot(time_to_event, best_dist, best_params, event_status)
-        survival_function = create_survival_plot_base64(time_to_event, best_dist, best_params, event_status)
+    # The four rasterizations are independent, so they run side by side on the render pool
+    kinds = ['kaplan_meier', 'survival_comparison', 'survival_function']
+    if plot_data['hazard_curve'] is not None:
+        kinds.insert(0, 'hazard')
+    plots = dict(zip(kinds, render_plots([(kind, plot_data) for kind in kinds], profile=profile)))
+    hazard_plot = plots.get('hazard')
+    kaplan_meier_plot = plots['kaplan_meier']
+    survival_plot = plots['survival_comparison']
+    survival_function = plots['survival_function']
 
     return {
         'kaplan_meier_plot': kaplan_meier_plot,
         'distribusi_plot': None,  # Original code had this as None
         'hazard_plot': hazard_plot,
         'survival_plot': survival_plot,
-        'survival_function': survival_function
+        'survival_function': survival_function,
+        'image_format': image_format(profile)
     }
 
 
-def calculate_survival_metrics(time_to_event, event_status):
-    """Calculate Kaplan-Meier and median survival."""
-    if not time_to_event:
+def calculate_survival_metrics(survival_data):
+    """Calculate Kaplan-Meier and median survival from the shared fit."""
+    if survival_data.is_empty:
         return {'kaplan_meier': None, 'median_survival': None}
 
-    if not event_status:
-        kaplan_meier = calculate_kaplan_meier(time_to_event)
-    else:
-        kaplan_meier = calculate_kaplan_meier(time_to_event, event_status)
-
+    kaplan_meier = survival_data.kaplan_meier
     median_survival = calculate_median_survival(kaplan_meier)
     return {'kaplan_meier': kaplan_meier, 'median_survival': median_survival}
 
 
-def generate_interpretation(kaplan_meier, best_dist, best_params, median_survival, goodness_of_fit):
-    """Generate interpretation using LLM."""
+def generate_interpretation(kaplan_meier, best_dist, best_params, median_survival, goodness_of_fit,
+                            model_curves=None):
+    """Generate interpretation using LLM.
+
+    model_curves (the request's shared fitted curves) adds the model's survival and median.
+    """
     if not kaplan_meier:
         return None
 
     timeline = kaplan_meier.timeline
-    survival_prob = kaplan_meier.survival_function_.values.flatten()
+    survival_prob = kaplan_meier.survival_function
     
     km_points = "\n".join([f"- Waktu {time:.1f}: Survival {prob:.2%}" 
                          for time, prob in zip(timeline, survival_prob)])
     
+    model_summary = ""
+    if model_curves is not None:
+        model_points = "\n".join([f"- Waktu {time:.1f}: Survival {prob:.2%}"
+                                  for time, prob in model_curves.summary_points()])
+        model_summary = f"Survival Model ({best_dist}):\n{model_points}\nMedian model: {model_curves.median:.2f}\n\n"
+
     interpretation_message = (
         f"Data Survival Aktual:\n{km_points}\n\n"
+        f"{model_summary}"
         f"Distribusi terbaik: {best_dist}\n"
         f"Parameter: {best_params}\n"
         f"Median survival: {median_survival}\n"
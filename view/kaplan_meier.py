@@ -0,0 +1,124 @@
+import numpy as np
+from .constants import KM_DOWNSAMPLE_TOLERANCE
+from .lazy import lazy_import
+
+special = lazy_import('scipy.special')
+
+# Kaplan-Meier and Nelson-Aalen estimators on a life table, in plain numpy.
+# Conventions follow lifelines (timeline starts at 0, exponential Greenwood band,
+# median = first time the curve reaches 0.5) so results are interchangeable.
+
+CI_METHODS = ("log-log", "greenwood")
+
+
+class KaplanMeierEstimate:
+    """Kaplan-Meier curve with a pointwise confidence band and the Nelson-Aalen cumulative hazard."""
+
+    def __init__(self, timeline, at_risk, events, alpha=0.05, ci_method="log-log"):
+        if ci_method not in CI_METHODS:
+            raise ValueError(f"ci_method must be one of {CI_METHODS}")
+        self.timeline = timeline
+        self.at_risk = at_risk
+        self.events = events
+        self.alpha = alpha
+        self.ci_method = ci_method
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hazard = np.where(at_risk > 0, events / at_risk, 0.0)
+            self.survival_function = np.exp(np.cumsum(np.log1p(-hazard)))
+            self.cumulative_hazard = np.cumsum(hazard)
+
+            # Greenwood sum d / (n (n - d)); the term is dropped once everyone has failed
+            greenwood = events / (at_risk * (at_risk - events))
+            self.greenwood_variance = np.cumsum(np.where(np.isfinite(greenwood), greenwood, 0.0))
+        self.confidence_interval = self._confidence_interval()
+        self.median_survival_time = self.survival_time(0.5)
+
+    def _confidence_interval(self):
+        """(n, 2) array of lower and upper bounds at each timeline point."""
+        z = special.ndtri(1 - self.alpha / 2)
+        survival = self.survival_function
+        std = np.sqrt(self.greenwood_variance)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.ci_method == "log-log":
+                log_s = np.log(survival)
+                lower = np.exp(-np.exp(np.log(-log_s) - z * std / log_s))
+                upper = np.exp(-np.exp(np.log(-log_s) + z * std / log_s))
+            else:
+                lower = np.clip(survival - z * survival * std, 0, 1)
+                upper = np.clip(survival + z * survival * std, 0, 1)
+        bounds = np.column_stack([lower, upper])
+        return np.where(np.isnan(bounds), 1.0, bounds)
+
+    def survival_time(self, q):
+        """First time at which survival drops to q or below; inf if it never does."""
+        reached = np.flatnonzero(self.survival_function <= q)
+        return float(self.timeline[reached[0]]) if len(reached) else np.inf
+
+    def survival_at(self, times):
+        """Step-function survival probabilities at arbitrary times."""
+        index = np.searchsorted(self.timeline, times, side='right') - 1
+        return np.where(index >= 0, self.survival_function[np.maximum(index, 0)], 1.0)
+
+    def downsample(self, max_points, tolerance=KM_DOWNSAMPLE_TOLERANCE):
+        """Timeline indices of a decimated curve with at most max_points steps (see downsample_steps)."""
+        return downsample_steps(
+            [self.survival_function, self.confidence_interval[:, 0], self.confidence_interval[:, 1]],
+            max_points, tolerance
+        )
+
+    def plot(self, ax, ci_show=True, label=None, **kwargs):
+        """Draw the step curve (and band) on ax, like lifelines' KaplanMeierFitter.plot."""
+        line, = ax.plot(self.timeline, self.survival_function, drawstyle='steps-post', label=label, **kwargs)
+        if ci_show:
+            ax.fill_between(self.timeline, self.confidence_interval[:, 0], self.confidence_interval[:, 1],
+                            step='post', alpha=0.25, color=line.get_color(), linewidth=0)
+        return ax
+
+
+def kaplan_meier_from_life_table(times, event_counts, censored_counts, alpha=0.05, ci_method="log-log"):
+    """Estimate from sorted distinct times with their event and censored counts (or weights)."""
+    times = np.asarray(times, dtype=float)
+    event_counts = np.asarray(event_counts, dtype=float)
+    censored_counts = np.asarray(censored_counts, dtype=float)
+    if len(times) == 0 or times[0] > 0:
+        times = np.concatenate([[0.0], times])
+        event_counts = np.concatenate([[0.0], event_counts])
+        censored_counts = np.concatenate([[0.0], censored_counts])
+
+    removed = event_counts + censored_counts
+    at_risk = np.sum(removed) - np.cumsum(removed) + removed
+    return KaplanMeierEstimate(times, at_risk, event_counts, alpha, ci_method)
+
+
+def _step_groups(series, tolerance):
+    """Start of every run in which each series stays inside one tolerance-wide band."""
+    starts = np.zeros(len(series[0]), dtype=bool)
+    starts[0] = True
+    for values in series:
+        band = np.floor(values / tolerance)
+        starts[1:] |= band[1:] != band[:-1]
+    return np.flatnonzero(starts)
+
+
+def downsample_steps(series, max_points, tolerance=KM_DOWNSAMPLE_TOLERANCE):
+    """Indices of a step-function decimation of aligned series (survival and CI bounds).
+
+    Consecutive points whose values all stay inside the same band of width `tolerance` are
+    merged into the first of them, so drawn as steps-post every series is off by less than
+    the tolerance and every drop of at least the tolerance is kept. The last point is always
+    kept so the curve ends where the data ends. When that still leaves more than max_points,
+    the tolerance is widened until it fits. Curves with at most max_points points are untouched.
+    """
+    n = len(series[0])
+    if n <= max_points:
+        return np.arange(n)
+
+    series = [np.nan_to_num(np.asarray(values, dtype=float)) for values in series]
+    while True:
+        keep = _step_groups(series, tolerance)
+        if keep[-1] != n - 1:
+            keep = np.append(keep, n - 1)
+        if len(keep) <= max_points:
+            return keep
+        tolerance *= max(1.25, len(keep) / max_points)
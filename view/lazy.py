@@ -0,0 +1,47 @@
+import importlib
+import threading
+
+# Heavy third-party modules (scipy, matplotlib, openai) are bound through these proxies so that
+# importing the views costs almost nothing; the real import happens on first attribute access.
+# warmup() imports everything up front, e.g. in a gunicorn --preload master before forking.
+
+_registry = []
+
+
+class LazyModule:
+    """Module proxy that imports `name` on first attribute access."""
+
+    def __init__(self, name, on_load=None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    module = importlib.import_module(self._name)
+                    if self._on_load is not None:
+                        self._on_load(module)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name, on_load=None):
+    """Return a proxy for module `name`; on_load(module) runs once right after the real import."""
+    return LazyModule(name, on_load)
+
+
+def load_all():
+    """Import every module registered through lazy_import."""
+    for module in list(_registry):
+        module._load()
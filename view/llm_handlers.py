@@ -1,4 +1,3 @@
-from .distributions import calculate_aic, evaluate_goodness_of_fit, evaluate_goodness_of_fit
 import re
 
 
@@ -23,8 +22,18 @@ def generate_message(time_to_event, event_status, mean, std_dev,skewness, kurtos
 
 
 
+def generate_life_table_message(times, events, censored, mean, std_dev, skewness, kurtosis):
+    if not times:
+        raise ValueError("Life table harus berisi minimal satu baris.")
+    life_table = ", ".join(f"({t}, {e}, {c})" for t, e, c in zip(times, events, censored))
+    return (
+        f"Anda adalah ahli statistik khusus dalam analisis survival. Tugas Anda adalah mengidentifikasi distribusi probabilitas yang paling cocok untuk data survival yang diberikan. Distribusi kandidat yang perlu dianalisis meliputi: Exponential, Weibull, Gamma, Pareto, Log-Normal, dan Log-Logistic. Gunakan informasi berikut untuk penilaian: life table (waktu, jumlah event, jumlah tersensor), mean, standard deviation, skewness, kurtosis, dan parameter estimasi dari distribusi tertentu. Berikan hanya satu distribusi yang paling sesuai. life_table:[{life_table}], mean: {mean}, std_dev: {std_dev}, skewness: {skewness}, kurtosis {kurtosis}"
+    )
+
+
 # fungsi untuk meng-handle prediksi dari openai
-def handle_predictions(cleaned_time_to_event, cleaned_event_status, predicted_distribution):
+def handle_predictions(predicted_distribution, all_results):
+    """Look up the LLM-predicted distribution in the already computed all_results instead of refitting."""
     distribution_pattern = r"(weibull|exponential|lognormal|loglogistic|gamma|pareto)"
     match = re.search(distribution_pattern, predicted_distribution.lower())
     
@@ -33,26 +42,18 @@ def handle_predictions(cleaned_time_to_event, cleaned_event_status, predicted_di
 
     predicted_distribution = match.group(0).lower()
     result_message = predicted_distribution  # Pesan hasil distribusi
-    aic, bic, params, hasil_uji_goodness_of_fit = None, None, None, "Goodness-of-fit test not available"
-
-    try:
-        if cleaned_time_to_event:
-            # Hitung AIC, BIC, dan params
-            if not cleaned_event_status:
-                aic, bic, params = calculate_aic(cleaned_time_to_event, predicted_distribution)
-            else:
-                aic, bic, params = calculate_aic(cleaned_time_to_event, predicted_distribution, cleaned_event_status)
-            
-            # Jika params berhasil didapatkan, lakukan uji goodness-of-fit
-            if params is not None:
-                ks_stat, p_value = evaluate_goodness_of_fit(cleaned_time_to_event, predicted_distribution, params)
-                hasil_uji_goodness_of_fit = f"Uji Kolmogorov-Smirnov: KS-statistic = {ks_stat:.4f}, p-value = {p_value:.4f}"
-            else:
-                hasil_uji_goodness_of_fit = "Goodness-of-fit test failed: Parameters not available"
-    
-    except Exception as e:
+    result = all_results.get(predicted_distribution)
+
+    if not result:
+        return result_message, None, None, None, "Goodness-of-fit test not available"
+
+    if result.get('aic') is None:
         # Jika terjadi error dalam perhitungan, kembalikan nilai default dengan pesan error
-        error_msg = f"Error dalam pemrosesan: {str(e)}"
+        error_msg = f"Error dalam pemrosesan: {result.get('error')}"
         return result_message, None, None, None, error_msg
 
-    return result_message, aic, bic, params, hasil_uji_goodness_of_fit
\ No newline at end of file
+    hasil_uji_goodness_of_fit = (
+        f"Uji Kolmogorov-Smirnov: KS-statistic = {result['ks_stat']:.4f}, p-value = {result['p_value']:.4f}; "
+        f"Anderson-Darling = {result['anderson_darling']:.4f}; Cramer-von Mises = {result['cramer_von_mises']:.4f}"
+    )
+    return result_message, result['aic'], result['bic'], result['params'], hasil_uji_goodness_of_fit
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from .constants import (PLOT_STYLE_VERSION, PLOT_STORE_MAX_BYTES, PLOT_STORE_MEMORY_BYTES, RENDER_PROFILES,
+                        DEFAULT_RENDER_PROFILE)
+from .figure_templates import TEMPLATES, render_image
+
+# Plot disimpan berdasarkan hash isinya dan disajikan lewat URL, bukan base64 di dalam JSON.
+# A plot's digest covers its payload (distribution, params and the plotted series derived from
+# the data) plus PLOT_STYLE_VERSION. The JSON response only writes the payload and returns
+# /plots/<kind>/<profile>/<digest>.<format>; the image view renders that image on first fetch and
+# keeps it. The store is a directory shared by every worker on the host, bounded by
+# PLOT_STORE_MAX_BYTES, with a small in-process LRU of image bytes in front of it.
+# render=url is opt-in: it is only offered when settings.PLOT_STORE_DIR is set, because every
+# instance serving the app must see the same directory (see settings.py).
+# A payload is stored with the plot kinds it was made for, so a URL of another kind is a 404.
+
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+_memory = OrderedDict()
+_memory_bytes = 0
+_lock = threading.Lock()
+_written_since_prune = 0
+
+
+def is_enabled():
+    """Whether a plot store is configured, i.e. render=url is available."""
+    return bool(settings.PLOT_STORE_DIR)
+
+
+def _store_dir():
+    path = settings.PLOT_STORE_DIR
+    if not path:
+        raise ImproperlyConfigured("PLOT_STORE_DIR is not set, so render=url is not available.")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _payload_path(digest):
+    return os.path.join(_store_dir(), f"{digest}.json")
+
+
+def _image_path(kind, profile, digest):
+    return os.path.join(_store_dir(), f"{kind}-{profile}-{digest}.{image_format(profile)}")
+
+
+def image_format(profile):
+    return RENDER_PROFILES[profile]['format']
+
+
+def _json_default(value):
+    # numpy scalars and arrays from the descriptive statistics inputs
+    return value.tolist()
+
+
+def _encode_payload(data):
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def payload_digest(data, kinds):
+    """Content address of a plot payload for the given kinds under the current plot style."""
+    digest = hashlib.sha256(f"plot-style:v{PLOT_STYLE_VERSION}:".encode('utf-8'))
+    digest.update(_encode_payload({'kinds': sorted(kinds), 'data': data}))
+    return digest.hexdigest()
+
+
+def _write_atomic(path, content):
+    """Write through a temporary file so concurrent readers never see a partial file."""
+    global _written_since_prune
+    directory = os.path.dirname(path)
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(content)
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+    with _lock:
+        _written_since_prune += len(content)
+        prune = _written_since_prune > PLOT_STORE_MAX_BYTES // 16
+        if prune:
+            _written_since_prune = 0
+    if prune:
+        prune_plot_store()
+
+
+def _remember(key, image):
+    global _memory_bytes
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return
+        _memory[key] = image
+        _memory_bytes += len(image)
+        while _memory_bytes > PLOT_STORE_MEMORY_BYTES and len(_memory) > 1:
+            _, evicted = _memory.popitem(last=False)
+            _memory_bytes -= len(evicted)
+
+
+def _touch(path):
+    """Mark a file as recently used; False when it does not exist (or was just pruned)."""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def store_payload(data, kinds):
+    """Store a plot payload, drawn as any of `kinds`, once and return its digest."""
+    digest = payload_digest(data, kinds)
+    path = _payload_path(digest)
+    if not _touch(path):
+        _write_atomic(path, _encode_payload({'kinds': sorted(kinds), 'data': data}))
+    return digest
+
+
+def image_url(kind, digest, profile=DEFAULT_RENDER_PROFILE):
+    return reverse('plot_image', kwargs={'kind': kind, 'profile': profile, 'digest': digest,
+                                         'extension': image_format(profile)})
+
+
+def plot_url(kind, data, profile=DEFAULT_RENDER_PROFILE):
+    """Store the payload of one plot and return the URL its image is served from."""
+    if data is None:
+        return None
+    return image_url(kind, store_payload(data, [kind]), profile)
+
+
+def plot_etag(kind, profile, digest):
+    # Identical key means identical bytes, so the ETag can be strong
+    return f'"{kind}-{profile}-{digest}"'
+
+
+def get_plot_image(kind, profile, digest, extension):
+    """Image bytes of a stored plot, rendered on first use; None for an unknown or evicted plot,
+    or a payload stored for another kind."""
+    if (not is_enabled() or kind not in TEMPLATES or profile not in RENDER_PROFILES or extension != image_format(profile)
+            or not DIGEST_PATTERN.match(digest)):
+        return None
+    key = f"{kind}-{profile}-{digest}"
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+
+    image_path = _image_path(kind, profile, digest)
+    try:
+        with open(image_path, 'rb') as handle:
+            image = handle.read()
+        _touch(image_path)
+    except FileNotFoundError:
+        try:
+            with open(_payload_path(digest), 'rb') as handle:
+                stored = json.loads(handle.read())
+        except FileNotFoundError:
+            return None
+        if kind not in stored['kinds']:
+            return None
+        data = stored['data']
+        if kind == 'barchart':
+            data = tuple(data)
+        image = render_image(kind, data, profile=profile)
+        _write_atomic(image_path, image)
+    _remember(key, image)
+    return image
+
+
+def prune_plot_store(max_bytes=None):
+    """Delete the least recently used files until the store fits in max_bytes (90% of the budget)."""
+    max_bytes = PLOT_STORE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    total = 0
+    with os.scandir(_store_dir()) as scan:
+        for entry in scan:
+            # Files still being written by another worker
+            if entry.name.endswith('.tmp'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+    if total <= max_bytes:
+        return
+
+    target = int(max_bytes * 0.9)
+    for _, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def clear_plot_store():
+    """Forget every stored plot, on disk and in this process."""
+    global _memory_bytes
+    with _lock:
+        _memory.clear()
+        _memory_bytes = 0
+    prune_plot_store(max_bytes=0)
@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from .constants import PARALLEL_RENDER, RENDER_TIMEOUT_SECONDS, DEFAULT_RENDER_PROFILE, POOL_START_METHOD
+from .figure_templates import TEMPLATES, get_template, render_plot
+
+# Pool proses untuk rasterisasi plot, dibuat sekali per worker dan dipakai ulang lintas request.
+# Each pool process builds every figure template when it starts, so a render only swaps data in.
+RENDER_POOL_SIZE = min(4, os.cpu_count() or 1)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _init_render_worker():
+    """Import matplotlib and build the styled templates once per pool process."""
+    for kind in TEMPLATES:
+        get_template(kind)
+
+
+def get_render_executor():
+    """Return the persistent render pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=RENDER_POOL_SIZE, initializer=_init_render_worker,
+                                            mp_context=multiprocessing.get_context(POOL_START_METHOD))
+        return _executor
+
+
+def shutdown_render_executor(terminate=False):
+    """Shut the pool down, e.g. after a worker crash or at process exit.
+
+    terminate=True also kills the pool processes, for renders still running past their
+    deadline (a running future cannot be cancelled); the next render starts a fresh pool.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            if terminate:
+                # ProcessPoolExecutor has no public way to stop a running task
+                for process in list(_executor._processes.values()):
+                    process.terminate()
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def render_plots(jobs, timeout=RENDER_TIMEOUT_SECONDS, profile=DEFAULT_RENDER_PROFILE):
+    """Render (kind, data) jobs concurrently and return the base64 images in order.
+
+    Falls back to rendering inline when there is a single core or the pool is unavailable;
+    a plot that misses the deadline comes back as None and the pool is recycled.
+    """
+    if not PARALLEL_RENDER or RENDER_POOL_SIZE < 2 or len(jobs) < 2:
+        return [render_plot(kind, data, profile=profile) for kind, data in jobs]
+
+    try:
+        executor = get_render_executor()
+        futures = [executor.submit(render_plot, kind, data, None, profile) for kind, data in jobs]
+    except (BrokenProcessPool, RuntimeError):
+        shutdown_render_executor()
+        return [render_plot(kind, data, profile=profile) for kind, data in jobs]
+
+    # All plots render side by side, so they share one deadline
+    deadline = time.monotonic() + timeout
+    results = []
+    timed_out = False
+    for (kind, data), future in zip(jobs, futures):
+        try:
+            results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            timed_out = True
+            results.append(None)
+        except BrokenProcessPool:
+            shutdown_render_executor()
+            results.append(render_plot(kind, data, profile=profile))
+    if timed_out:
+        shutdown_render_executor(terminate=True)
+    return results
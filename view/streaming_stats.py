@@ -0,0 +1,418 @@
+import math
+import re
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+import numpy as np
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from .aggregates import box_statistics, histogram_counts, weighted_quantiles
+from .descriptive_stats import numeric_statistics_from_summary, categorical_statistics_from_counts, statistics_response
+from .constants import (HISTOGRAM_BINS, CATEGORY_TOP_K, DEFAULT_RENDER_PROFILE, STATS_STREAM_CACHE_ALIAS,
+                        STATS_STREAM_TIMEOUT, STATS_STREAM_SKETCH_K, STATS_STREAM_HISTOGRAM_BINS,
+                        STATS_STREAM_MAX_DISTINCT, STATS_STREAM_LOCK_TIMEOUT, STATS_STREAM_LOCK_WAIT)
+
+# Statistik deskriptif dari kolom yang dikirim per potongan (chunk).
+# A session keeps only mergeable accumulators, never the values: Chan/Welford central moments,
+# a KLL quantile sketch for the median and the boxplot, a fine histogram whose range doubles as
+# new values arrive, and exact distinct counts up to STATS_STREAM_MAX_DISTINCT values. Its size
+# is bounded whatever the column length; an approximate session (approximate_stats) swaps the
+# exact distinct counts for sketches too, so it takes any number of categories. Sessions live
+# in the STATS_STREAM_CACHE_ALIAS cache, which every worker must share: a process-local backend
+# is refused. Chunks of one session are applied one at a time under a lock in that cache.
+
+SESSION_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class MomentAccumulator:
+    """Count, sum, extremes and central moment sums, merged with Chan et al.'s pairwise formulas."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = self.m3 = self.m4 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values):
+        if not len(values):
+            return
+        chunk = MomentAccumulator()
+        chunk.count = len(values)
+        chunk.total = math.fsum(values.tolist())
+        chunk.mean = chunk.total / chunk.count
+        deviations = values - chunk.mean
+        squared = deviations * deviations
+        chunk.m2 = float(squared.sum())
+        chunk.m3 = float((squared * deviations).sum())
+        chunk.m4 = float((squared * squared).sum())
+        chunk.minimum, chunk.maximum = float(values.min()), float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        # Higher moments first, they use the lower moments of both parts before the merge
+        self.m4 += (other.m4 + delta ** 4 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+                    + 6 * delta ** 2 * (na * na * other.m2 + nb * nb * self.m2) / n ** 2
+                    + 4 * delta * (na * other.m3 - nb * self.m3) / n)
+        self.m3 += (other.m3 + delta ** 3 * na * nb * (na - nb) / n ** 2
+                    + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+        self.m2 += other.m2 + delta ** 2 * na * nb / n
+        self.mean += delta * nb / n
+        self.count = n
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def shape(self):
+        """(std, skewness, kurtosis) as in numeric_summary: sample std, biased skewness and excess kurtosis."""
+        n = self.count
+        std = math.sqrt(self.m2 / (n - 1)) if n > 1 else None
+        if self.m2 == 0:
+            return std, math.nan if n > 2 else None, math.nan if n > 3 else None
+        skewness = math.sqrt(n) * self.m3 / self.m2 ** 1.5
+        kurtosis = n * self.m4 / self.m2 ** 2 - 3.0
+        return std, skewness if n > 2 else None, kurtosis if n > 3 else None
+
+
+class QuantileSketch:
+    """KLL quantile sketch: levels of sorted-and-halved items, an item on level h weighing 2 ** h.
+
+    Memory grows as O(k log(n / k)); until a level is first compacted the sketch holds every
+    value and its quantiles are exact. Sketches merge by concatenating their levels.
+    """
+
+    def __init__(self, k=STATS_STREAM_SKETCH_K, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def is_exact(self):
+        return len(self.levels) == 1
+
+    def update(self, values):
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other):
+        self.levels.extend(np.empty(0) for _ in range(len(other.levels) - len(self.levels)))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _capacity(self, level):
+        # Lower levels get geometrically smaller buffers (factor 2/3 per level below the top)
+        return max(8, int(math.ceil(self.k * (2 / 3) ** (len(self.levels) - level - 1))))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            grown = level + 1 == len(self.levels)
+            if grown:
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item stays behind; of the rest every other one moves up with twice the weight
+            odd = len(items) % 2
+            promoted = items[odd + self._rng.integers(2)::2]
+            self.levels[level] = items[:odd]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # A new top level shrinks the capacity of every level below it
+            level = 0 if grown else level + 1
+
+    def weighted_items(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(values), 2.0 ** level) for level, values in enumerate(self.levels)])
+        return items, weights
+
+    def quantiles(self, quantiles):
+        if self.is_exact:
+            return np.percentile(self.levels[0], np.asarray(quantiles) * 100)
+        return weighted_quantiles(*self.weighted_items(), quantiles)
+
+
+class StreamingHistogram:
+    """Counts on a fine equal-width grid that doubles its range to take in values outside it.
+
+    The final bins span the column's min..max, which is only known at the end, so the fine
+    counts are re-binned then, spreading each fine bin evenly over its width; only values
+    within one fine bin of a final edge can be counted on the wrong side of it.
+    """
+
+    def __init__(self, bins=STATS_STREAM_HISTOGRAM_BINS):
+        self.bins = bins
+        self.low = None
+        # 0 while every value so far equals low (all counted in the first bin)
+        self.width = 0.0
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    def update(self, values, weights=None):
+        if not len(values):
+            return
+        low, high = float(values.min()), float(values.max())
+        if self.low is None:
+            self.low = low
+        if self.width == 0.0 and (low < self.low or high > self.low):
+            self._open(min(low, self.low), max(high, self.low))
+        if self.width == 0.0:
+            self.counts[0] += len(values) if weights is None else int(np.sum(weights))
+            return
+        self._cover(low, high)
+        self.counts += np.bincount(self._index(values), weights=weights, minlength=self.bins).astype(np.int64)
+
+    def merge(self, other):
+        if other.low is None:
+            return
+        if other.width == 0.0:
+            self.update(np.array([other.low]), np.array([other.counts[0]]))
+            return
+        filled = np.flatnonzero(other.counts)
+        centers = other.low + (filled + 0.5) * other.width
+        self.update(centers, other.counts[filled])
+
+    def _index(self, values):
+        return np.minimum(((values - self.low) / self.width).astype(np.int64), self.bins - 1)
+
+    def _open(self, low, high):
+        """Lay the grid over low..high, moving the equal values counted so far into their bin."""
+        pending, value = self.counts[0], self.low
+        self.low, self.width = low, (high - low) / self.bins
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self.counts[self._index(np.array([value]))[0]] += pending
+
+    def _cover(self, low, high):
+        while low < self.low or high > self.low + self.width * self.bins:
+            merged = self.counts.reshape(-1, 2).sum(axis=1)
+            padding = np.zeros(self.bins // 2, dtype=np.int64)
+            if low < self.low:
+                self.low -= self.width * self.bins
+                self.counts = np.concatenate([padding, merged])
+            else:
+                self.counts = np.concatenate([merged, padding])
+            self.width *= 2
+
+    def histogram(self, minimum, maximum, bins=HISTOGRAM_BINS):
+        """Bin edges and counts over minimum..maximum, laid out like aggregates.histogram_counts."""
+        if self.width == 0.0:
+            counts, edges = np.histogram(np.array([self.low]), bins=bins, weights=self.counts[:1])
+        else:
+            edges = np.histogram_bin_edges(np.array([minimum, maximum]), bins=bins)
+            fine_edges = self.low + np.arange(self.bins + 1) * self.width
+            cumulative = np.interp(edges, fine_edges, np.concatenate([[0], np.cumsum(self.counts)]))
+            # Nothing lies outside min..max, whatever the fine bins at the ends suggest
+            cumulative[0], cumulative[-1] = 0, self.counts.sum()
+            counts = np.diff(np.round(cumulative))
+        return {'edges': edges.tolist(), 'counts': counts.astype(np.int64).tolist()}
+
+
+class DistinctCounter:
+    """Exact counts of the distinct values, kept while there are at most `limit` of them."""
+
+    def __init__(self, limit=None):
+        self.limit = STATS_STREAM_MAX_DISTINCT if limit is None else limit
+        self.counts = Counter()
+        self.overflowed = False
+
+    def update(self, values):
+        if not self.overflowed:
+            self.counts.update(values)
+            self._check()
+
+    def merge(self, other):
+        self.overflowed = self.overflowed or other.overflowed
+        if not self.overflowed:
+            self.counts.update(other.counts)
+            self._check()
+
+    def _check(self):
+        if len(self.counts) > self.limit:
+            self.overflowed = True
+            self.counts = Counter()
+
+
+class ColumnAccumulator:
+    """Everything get-statistics reports about one column, updated chunk by chunk and mergeable."""
+
+    def __init__(self, is_numeric):
+        self.is_numeric = is_numeric
+        self.chunks = 0
+        self.distinct = DistinctCounter()
+        if is_numeric:
+            self.moments = MomentAccumulator()
+            self.sketch = QuantileSketch()
+            self.fine_histogram = StreamingHistogram()
+
+    @property
+    def count(self):
+        return self.moments.count if self.is_numeric else self.distinct.counts.total()
+
+    def update(self, values):
+        """Add one chunk: floats for a numeric column, strings for a categorical one."""
+        if self.is_numeric:
+            array = np.asarray(values, dtype=float)
+            self.moments.update(array)
+            self.sketch.update(array)
+            self.fine_histogram.update(array)
+        self.distinct.update(values)
+        if not self.is_numeric and self.distinct.overflowed:
+            raise ValueError(f"More than {self.distinct.limit} distinct categories; streaming keeps exact category counts only.")
+        self.chunks += 1
+
+    def merge(self, other):
+        if self.is_numeric:
+            self.moments.merge(other.moments)
+            self.sketch.merge(other.sketch)
+            self.fine_histogram.merge(other.fine_histogram)
+        self.distinct.merge(other.distinct)
+        self.chunks += other.chunks
+
+    def numeric_summary(self):
+        """Summary in the layout of aggregates.numeric_summary.
+
+        The median is exact while the sketch still holds every value; mode and unique_count
+        are None once the column has more than STATS_STREAM_MAX_DISTINCT distinct values.
+        """
+        moments = self.moments
+        std, skewness, kurtosis = moments.shape()
+        mode = None
+        if not self.distinct.overflowed:
+            value, count = self.distinct.counts.most_common(1)[0]
+            mode = value if count > 1 else None
+        return {
+            'count': moments.count,
+            'sum': moments.total,
+            'mean': moments.total / moments.count,
+            'median': float(self.sketch.quantiles([0.5])[0]),
+            'mode': mode,
+            'std': std,
+            'skewness': skewness,
+            'kurtosis': kurtosis,
+            'min': moments.minimum,
+            'max': moments.maximum,
+            'unique_count': None if self.distinct.overflowed else len(self.distinct.counts),
+        }
+
+    def box(self):
+        return sketch_box(self.sketch, self.moments.minimum, self.moments.maximum)
+
+    def histogram(self):
+        if self.sketch.is_exact:
+            return histogram_counts(self.sketch.levels[0])
+        return self.fine_histogram.histogram(self.moments.minimum, self.moments.maximum)
+
+    def statistics(self, render="png", profile=DEFAULT_RENDER_PROFILE, top_k=CATEGORY_TOP_K):
+        if self.is_numeric:
+            return statistics_response(numeric_statistics_from_summary(self.numeric_summary()), render, profile,
+                                       self.box(), self.histogram())
+        return statistics_response(categorical_statistics_from_counts(self.distinct.counts, top_k), render, profile)
+
+
+def sketch_box(sketch, minimum, maximum):
+    """box_statistics of the values a quantile sketch has seen, given their exact extremes."""
+    if sketch.is_exact:
+        return box_statistics(sketch.levels[0])
+    items, weights = sketch.weighted_items()
+    # The exact extremes (weightless) so the whiskers and outermost fliers are the real ones
+    items = np.concatenate([items, [minimum, maximum]])
+    return box_statistics(items, weights=np.concatenate([weights, [0.0, 0.0]]))
+
+
+def finalize_statistics(accumulator, render="png", profile=DEFAULT_RENDER_PROFILE, top_k=CATEGORY_TOP_K):
+    """The process_statistics response of a streamed column (with error bounds for an approximate one)."""
+    if accumulator.count == 0:
+        raise ValueError("No data was uploaded to this session.")
+    return accumulator.statistics(render, profile, top_k)
+
+
+def _cache():
+    cache = caches[STATS_STREAM_CACHE_ALIAS]
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        raise ImproperlyConfigured(
+            f"Statistics streaming needs a cache shared by every worker; '{STATS_STREAM_CACHE_ALIAS}' is process-local.")
+    return cache
+
+
+def _session_key(session_id):
+    return f"stats-stream:{session_id}"
+
+
+@contextmanager
+def session_lock(session_id):
+    """Hold the session's lock, so concurrent chunks cannot overwrite each other's updates.
+
+    Waits up to STATS_STREAM_LOCK_WAIT seconds, then raises TimeoutError. cache.add is atomic,
+    so only one worker gets the lock; it expires after STATS_STREAM_LOCK_TIMEOUT seconds if the
+    holder dies.
+    """
+    cache = _cache()
+    key = f"{_session_key(session_id)}:lock"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + STATS_STREAM_LOCK_WAIT
+    while not cache.add(key, token, STATS_STREAM_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            raise TimeoutError("Another chunk of this session is being applied; send chunks one at a time.")
+        time.sleep(0.05)
+    try:
+        yield
+    finally:
+        # Not ours any more once it expired and another worker took it
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+def start_session(accumulator):
+    """Open a streaming session around an empty accumulator and return its id.
+
+    The accumulator is a ColumnAccumulator, or an approximate_stats.ApproximateColumn for a
+    session that keeps only fixed-size sketches.
+    """
+    session_id = uuid.uuid4().hex
+    _cache().set(_session_key(session_id), accumulator, STATS_STREAM_TIMEOUT)
+    return session_id
+
+
+def load_session(session_id):
+    """The session's accumulator; LookupError for an unknown or expired session."""
+    accumulator = _cache().get(_session_key(session_id)) if SESSION_PATTERN.match(session_id) else None
+    if accumulator is None:
+        raise LookupError("Unknown or expired statistics session.")
+    return accumulator
+
+
+def add_chunk(session_id, accumulator, values, seq):
+    """Apply chunk number seq (0-based) to the session's accumulator (from load_session) and store it.
+
+    Load, add and store under session_lock, or a concurrent chunk's update can be lost.
+
+    Chunks are applied in order: a chunk that was already applied (a retry) is ignored and a
+    chunk from the future is a ValueError, so a lost request never silently drops data.
+    """
+    if seq < accumulator.chunks:
+        return accumulator
+    if seq > accumulator.chunks:
+        raise ValueError(f"Expected chunk {accumulator.chunks}, got {seq}.")
+    accumulator.update(values)
+    _cache().set(_session_key(session_id), accumulator, STATS_STREAM_TIMEOUT)
+    return accumulator
+
+
+def end_session(session_id):
+    _cache().delete(_session_key(session_id))
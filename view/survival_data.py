@@ -0,0 +1,129 @@
+import numpy as np
+from .kaplan_meier import kaplan_meier_from_life_table
+from .distribution_registry import ModelCurves
+
+
+class SurvivalData:
+    """Validated survival data shared by every consumer of one request.
+
+    The input is collapsed once into a life table (distinct time, event count, censored count).
+    Fitting, the KS test and Kaplan-Meier run on weighted rows derived from that table, so
+    their cost scales with the number of distinct times rather than the number of subjects.
+    """
+
+    def __init__(self, time_to_event, event_status=None):
+        time_to_event = np.asarray(time_to_event, dtype=float)
+        has_event_status = event_status is not None and len(event_status) > 0
+
+        if has_event_status:
+            event_status = np.asarray(event_status, dtype=int)
+            if len(time_to_event) != len(event_status):
+                raise ValueError("Time-to-event and event-status must have same length")
+            if not np.all(np.isin(event_status, [0, 1])):
+                raise ValueError("Event status must be 0 (censored) or 1 (event)")
+        else:
+            event_status = np.ones(len(time_to_event), dtype=int)
+
+        unique_times, inverse, counts = np.unique(time_to_event, return_inverse=True, return_counts=True)
+        event_counts = np.bincount(inverse, weights=event_status, minlength=len(unique_times)).astype(int)
+        self._set_life_table(unique_times, event_counts, counts - event_counts, has_event_status)
+
+    @classmethod
+    def from_life_table(cls, times, event_counts, censored_counts):
+        """Build from an already aggregated life table; repeated times are merged."""
+        times = np.asarray(times, dtype=float)
+        event_counts = np.asarray(event_counts, dtype=float)
+        censored_counts = np.asarray(censored_counts, dtype=float)
+        if not len(times) == len(event_counts) == len(censored_counts):
+            raise ValueError("Life table columns must have same length")
+        if np.any(event_counts < 0) or np.any(censored_counts < 0):
+            raise ValueError("Event and censored counts must be non-negative")
+        if np.any(event_counts % 1) or np.any(censored_counts % 1):
+            raise ValueError("Event and censored counts must be whole numbers")
+
+        unique_times, inverse = np.unique(times, return_inverse=True)
+        survival_data = cls.__new__(cls)
+        survival_data._set_life_table(
+            unique_times,
+            np.bincount(inverse, weights=event_counts, minlength=len(unique_times)).astype(int),
+            np.bincount(inverse, weights=censored_counts, minlength=len(unique_times)).astype(int),
+            True
+        )
+        return survival_data
+
+    def _set_life_table(self, unique_times, event_counts, censored_counts, has_event_status):
+        at_least_one = (event_counts + censored_counts) > 0
+        self.unique_times = unique_times[at_least_one]
+        self.event_counts = event_counts[at_least_one]
+        self.censored_counts = censored_counts[at_least_one]
+
+        # Weighted rows: one event row and one censored row per distinct time (empty rows dropped)
+        if has_event_status:
+            times = np.concatenate([self.unique_times, self.unique_times])
+            status = np.concatenate([np.ones(len(self.unique_times), dtype=int),
+                                     np.zeros(len(self.unique_times), dtype=int)])
+            weights = np.concatenate([self.event_counts, self.censored_counts])
+            order = np.argsort(times, kind='mergesort')
+            keep = weights[order] > 0
+            self.time_to_event = times[order][keep]
+            self.event_status = status[order][keep]
+            self.weights = weights[order][keep]
+        else:
+            self.time_to_event = self.unique_times
+            self.event_status = None
+            self.weights = self.event_counts
+        self._kaplan_meier = None
+        self._model_curves = {}
+
+    def __len__(self):
+        return int(np.sum(self.weights))
+
+    @property
+    def is_empty(self):
+        return len(self.time_to_event) == 0
+
+    @property
+    def has_event_status(self):
+        return self.event_status is not None
+
+    @property
+    def observed(self):
+        """Event indicators of the weighted rows, all events when none were given."""
+        if self.event_status is None:
+            return np.ones_like(self.time_to_event, dtype=int)
+        return self.event_status
+
+    @property
+    def n_events(self):
+        return int(np.sum(self.event_counts))
+
+    def summary_statistics(self):
+        """Weighted mean, sample standard deviation, skewness and excess kurtosis of the times."""
+        n = len(self)
+        if n < 2:
+            raise ValueError("At least two observations are required.")
+        mean = np.average(self.time_to_event, weights=self.weights)
+        deviation = self.time_to_event - mean
+        m2 = np.average(deviation ** 2, weights=self.weights)
+        m3 = np.average(deviation ** 3, weights=self.weights)
+        m4 = np.average(deviation ** 4, weights=self.weights)
+        std = np.sqrt(m2 * n / (n - 1))
+        if m2 == 0:
+            return mean, std, np.nan, np.nan
+        return mean, std, m3 / m2 ** 1.5, m4 / m2 ** 2 - 3
+
+    @property
+    def kaplan_meier(self):
+        """Kaplan-Meier fit with 95% confidence band, computed on first access only."""
+        if self._kaplan_meier is None and not self.is_empty:
+            self._kaplan_meier = kaplan_meier_from_life_table(
+                self.unique_times, self.event_counts, self.censored_counts, alpha=0.05
+            )
+        return self._kaplan_meier
+
+    def model_curves(self, distribution, params):
+        """Fitted survival and hazard curves on the shared grid, computed once per distribution and params."""
+        key = (distribution, tuple(float(p) for p in params))
+        if key not in self._model_curves:
+            self._model_curves[key] = ModelCurves(self, distribution, params)
+        return self._model_curves[key]
@@ -1,18 +1,42 @@
 import base64
 from io import BytesIO
-import matplotlib.pyplot as plt
 import numpy as np
 from django.conf import settings
-import openai
+from .lazy import lazy_import
+from .constants import RENDER_PROFILES, DEFAULT_RENDER_PROFILE
+
+
+def _configure_openai(module):
+    module.api_key = settings.OPENAI_API_KEY
+
+
+# openai baru diimpor saat pertama kali dipakai
+openai = lazy_import('openai', on_load=_configure_openai)
+transforms = lazy_import('matplotlib.transforms')
+
+def plot_to_bytes(fig, profile=DEFAULT_RENDER_PROFILE):
+    """Encode a matplotlib figure with one of the RENDER_PROFILES.
+
+    fig is a matplotlib.figure.Figure with its own Agg canvas, not a pyplot figure, so nothing
+    global is touched and there is no figure manager to close.
+    """
+    spec = RENDER_PROFILES[profile]
+    options = {'format': spec['format'], 'dpi': spec['dpi'], 'facecolor': 'white'}
+    options['bbox_inches'] = 'tight' if spec['bbox'] == 'tight' else transforms.Bbox.from_extents(*spec['bbox'])
+    pil_kwargs = {key: spec[key] for key in ('compress_level', 'quality') if key in spec}
+    if pil_kwargs:
+        options['pil_kwargs'] = pil_kwargs
+    if spec['format'] == 'svg':
+        # No timestamp, so identical plots give identical bytes
+        options['metadata'] = {'Date': None}
 
-def plot_to_base64(fig):
-    """Convert matplotlib figure to base64 encoded PNG."""
     buf = BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight', dpi=120, facecolor='white')
-    buf.seek(0)
-    img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-    plt.close(fig)
-    return img_base64
+    fig.savefig(buf, **options)
+    return buf.getvalue()
+
+def plot_to_base64(fig, profile=DEFAULT_RENDER_PROFILE):
+    """Convert matplotlib figure to a base64 encoded image (PNG with the standard profile)."""
+    return base64.b64encode(plot_to_bytes(fig, profile)).decode('utf-8')
 
 def ask_openai(message):
     try:
@@ -64,6 +88,38 @@ def parse_data(data):
     
     return cleaned_time_to_event, cleaned_event_status
 
+# jumlah event/tersensor harus bilangan bulat tidak negatif (kosong dihitung 0)
+def _life_table_count(value):
+    if value is None or value == "":
+        return 0
+    try:
+        count = float(value)
+    except (TypeError, ValueError):
+        count = None
+    if isinstance(value, bool) or count is None or not count.is_integer() or count < 0:
+        raise ValueError(f"Event and censored counts must be non-negative whole numbers, got {value!r}.")
+    return int(count)
+
+# fungsi untuk melakukan parsing life table (waktu unik, jumlah event, jumlah tersensor)
+def parse_life_table(data):
+    life_table = data.get('life_table', {})
+    if not isinstance(life_table, dict):
+        raise ValueError("'life_table' must be an object with 'time', 'events' and 'censored' lists.")
+
+    columns = [life_table.get(key, []) for key in ('time', 'events', 'censored')]
+    if not all(isinstance(column, list) for column in columns):
+        raise ValueError("'time', 'events' and 'censored' must be lists.")
+
+    times, events, censored = columns
+    censored = censored or [0] * len(events)
+    if not len(times) == len(events) == len(censored):
+        raise ValueError("'time', 'events' and 'censored' must have the same length.")
+
+    # melakukan clean data, baris dengan waktu kosong dibuang
+    rows = [(float(t), _life_table_count(e), _life_table_count(c)) for t, e, c in zip(times, events, censored)
+            if t is not None and t != ""]
+    return [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows]
+
 # Fungsi untuk mengubah ndarray menjadi list
 def ndarray_to_list(arr):
     if isinstance(arr, np.ndarray):
@@ -0,0 +1,34 @@
+import gc
+import numpy as np
+from .lazy import load_all
+from . import approximate_stats, dataset_stats, descriptive_stats, helper, plotting  # noqa: F401  (registers their lazy modules)
+from .constants import DISTRIBUTIONS
+from .distributions import calculate_aic
+from .figure_templates import TEMPLATES, get_template, clear_templates
+
+
+def warmup(freeze=True):
+    """Import and initialize the heavy modules once, before workers are forked.
+
+    Meant for a gunicorn --preload master (see gunicorn.conf.py): the imported modules, the
+    font and text caches and scipy's distribution objects are then shared copy-on-write.
+    Figure templates are cached per thread, so each request thread builds its own on first use.
+    gc.freeze() moves everything allocated so far out of the collector's reach, so collections
+    in the workers do not touch (and copy) those pages.
+    """
+    load_all()
+
+    # Drawing every template once loads the fonts and glyph caches, which are process-wide and
+    # inherited by every worker; the templates themselves belong to this thread and are dropped
+    for kind in TEMPLATES:
+        get_template(kind).fig.canvas.draw()
+    clear_templates()
+
+    # One small fit per distribution initializes the scipy optimizer and special-function paths
+    sample = np.linspace(1, 10, 20)
+    for distribution in DISTRIBUTIONS:
+        calculate_aic(sample, distribution)
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
@@ -0,0 +1,83 @@
+import json
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from .constants import MEMORY_REPORT_TOP
+from .figure_templates import open_figure_count
+
+# Pengawas memori per worker: setelah tiap request RSS proses dibandingkan dengan batasnya.
+# Past the limit the worker logs a memory report (RSS, open figures and, when tracemalloc is
+# tracing, the top allocation sites) and asks the server for a graceful recycle: in-flight
+# requests finish, then the master replaces the worker. install_watchdog() wires the recycle
+# hook per worker (see gunicorn.conf.py); without one the report is only logged.
+
+logger = logging.getLogger(__name__)
+
+_recycle = None
+_recycle_requested = False
+_lock = threading.Lock()
+
+
+def install_watchdog(recycle, trace_frames=0):
+    """Set the callable that recycles this worker; trace_frames > 0 starts tracemalloc with that depth."""
+    global _recycle, _recycle_requested
+    with _lock:
+        _recycle = recycle
+        _recycle_requested = False
+    if trace_frames > 0 and not tracemalloc.is_tracing():
+        tracemalloc.start(trace_frames)
+
+
+def current_rss():
+    """Resident set size of this process in bytes (the peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def memory_report(top=MEMORY_REPORT_TOP):
+    """RSS, open figures and, while tracemalloc is tracing, the largest allocation sites."""
+    report = {
+        'pid': os.getpid(),
+        'rss_bytes': current_rss(),
+        'open_figures': open_figure_count(),
+        'tracemalloc': None,
+    }
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics('lineno')[:top]
+        report['tracemalloc'] = {
+            'current_bytes': current,
+            'peak_bytes': peak,
+            'top': [{'location': str(stat.traceback[0]), 'size_bytes': stat.size, 'count': stat.count}
+                    for stat in statistics],
+        }
+    return report
+
+
+def check_memory(max_rss_bytes):
+    """Request one recycle once RSS passes max_rss_bytes (0 disables); True when it was requested now."""
+    global _recycle_requested
+    if not max_rss_bytes or _recycle_requested or current_rss() <= max_rss_bytes:
+        return False
+    with _lock:
+        if _recycle_requested:
+            return False
+        _recycle_requested = True
+        recycle = _recycle
+
+    report = memory_report()
+    logger.warning("Worker %s over its memory limit (%d MiB > %d MiB), %s: %s",
+                   report['pid'], report['rss_bytes'] // 2 ** 20, max_rss_bytes // 2 ** 20,
+                   "recycling after in-flight requests" if recycle else "no recycle hook installed",
+                   json.dumps(report))
+    if recycle is not None:
+        recycle()
+    return True